@@ -0,0 +1,28 @@
+"""
+Engine benchmarks -- run from the repository root with `python -m benchmarks.<name>`
+
+Importing the package selects the dummy SDL drivers (before pygame opens a
+display), `setup` creates the headless display + the global frame signal the
+engine expects.
+
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+# ---------------------------- #
+# functions
+
+def setup():
+    """ Initialize pygame with a 1x1 display + the global frame signal """
+    import pygame
+
+    from engine import singleton
+    from engine.handler import signal
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    singleton.GLOBAL_FRAME_SIGNAL_EMITTER = signal.Signal(singleton.GLOBAL_FRAME_SIGNAL_KEY).get_unique_emitter()
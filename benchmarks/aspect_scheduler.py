@@ -0,0 +1,74 @@
+"""
+Aspect scheduler benchmark -- serial priority order vs non conflicting aspects on the thread pool
+
+Run from the repository root:
+
+    python -m benchmarks.aspect_scheduler
+
+Every aspect does NumPy work (which releases the GIL) on its own component
+class, so none of them conflict.
+
+"""
+
+import benchmarks
+
+import time
+import numpy as np
+
+from engine import singleton
+
+from engine.handler import world
+from engine.handler import aspect
+from engine.handler import component
+
+# ---------------------------- #
+# constants
+
+ASPECTS = 4
+ARRAY_SIZE = 1_000_000
+FRAMES = 60
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+class NumpyAspect(aspect.Aspect):
+    """ Sorts + normalizes a large array every frame """
+
+    def __init__(self, index: int):
+        """ Create a new NumPy Aspect -- only touches its own component class """
+        _class = type(f"NumpyComponent{index}", (component.Component,), {})
+        super().__init__(target_component_classes=[_class], reads=[], writes=[_class])
+        self._values = np.random.default_rng(index).random(ARRAY_SIZE)
+
+    def handle(self, camera: "Camera"):
+        """ Handle the aspect """
+        _sorted = np.sort(self._values)
+        self._values = np.sqrt(_sorted / _sorted[-1])
+
+
+def run(parallel: bool) -> float:
+    """ Get the time per frame """
+    singleton.PARALLEL_ASPECTS = parallel
+    _world = world.World(f"aspect_scheduler_benchmark_{int(parallel)}")
+    for i in range(ASPECTS):
+        _world.add_aspect(type(f"NumpyAspect{i}", (NumpyAspect,), {})(i))
+    _world._aspect_handler.handle(_world.camera)
+    _start = time.perf_counter()
+    for _ in range(FRAMES):
+        _world._aspect_handler.handle(_world.camera)
+    return (time.perf_counter() - _start) / FRAMES
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    _serial = run(False)
+    _parallel = run(True)
+    print(f"{ASPECTS} aspects, {ARRAY_SIZE} values each, {singleton.ASPECT_THREAD_WORKERS} workers")
+    print(f"{'serial':<16} {_serial * 1000:>10.2f} ms")
+    print(f"{'parallel':<16} {_parallel * 1000:>10.2f} ms")
+    print(f"parallel: {_serial / _parallel:.1f}x faster")
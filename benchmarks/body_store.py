@@ -0,0 +1,87 @@
+"""
+Body store benchmark -- world rect bodies stepped one by one vs the structure of arrays store
+
+Run from the repository root:
+
+    python -m benchmarks.body_store
+
+Times the physics components (gravity, air resistance, friction) + the world
+rect aspect, gameobject updates are not included.
+
+"""
+
+import benchmarks
+
+import time
+import random
+import pygame
+
+from engine import singleton
+
+from engine.handler import world
+
+from engine.physics import gameobject
+
+from engine.addon import components
+from engine.addon import physicscomponents
+
+# ---------------------------- #
+# constants
+
+BODY_COUNTS = (200, 1000, 2000, 4000)
+FRAMES = 60
+SPRITE = "assets/test/screenshot.png"
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+singleton.set_render_distance(40)
+singleton.DELTA_TIME = 1 / 60
+
+
+def create_world(name: str, body_store: bool, count: int) -> tuple:
+    """ Floors + walls, bodies spread over the floors """
+    random.seed(4)
+    _world = world.World(name)
+    _layer = _world.get_layer_at(0)
+    _tile = world.DefaultTile((0, 0), SPRITE)
+    for y in range(6, 80, 10):
+        _layer.fill_rect((-60, y, 120, 1), _tile)
+    for x in range(-60, 61, 15):
+        _layer.fill_rect((x, 0, 1, 80), _tile)
+
+    _aspect = components.rect_comp.WorldRectAspect(body_store=body_store)
+    _world.add_aspect(_aspect)
+    _world._physics_handler.add_component(physicscomponents.gravity_comp.GravityComponent(pygame.math.Vector2(0, 700)))
+    _world._physics_handler.add_component(physicscomponents.airresistance_comp.AirResistanceComponent(4))
+    _world._physics_handler.add_component(physicscomponents.friction_comp.FrictionComponent())
+    for i in range(count):
+        _gameobject = _world.add_gameobject(gameobject.GameObject(position=(random.uniform(-900, 900), random.randint(0, 7) * 160 + 40)))
+        if i % 3 == 0:
+            _gameobject.add_component(components.hitbox_comp.HitBoxComponent((-4, -7), (10, 18)))
+        _rect_comp = _gameobject.add_component(components.rect_comp.WorldRectComponent((12, 20), has_sprite=False))
+        _rect_comp._velocity.xy = (random.uniform(-300, 300), random.uniform(-200, 100))
+    return _world, _aspect
+
+
+def run(body_store: bool, count: int) -> float:
+    """ Get the time per frame """
+    _world, _aspect = create_world(f"body_store_benchmark_{int(body_store)}_{count}", body_store, count)
+    _start = time.perf_counter()
+    for _ in range(FRAMES):
+        for _component in _world._physics_handler._components:
+            _component.update()
+        _aspect.handle(_world.camera)
+    return (time.perf_counter() - _start) / FRAMES
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    print(f"{'bodies':>8} {'per body':>14} {'body store':>14}")
+    for _count in BODY_COUNTS:
+        _plain = run(False, _count)
+        _store = run(True, _count)
+        print(f"{_count:>8} {_plain * 1000:>11.2f} ms {_store * 1000:>11.2f} ms   {_plain / _store:.1f}x")
@@ -0,0 +1,143 @@
+"""
+Chunk serialization benchmark -- pickle formats vs the binary chunk codec
+
+Run from the repository root:
+
+    python -m benchmarks.chunk_codec
+
+"""
+
+import benchmarks
+
+import dill
+import time
+import random
+import pickle
+
+from engine import singleton
+
+from engine.handler import world
+from engine.handler import chunkcodec
+
+from engine.addon import tiles
+
+from game.tiles import ladder
+
+# ---------------------------- #
+# constants
+
+CHUNK_COUNT = 200
+REPEATS = 5
+FILL_RATIO = 0.6
+
+SPRITES = [
+    "assets/test/screenshot.png",
+    "assets/sprites/entities/ladder.png",
+]
+ANIMATION = "assets/sprites/entities/player.json"
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+def create_tile(position: tuple) -> world.DefaultTile:
+    """ Create a random tile """
+    _roll = random.random()
+    if _roll < 0.8:
+        return world.DefaultTile(position, random.choice(SPRITES))
+    if _roll < 0.9:
+        return ladder.LadderTile(position)
+    if _roll < 0.98:
+        return tiles.SemiAnimatedTile(position, ANIMATION)
+    return tiles.AnimatedTile(position, ANIMATION, offset=random.randint(0, 3))
+
+
+def create_chunks(layer: world.Layer) -> list:
+    """ Create filled chunks -- returns [(chunk, legacy tile grid)] """
+    result = []
+    for i in range(CHUNK_COUNT):
+        _chunk = world.Chunk((i, 0))
+        layer.set_chunk_at(_chunk)
+        _grid = [[None] * singleton.DEFAULT_CHUNK_WIDTH for _ in range(singleton.DEFAULT_CHUNK_HEIGHT)]
+        for y in range(singleton.DEFAULT_CHUNK_HEIGHT):
+            for x in range(singleton.DEFAULT_CHUNK_WIDTH):
+                if random.random() > FILL_RATIO:
+                    continue
+                _tile = create_tile((x, y))
+                _grid[y][x] = _tile
+                _chunk.set_tile_at((x, y), _tile)
+        result.append((_chunk, _grid))
+    return result
+
+
+def benchmark(name: str, blobs: list, chunks: list):
+    """ Time decoding (+ applying) every blob into a fresh chunk """
+    _decode = _load = float("inf")
+    for _ in range(REPEATS):
+        _start = time.perf_counter()
+        for _blob in blobs:
+            world.decode_chunk_data(_blob)
+        _decode = min(_decode, time.perf_counter() - _start)
+
+        _layer = world.Layer(0)
+        _layer._world = chunks[0][0]._layer._world
+        _start = time.perf_counter()
+        for (_chunk, _), _blob in zip(chunks, blobs):
+            _new = world.Chunk(_chunk._chunk_position)
+            _layer.set_chunk_at(_new)
+            _new.apply_chunk_data(world.decode_chunk_data(_blob))
+        _load = min(_load, time.perf_counter() - _start)
+    _size = sum(len(_blob) for _blob in blobs)
+    print(f"{name:<24} {_size / len(blobs):>8.0f} B/chunk {_decode / len(blobs) * 1e6:>8.1f} us/chunk decode {_load / len(blobs) * 1e6:>8.1f} us/chunk load")
+    return _size, _decode
+
+
+def check_round_trip(layer: world.Layer):
+    """ Check that the binary codec keeps the tile classes, state + custom data """
+    _chunk = world.Chunk((-1, 0))
+    layer.set_chunk_at(_chunk)
+    _chunk.set_tile_at((0, 0), world.DefaultTile((0, 0), SPRITES[0]))
+    _custom = world.DefaultTile((1, 0), SPRITES[0])
+    _custom["custom"] = 5
+    _chunk.set_tile_at((1, 0), _custom)
+    _chunk.set_tile_at((2, 0), tiles.AnimatedTile((2, 0), ANIMATION))
+
+    _new = world.Chunk((-1, 0))
+    layer.set_chunk_at(_new)
+    _new.apply_chunk_data(world.decode_chunk_data(_chunk.serialize_chunk_data()))
+    for _position in ((0, 0), (1, 0), (2, 0)):
+        if type(_new.get_tile_at(_position)) is not type(_chunk.get_tile_at(_position)):
+            raise ValueError(f"round trip: tile class at {_position} changed")
+    if _new.get_tile_at((1, 0))["custom"] != 5:
+        raise ValueError("round trip: custom tile data was lost")
+    if _new.get_tile_at((2, 0))._animation_json_path != ANIMATION:
+        raise ValueError("round trip: tile codec state was lost")
+    layer.set_chunk_at(world.Chunk((-1, 0)))
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    random.seed(13)
+    _world = world.World("chunk_codec_benchmark")
+    check_round_trip(_world.get_layer_at(0))
+    _chunks = create_chunks(_world.get_layer_at(0))
+
+    # nested list of tiles (original chunk files)
+    _legacy = [pickle.dumps(_grid) for _, _grid in _chunks]
+    # palette dict (pickled `Chunk.get_chunk_data`)
+    _palette = [dill.dumps(_chunk.get_chunk_data()) for _chunk, _ in _chunks]
+    # binary chunk codec
+    _binary = [_chunk.serialize_chunk_data() for _chunk, _ in _chunks]
+
+    print(f"{CHUNK_COUNT} chunks of {singleton.DEFAULT_CHUNK_WIDTH}x{singleton.DEFAULT_CHUNK_HEIGHT}, {FILL_RATIO:.0%} filled")
+    _results = [
+        benchmark("pickle (tile lists)", _legacy, _chunks),
+        benchmark("pickle (palette dict)", _palette, _chunks),
+        benchmark("binary codec", _binary, _chunks),
+    ]
+    print(f"binary vs tile lists: {_results[0][0] / _results[2][0]:.1f}x smaller, {_results[0][1] / _results[2][1]:.1f}x faster decode")
+    print("(load = decode + applying the chunk, mostly sprite caching)")
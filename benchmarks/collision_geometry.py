@@ -0,0 +1,97 @@
+"""
+Collision geometry benchmark -- per tile resolve vs the merged solid rects
+
+Run from the repository root:
+
+    python -m benchmarks.collision_geometry
+
+"""
+
+import benchmarks
+
+import time
+import random
+import pygame
+
+from engine import singleton
+
+from engine.handler import world
+
+from engine.physics import phandler
+
+# ---------------------------- #
+# constants
+
+AREA = 128
+BODIES = 20000
+SPRITE = "assets/test/screenshot.png"
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+def create_level(layer: world.Layer):
+    """ Floors every 8 rows + a few walls """
+    _tile = world.DefaultTile((0, 0), SPRITE)
+    for y in range(4, AREA, 8):
+        layer.fill_rect((0, y, AREA, 2), _tile)
+    for x in range(0, AREA, 16):
+        layer.fill_rect((x, 0, 1, AREA), _tile)
+
+
+def resolve(rect: pygame.FRect, velocity: tuple, solids) -> pygame.FRect:
+    """ Move the rect + resolve it per axis (like `WorldRectAspect`) """
+    rect = pygame.FRect(rect)
+    rect.x += velocity[0]
+    for _solid in solids(rect):
+        if velocity[0] > 0:
+            rect.right = _solid.left
+        elif velocity[0] < 0:
+            rect.left = _solid.right
+    rect.y += velocity[1]
+    for _solid in solids(rect):
+        if velocity[1] > 0:
+            rect.bottom = _solid.top
+        elif velocity[1] < 0:
+            rect.top = _solid.bottom
+    return rect
+
+
+def run(name: str, bodies: list, solids) -> float:
+    """ Resolve every body once """
+    _start = time.perf_counter()
+    for _rect, _velocity in bodies:
+        resolve(_rect, _velocity, solids)
+    _result = time.perf_counter() - _start
+    print(f"{name:<32} {_result * 1000:>10.1f} ms")
+    return _result
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    random.seed(3)
+    _world = world.World("collision_geometry_benchmark")
+    _layer = _world.get_layer_at(0)
+    create_level(_layer)
+    _size = AREA * singleton.DEFAULT_TILE_WIDTH
+    # bodies resting on the floors, moving sideways
+    _bodies = []
+    for _ in range(BODIES):
+        _rect = pygame.FRect(random.uniform(0, _size), 0, 24, 32)
+        _rect.bottom = random.randrange(4, AREA, 8) * singleton.DEFAULT_TILE_HEIGHT
+        _bodies.append((_rect, (random.uniform(-8, 8), 4)))
+
+    _tiles = run("per tile", _bodies, lambda rect: (
+        _tile._rect for _tile in _layer.collide_tiles(rect)
+        if phandler.is_collision_masks_overlap(_tile._collision_mask, 1)
+    ))
+    _start = time.perf_counter()
+    for _chunk in _layer._chunks.values():
+        _chunk.get_collision_rects(1)
+    print(f"{'build merged rects':<32} {(time.perf_counter() - _start) * 1000:>10.1f} ms")
+    _merged = run("merged rects", _bodies, lambda rect: _layer.collide_solid_rects(rect, 1))
+    print(f"merged rects: {_tiles / _merged:.1f}x faster")
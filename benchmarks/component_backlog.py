@@ -0,0 +1,118 @@
+"""
+Component backlog benchmark -- the list backlog rescanned on every registration vs the indexed backlog
+
+Run from the repository root:
+
+    python -m benchmarks.component_backlog
+
+Every entity gets a tracked component (picked up by an aspect) and an untracked
+one (never targeted, so it stays in the backlog). Entities are spawned before
+the aspect is added and then again after it exists.
+
+"""
+
+import benchmarks
+
+import time
+
+from engine.handler import world
+from engine.handler import aspect
+from engine.handler import component
+
+from engine.physics import gameobject
+
+# ---------------------------- #
+# constants
+
+ENTITIES = 10000
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+class TrackedComponent(component.Component):
+    """ Targeted by the tracked aspect """
+    pass
+
+class UntrackedComponent(component.Component):
+    """ Never targeted by an aspect """
+    pass
+
+class TrackedAspect(aspect.Aspect):
+    """ Holds the tracked components """
+
+    def __init__(self):
+        """ Create a new Tracked Aspect """
+        super().__init__(target_component_classes=[TrackedComponent])
+
+
+class ListBacklogAspectHandler(aspect.AspectHandler):
+    """ The previous backlog -- a list, rescanned with `pop(index)` on every registration """
+
+    def __init__(self, _world: "World"):
+        """ Initialize the handler """
+        super().__init__(_world)
+        self._component_backlog = []
+
+    def register_component(self, component: "Component"):
+        """ Register a component """
+        component.__post_aspect__(self)
+        if component.__class__.__name__ not in self._aspect_targets:
+            self._component_backlog.append(component)
+            return
+        for _aspect in self._aspect_targets[component.__class__.__name__]:
+            _aspect.register_component(component)
+        index = 0
+        while index < len(self._component_backlog):
+            _comp = self._component_backlog[index]
+            if _comp.__class__.__name__ in self._aspect_targets:
+                for _aspect in self._aspect_targets[_comp.__class__.__name__]:
+                    _aspect.register_component(_comp)
+                self._component_backlog.pop(index)
+            else:
+                index += 1
+
+    def _drain_backlog(self, class_name: str):
+        """ The list backlog only drains on the next registration """
+        pass
+
+
+def spawn(_world: "World", count: int):
+    """ Spawn `count` entities with a tracked + untracked component """
+    for _ in range(count):
+        _gameobject = _world.add_gameobject(gameobject.GameObject(position=(0, 0)))
+        _gameobject.add_component(UntrackedComponent())
+        _gameobject.add_component(TrackedComponent())
+
+
+def run(name: str, handler_class: "AspectHandler Class") -> float:
+    """ Spawn before + after adding the aspect """
+    _world = world.World(f"component_backlog_benchmark_{name}")
+    _world._aspect_handler = handler_class(_world)
+    _aspect = TrackedAspect()
+
+    _start = time.perf_counter()
+    spawn(_world, ENTITIES)
+    _before = time.perf_counter() - _start
+    _world.add_aspect(_aspect)
+    _added = time.perf_counter() - _start - _before
+    spawn(_world, ENTITIES)
+    _total = time.perf_counter() - _start
+
+    if len(_aspect._components) != ENTITIES * 2:
+        raise ValueError(f"{name}: {len(_aspect._components)} tracked components registered")
+    print(f"{name:<16} {_before * 1000:>12.1f} ms {_added * 1000:>12.1f} ms {(_total - _before - _added) * 1000:>12.1f} ms {_total * 1000:>12.1f} ms")
+    return _total
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    print(f"{ENTITIES} entities per spawn")
+    print(f"{'backlog':<16} {'spawn before':>15} {'add aspect':>15} {'spawn after':>15} {'total':>15}")
+    _list = run("list", ListBacklogAspectHandler)
+    _indexed = run("indexed", aspect.AspectHandler)
+    print(f"indexed backlog: {_list / _indexed:.1f}x faster")
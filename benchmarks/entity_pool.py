@@ -0,0 +1,81 @@
+"""
+Entity pool benchmark -- projectiles created + torn down every wave vs parked in a `GameObjectPool`
+
+Run from the repository root:
+
+    python -m benchmarks.entity_pool
+
+Every wave spawns a burst of projectiles (gameobject + hitbox + world rect),
+updates one frame, kills all of them and handles the death signals.
+
+"""
+
+import benchmarks
+
+import time
+import pygame
+
+from engine.handler import signal
+from engine.handler import world
+
+from engine.physics import pool
+from engine.physics import gameobject
+
+from engine.addon.components import rect_comp
+from engine.addon.components import hitbox_comp
+
+# ---------------------------- #
+# constants
+
+PROJECTILES = 500
+WAVES = 100
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+def create_projectile(position: tuple) -> "GameObject":
+    """ Create a projectile gameobject """
+    _projectile = gameobject.GameObject(position=position)
+    _projectile.add_component(hitbox_comp.HitBoxComponent((-2, -2), (4, 4)))
+    _projectile.add_component(rect_comp.WorldRectComponent(area=(4, 4), has_sprite=False))
+    return _projectile
+
+
+def run(name: str, pooled: bool) -> float:
+    """ Get the time per wave """
+    _world = world.World(f"entity_pool_benchmark_{name}")
+    _world.add_aspect(hitbox_comp.HitboxAspect())
+    _world.add_aspect(rect_comp.WorldRectAspect())
+    _pool = pool.GameObjectPool(_world, create_projectile) if pooled else None
+
+    _start = time.perf_counter()
+    for _wave in range(WAVES):
+        if pooled:
+            _projectiles = [_pool.spawn((i % 50 * 8, _wave % 10 * 8)) for i in range(PROJECTILES)]
+        else:
+            _projectiles = [_world.add_gameobject(create_projectile(pygame.math.Vector2(i % 50 * 8, _wave % 10 * 8))) for i in range(PROJECTILES)]
+        _world._aspect_handler.handle(_world.camera)
+        for _projectile in _projectiles:
+            _projectile.kill()
+        signal.update_signals()
+    _total = (time.perf_counter() - _start) / WAVES
+
+    if _world._physics_handler._gameobjects:
+        raise ValueError(f"{name}: {len(_world._physics_handler._gameobjects)} gameobjects left alive")
+    print(f"{name:<16} {_total * 1000:>10.2f} ms")
+    if pooled:
+        print(f"{'':<16} {_pool.get_stats()}")
+    return _total
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    print(f"{WAVES} waves of {PROJECTILES} projectiles")
+    _plain = run("plain", False)
+    _pooled = run("pooled", True)
+    print(f"pooled: {_plain / _pooled:.1f}x faster")
@@ -0,0 +1,77 @@
+"""
+Bulk tile benchmark -- per cell `set_tile_at` / `get_tile_at` vs the bulk layer API
+
+Run from the repository root:
+
+    python -m benchmarks.tile_bulk
+
+"""
+
+import benchmarks
+
+import time
+import numpy as np
+
+from engine.handler import world
+
+# ---------------------------- #
+# constants
+
+AREA = 256
+SPRITES = [
+    "assets/test/screenshot.png",
+    "assets/sprites/entities/ladder.png",
+]
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+def timed(name: str, function) -> float:
+    """ Time a single call of `function` """
+    _start = time.perf_counter()
+    function()
+    _result = time.perf_counter() - _start
+    print(f"{name:<32} {_result * 1000:>10.1f} ms")
+    return _result
+
+
+# ---------------------------- #
+# cases
+
+def per_cell_fill(layer: world.Layer):
+    """ Fill the area one cell at a time """
+    for y in range(AREA):
+        for x in range(AREA):
+            layer.set_tile_at((x, y), world.DefaultTile((x, y), SPRITES[0]))
+
+def per_cell_get(layer: world.Layer):
+    """ Read the area one cell at a time """
+    for y in range(AREA):
+        for x in range(AREA):
+            layer.get_tile_at((x, y))
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    _world = world.World("tile_bulk_benchmark")
+    _coords = np.stack(np.meshgrid(np.arange(AREA), np.arange(AREA)), axis=-1).reshape(-1, 2)
+    _stamp = np.random.default_rng(7).integers(0, 3, (AREA, AREA))
+    _tiles = {1: world.DefaultTile((0, 0), SPRITES[0]), 2: world.DefaultTile((0, 0), SPRITES[1])}
+
+    print(f"{AREA}x{AREA} tiles")
+    _cell = timed("set_tile_at (per cell)", lambda: per_cell_fill(_world.get_layer_at(0)))
+    _fill = timed("fill_rect (new chunks)", lambda: _world.get_layer_at(1).fill_rect((0, 0, AREA, AREA), _tiles[1]))
+    timed("fill_rect (existing chunks)", lambda: _world.get_layer_at(1).fill_rect((0, 0, AREA, AREA), _tiles[2]))
+    timed("stamp", lambda: _world.get_layer_at(1).stamp(_stamp, (0, 0), _tiles))
+    _region = _world.get_layer_at(1).copy_region((0, 0, AREA, AREA))
+    timed("copy_region", lambda: _world.get_layer_at(1).copy_region((0, 0, AREA, AREA)))
+    timed("paste_region (other layer)", lambda: _world.get_layer_at(2).paste_region(_region, (0, 0)))
+    _get = timed("get_tile_at (per cell)", lambda: per_cell_get(_world.get_layer_at(1)))
+    _bulk_get = timed("get_tiles", lambda: _world.get_layer_at(1).get_tiles(_coords))
+    timed("get_tile_indices", lambda: _world.get_layer_at(1).get_tile_indices(_coords))
+    print(f"fill_rect: {_cell / _fill:.1f}x faster, get_tiles: {_get / _bulk_get:.1f}x faster")
@@ -0,0 +1,126 @@
+"""
+Tile memory benchmark -- bytes per placed tile, measured with tracemalloc
+
+Run from the repository root:
+
+    python -m benchmarks.tile_memory
+
+The "per cell objects" row rebuilds what a chunk used to hold for every cell:
+a tile object with a uuid hex id, its own FRect and a data dict with the pixel
+coords + parent chunk key.
+
+"""
+
+import benchmarks
+
+import gc
+import uuid
+import tracemalloc
+import pygame
+
+from engine import singleton
+
+from engine.handler import world
+
+# ---------------------------- #
+# constants
+
+TILE_COUNT = 64 * 64 * 4
+SPRITES = [
+    "assets/test/screenshot.png",
+    "assets/sprites/entities/ladder.png",
+]
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+class PerCellTile:
+    """ The tile layout that was stored for every cell """
+
+    def __init__(self, position: tuple, sprite: str) -> None:
+        self._tile_id = uuid.uuid4().hex
+        self._index_position = position
+        self._sprite_path = sprite
+        self._rect = pygame.FRect(
+            position[0] * singleton.DEFAULT_TILE_WIDTH,
+            position[1] * singleton.DEFAULT_TILE_HEIGHT,
+            singleton.DEFAULT_TILE_WIDTH,
+            singleton.DEFAULT_TILE_HEIGHT
+        )
+        self._collision_mask = 1
+        self._transparent = False
+        self._data = {
+            world.CHUNK_TILE_PIXEL_COORD: pygame.math.Vector2(position[0] * 16, position[1] * 16),
+            world.CHUNK_TILE_PARENT_POSITION_KEY: f"{position[0] // 8}=={position[1] // 8}",
+        }
+        self.__parent_class__ = world.DefaultTile
+
+
+def iterate_positions():
+    """ Iterate the tile positions """
+    _side = int(TILE_COUNT ** 0.5)
+    for i in range(TILE_COUNT):
+        yield (i % _side, i // _side)
+
+
+def measure(name: str, function) -> float:
+    """ Measure the bytes per tile that are still allocated after `function` """
+    gc.collect()
+    tracemalloc.start()
+    _before = tracemalloc.get_traced_memory()[0]
+    _keep = function()
+    gc.collect()
+    _after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    _result = (_after - _before) / TILE_COUNT
+    print(f"{name:<28} {_result:>8.1f} B/tile")
+    del _keep
+    return _result
+
+
+# ---------------------------- #
+# cases
+
+def place_per_cell_objects():
+    """ One tile object per cell """
+    return [PerCellTile(_position, SPRITES[_position[0] % 2]) for _position in iterate_positions()]
+
+
+def place_shared_tiles():
+    """ Palette indices -- all cells share the prototypes """
+    _layer = _world.get_layer_at(0)
+    for _position in iterate_positions():
+        _layer.set_tile_at(_position, world.DefaultTile(_position, SPRITES[_position[0] % 2]))
+    return _layer
+
+
+def place_stateful_tiles():
+    """ Every cell holds its own (slotted) tile object """
+    _layer = _world.get_layer_at(1)
+    for _position in iterate_positions():
+        _layer.set_tile_at(_position, world.DefaultTile(_position, SPRITES[_position[0] % 2]))
+    for _chunk in _layer._chunks.values():
+        for y, x in _chunk.get_filled_cells():
+            _chunk.materialize_tile_at((x, y))
+    return _layer
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    _world = world.World("tile_memory_benchmark")
+    # create the chunks + cache the sprites up front
+    place_shared_tiles()
+    place_stateful_tiles()
+    for _layer in (_world.get_layer_at(0), _world.get_layer_at(1)):
+        _layer._chunks.clear()
+
+    print(f"{TILE_COUNT} tiles")
+    _per_cell = measure("per cell objects", place_per_cell_objects)
+    _shared = measure("shared (palette index)", place_shared_tiles)
+    _stateful = measure("stateful (slotted object)", place_stateful_tiles)
+    print(f"shared: {_per_cell / _shared:.1f}x less memory, stateful: {_per_cell / _stateful:.1f}x less memory")
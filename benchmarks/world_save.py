@@ -0,0 +1,76 @@
+"""
+World save benchmark -- a full first save vs saving after a single tile edit
+
+Run from the repository root:
+
+    python -m benchmarks.world_save
+
+Only the dirty (or never stored) chunks are written, so the save after one
+edit writes a single chunk. The world is saved into a temporary level folder
+that is removed afterwards.
+
+"""
+
+import benchmarks
+
+import time
+import shutil
+import contextlib
+
+from engine import singleton
+
+from engine.handler import world
+
+# ---------------------------- #
+# constants
+
+CHUNKS_WIDE = 300
+CHUNKS_HIGH = 2
+REPEATS = 5
+SPRITE = "assets/test/screenshot.png"
+WORLD_KEY = "world_save_benchmark"
+
+# ---------------------------- #
+# setup
+
+benchmarks.setup()
+
+
+def create_world(key: str) -> world.World:
+    """ Create a world with `CHUNKS_WIDE * CHUNKS_HIGH` filled chunks """
+    result = world.World(key)
+    _layer = result.get_layer_at(0)
+    _tile = world.DefaultTile((0, 0), SPRITE)
+    for x in range(singleton.DEFAULT_CHUNK_WIDTH * CHUNKS_WIDE):
+        for y in range(0, singleton.DEFAULT_CHUNK_HEIGHT * CHUNKS_HIGH, 3):
+            _layer.set_tile_at((x, y), _tile)
+    return result
+
+
+def save(_world: world.World) -> float:
+    """ Save the world (quietly) -- returns the time taken """
+    with contextlib.redirect_stdout(None):
+        _start = time.perf_counter()
+        world.World.save_world(_world)
+        return time.perf_counter() - _start
+
+
+# ---------------------------- #
+# run
+
+if __name__ == "__main__":
+    _full = _edit = float("inf")
+    for i in range(REPEATS):
+        _key = f"{WORLD_KEY}_{i}"
+        try:
+            _world = create_world(_key)
+            _full = min(_full, save(_world))
+            _world.get_layer_at(0).set_tile_at((5, 5), world.DefaultTile((0, 0), SPRITE))
+            _edit = min(_edit, save(_world))
+            _chunks = len(_world.get_layer_at(0)._stored_chunk_keys)
+        finally:
+            shutil.rmtree(world.WORLD_LEVEL_FOLDER + _key, ignore_errors=True)
+    print(f"{_chunks} chunks")
+    print(f"{'full save':<24} {_full * 1000:>10.1f} ms")
+    print(f"{'save after 1 edit':<24} {_edit * 1000:>10.1f} ms")
+    print(f"save after 1 edit: {_full / _edit:.1f}x faster")
@@ -2,15 +2,6 @@ import os
 import sys
 import platform
 
-# TODO - figure out what to do when I compile this program (because that'll be quite a problem)
-if not os.environ.get("PYTHONHASHSEED"):
-    os.environ["PYTHONHASHSEED"] = "13"
-    
-    import subprocess
-    subprocess.run([sys.executable] + sys.argv)
-    sys.exit()
-    # os.execv(sys.executable, ['python'] + sys.argv)
-
 import dill
 import time
 import pickle
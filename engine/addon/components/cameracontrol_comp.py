@@ -84,7 +84,7 @@ class CameraControlAspect(aspect.Aspect):
         """ Handle the aspect """
         for _camera in self.iter_components():
             # update camera position to gameobject position
-            _camera._camera._rect.center = utils.lerp(_camera._camera._rect.center, _camera._parent_gameobject.position.xy, 0.1)
+            _camera._camera._rect.center = utils.lerp(_camera._camera._rect.center, _camera._parent_gameobject.get_render_position().xy, 0.1)
 
 
 # ---------------------------- #
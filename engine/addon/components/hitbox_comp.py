@@ -50,10 +50,19 @@ class HitBoxComponent(physics_comp.PhysicsComponent):
     def set_offset(self, offset: tuple):
         """ Set the offset """
         self._rect.topleft = offset
+        self.refresh_body()
     
     def set_area(self, area: tuple):
         """ Set the area """
         self._rect.size = area
+        self.refresh_body()
+
+    def refresh_body(self):
+        """ Let the world rect of the gameobject re-read the hitbox """
+        if not self._parent_gameobject:
+            return
+        if (_rect_comp := self._parent_gameobject.get_component(["WorldRectComponent"])):
+            _rect_comp.refresh_body()
 
 
 # ---------------------------- #
@@ -63,13 +72,19 @@ class HitBoxComponent(physics_comp.PhysicsComponent):
 class HitboxAspect(aspect.Aspect):
     def __init__(self):
         """ Create a new Hit Box Aspect """
-        super().__init__(target_component_classes=[HitBoxComponent])
+        # only holds the hitboxes
+        super().__init__(target_component_classes=[HitBoxComponent], reads=[], writes=[])
 
 
 class HitBoxDebugAspect(aspect.Aspect):
     def __init__(self):
         """ Create a new Hit Box Debug Aspect """
-        super().__init__(target_component_classes=[HitBoxComponent])
+        super().__init__(
+            target_component_classes=[HitBoxComponent],
+            reads=[HitBoxComponent, aspect.RESOURCE_GAMEOBJECTS],
+            writes=[aspect.RESOURCE_LAYER_BUFFERS],
+            debug=True,
+        )
     
     # ---------------------------- #
     # logic
@@ -78,7 +78,11 @@ class LineComponent(component.Component):
 class LineAspect(aspect.Aspect):
 
     def __init__(self):
-        super().__init__(target_component_classes=[LineComponent])
+        super().__init__(
+            target_component_classes=[LineComponent],
+            reads=[hitbox_comp.HitBoxComponent, aspect.RESOURCE_GAMEOBJECTS, aspect.RESOURCE_TILES],
+            writes=[LineComponent, aspect.RESOURCE_LAYER_BUFFERS],
+        )
         self._hitbox_aspect = None
         self._world = None
     
@@ -162,7 +166,11 @@ class LineAspect(aspect.Aspect):
 class LineDebugAspect(aspect.Aspect):
 
     def __init__(self):
-        super().__init__(target_component_classes=[LineComponent])
+        super().__init__(
+            target_component_classes=[LineComponent],
+            reads=[LineComponent, aspect.RESOURCE_GAMEOBJECTS],
+            writes=[aspect.RESOURCE_LAYER_BUFFERS],
+        )
     
     # ---------------------------- #
     # logic
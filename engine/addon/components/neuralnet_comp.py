@@ -57,7 +57,8 @@ class NeuralNetComponent(component.Component):
 
 class NeuralNetAspect(aspect.Aspect):
     def __init__(self, config_path: str):
-        super().__init__(target_component_classes=[NeuralNetComponent])
+        # no reads / writes -- the fitness functions are user code, so it runs alone
+        super().__init__(target_component_classes=[NeuralNetComponent], fixed_step=True)
 
         # load neural net
         self._config_path = config_path
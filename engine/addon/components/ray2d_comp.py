@@ -53,14 +53,20 @@ class Ray2DComponent(line_comp.LineComponent):
 class Ray2DAspect(aspect.Aspect):
 
     def __init__(self):
-        super().__init__(target_component_classes=[Ray2DComponent])
+        super().__init__(
+            target_component_classes=[Ray2DComponent],
+            reads=[rect_comp.WorldRectComponent, hitbox_comp.HitBoxComponent, aspect.RESOURCE_GAMEOBJECTS, aspect.RESOURCE_TILES],
+            writes=[Ray2DComponent],
+            fixed_step=True,
+        )
     
     def __post_init__(self):
         """ Post init function """
         # grab the hitbox component
         self._hitbox_aspect = self._handler.get_aspect(hitbox_comp.HitboxAspect)
-        self._rect_aspect = self._handler.get_aspect(rect_comp.WorldRectAspect)
         self._world = self._handler._world
+        # entity cast targets -- does not depend on the rect aspect being added first
+        self._bodies = self._world.query(rect_comp.WorldRectComponent)
 
     # ---------------------------- #
     # logic
@@ -77,33 +83,21 @@ class Ray2DAspect(aspect.Aspect):
             _comp._cast_end = _comp.get_start() + _comp._n_direction * _comp._magnitude
 
             if _comp._tile_cast:
-                _current_chunk_coords = world.get_chunk_from_pixel_position(_comp.get_start() + _gameobject.position)
                 _current_pos = _comp.get_start() + _gameobject.position
-                _travel = 0
                 _comp._cast_end.xy = _comp._start + _comp._n_direction * _comp._magnitude + _gameobject.position
 
-                while _travel < _comp._magnitude:
-                    # check current tile
-                    _tilecoords = world.pixel_to_tile_coords(_current_pos)
-                    _ctile = _layer.get_tile_at(_tilecoords)
-
-                    # check if tile exists / if a collision exists
-                    if _ctile is not None:
-                        _comp._collidedtiles.append(_ctile)
-                        _comp._cast_end.xy = _current_pos
-                        _travel = _comp._magnitude + 1e9
-                        break
-                    
-                    # else move the current position
-                    _current_pos += _comp._n_direction * singleton.DEFAULT_TILE_WIDTH * 0.5
-                    _travel += singleton.DEFAULT_TILE_WIDTH * 0.5
+                # walk the cells on the ray (answered from the chunk occupancy bitmaps)
+                _hit = _layer.raycast_mask(_current_pos, _comp._cast_end, world.ALL_COLLISION_MASK)
+                if _hit is not None:
+                    _comp._collidedtiles.append(_layer.get_tile_at(_hit[0]))
+                    _comp._cast_end.xy = _hit[1]
                 
             if _comp._entity_cast:
                 # TODO - optimize later -- REWRITE
                 _closest = None
                 _closest_distance = 1e9
 
-                for rect in self._rect_aspect.iter_components():
+                for rect, in self._bodies:
                     # check if self
                     if rect.get_gameobject()._id == _gameobject._id:
                         continue
@@ -126,7 +120,12 @@ class Ray2DAspect(aspect.Aspect):
 
 class Ray2DDebugAspect(aspect.Aspect):
     def __init__(self):
-        super().__init__(priority=-1, target_component_classes=[Ray2DComponent])
+        super().__init__(
+            priority=-1, 
+            target_component_classes=[Ray2DComponent],
+            reads=[Ray2DComponent, aspect.RESOURCE_GAMEOBJECTS],
+            writes=[aspect.RESOURCE_LAYER_BUFFERS],
+        )
     
     # ---------------------------- #
     # logic
@@ -8,6 +8,7 @@ from engine.handler import aspect
 from engine.handler import component
 
 from engine.physics import phandler
+from engine.physics import bodystore
 
 from engine.addon.components import sprite_comp
 from engine.addon.components import mask_comp
@@ -36,6 +37,10 @@ class WorldRectComponent(physics_comp.PhysicsComponent):
 
         self._has_hitbox = False
         self._hitbox = None
+
+        # set when the aspect keeps the physics state in a body store
+        self._body_store = None
+        self._body_slot = -1
     
     def __post_gameobject__(self, gameobject: "GameObject"):
         """ Post init function """
@@ -58,6 +63,33 @@ class WorldRectComponent(physics_comp.PhysicsComponent):
     
     # ---------------------------- #
     # logic
+
+    def set_position(self, position: tuple):
+        """ Move the gameobject (center) without colliding """
+        _gameobject = self._parent_gameobject
+        if world.get_chunk_from_pixel_position(_gameobject.position) != world.get_chunk_from_pixel_position(position):
+            _gameobject._parent_phandler.update_gameobject_chunk(_gameobject, position)
+        _gameobject.position.xy = position
+        self._rect.center = _gameobject.position
+        self.refresh_body()
+
+    def set_mask_value(self, mask_index: int, value: bool):
+        """ Set the mask value """
+        super().set_mask_value(mask_index, value)
+        self.refresh_body()
+
+    def __pool_reset__(self):
+        """ Drop the motion of the last life + move to the gameobject """
+        self._velocity.xy = (0, 0)
+        self._acceleration.xy = (0, 0)
+        self._force.xy = (0, 0)
+        self._touching[:] = [False, False, False, False]
+        self._rect.center = self._parent_gameobject.position
+
+    def refresh_body(self):
+        """ Re-read the rect + mask into the body store (after the hitbox / rect was changed) """
+        if getattr(self, "_body_store", None):
+            self._body_store.refresh_body(self)
     
     def get_hitbox(self) -> "hitbox_comp.HitboxComponent":
         """ Get the hitbox component """
@@ -86,10 +118,47 @@ class WorldRectComponent(physics_comp.PhysicsComponent):
 # aspect
 
 class WorldRectAspect(aspect.Aspect):
-    def __init__(self):
-        """ Create a new World Rect Aspect """
-        super().__init__(priority=3, target_component_classes=[WorldRectComponent])
+    def __init__(self, body_store: bool = None):
+        """ 
+        Create a new World Rect Aspect
+
+        body_store = keep the physics state of all bodies in a structure of arrays
+        store + step them with array operations (default: `singleton.PHYSICS_BODY_STORE`)
+        """
+        super().__init__(priority=3, target_component_classes=[WorldRectComponent], fixed_step=True)
+
+        if body_store is None:
+            body_store = singleton.PHYSICS_BODY_STORE
+        self._body_store = bodystore.BodyStore() if body_store else None
+        # registered before their gameobject set them up -- added on the next access
+        self._pending_bodies = []
     
+    # ---------------------------- #
+    # body store
+
+    def get_body_store(self) -> "bodystore.BodyStore":
+        """ Get the body store (None when the components hold their own state) """
+        if self._body_store is None:
+            return None
+        while self._pending_bodies:
+            _rect_comp = self._pending_bodies.pop()
+            if _rect_comp.get_component_id() in self._components and _rect_comp._body_store is None:
+                self._body_store.add_body(_rect_comp)
+        return self._body_store
+
+    def register_component(self, component: "Component"):
+        """ Register a component """
+        super().register_component(component)
+        if self._body_store is not None:
+            self._pending_bodies.append(component)
+
+    def _remove_component_by_id(self, component_id: int):
+        """ Remove a component by id """
+        _rect_comp = self._components.get(component_id)
+        if _rect_comp is not None and getattr(_rect_comp, "_body_store", None):
+            self._body_store.remove_body(_rect_comp)
+        super()._remove_component_by_id(component_id)
+
     # ---------------------------- #
     # logic
 
@@ -106,7 +175,6 @@ class WorldRectAspect(aspect.Aspect):
             _rect_comp._rect.topleft,
             _rect_comp._area
         )
-        _center_chunk = world.get_chunk_from_pixel_position(_gameobject.position)
         
         _rect_comp._touching[0] = False
         _rect_comp._touching[1] = False
@@ -115,57 +183,35 @@ class WorldRectAspect(aspect.Aspect):
 
         # x-axis movement
         _tentative_rect.x += _rect_comp._velocity.x * singleton.DELTA_TIME
-        for dx, dy in singleton.ITER_CHUNK_3x3:
-            cx, cy = _center_chunk[0] + dx, _center_chunk[1] + dy
-            # get chunk
-            if (_chunk := _layer.get_chunk_at((cx, cy))) == None:
-                continue
-            # check if gameobject even contact with chunk
-            if not phandler.collide_rect_to_rect(_tentative_rect, _chunk._chunk_rect):
-                continue
-
-            # check if gameobject collides with any tiles in chunk
-            for _collided_tile in _chunk.collide_tiles(_tentative_rect):
-                if not phandler.is_collision_masks_overlap(_collided_tile._collision_mask, _rect_comp._collision_mask):
-                    continue
-                
-                if _rect_comp._velocity.x > 0:
-                    _tentative_rect.right = _collided_tile._rect.left
-                    _rect_comp._velocity.x = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_RIGHT] = True
-                elif _rect_comp._velocity.x < 0:
-                    _tentative_rect.left = _collided_tile._rect.right
-                    _rect_comp._velocity.x = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_LEFT] = True
-
-                _collided_tile.on_collision(_gameobject)
+        # tiles with collision callbacks that were touched
+        for _collided_tile in _layer.collide_callback_tiles(_tentative_rect, _rect_comp._collision_mask):
+            _collided_tile.on_collision(_gameobject)
+        # resolve against the merged solid rects of the overlapped chunks
+        for _solid in _layer.collide_solid_rects(_tentative_rect, _rect_comp._collision_mask):
+            if _rect_comp._velocity.x > 0:
+                _tentative_rect.right = _solid.left
+                _rect_comp._velocity.x = 0
+                _rect_comp._touching[physics_comp.TOUCHING_RIGHT] = True
+            elif _rect_comp._velocity.x < 0:
+                _tentative_rect.left = _solid.right
+                _rect_comp._velocity.x = 0
+                _rect_comp._touching[physics_comp.TOUCHING_LEFT] = True
         
         # y-axis movement
         _tentative_rect.y += _rect_comp._velocity.y * singleton.DELTA_TIME
-        for dx, dy in singleton.ITER_CHUNK_3x3:
-            cx, cy = _center_chunk[0] + dx, _center_chunk[1] + dy
-            # get chunk
-            if (_chunk := _layer.get_chunk_at((cx, cy))) == None:
-                continue
-            # check if gameobject even contact with chunk
-            if not phandler.collide_rect_to_rect(_tentative_rect, _chunk._chunk_rect):
-                continue
-
-            # check if gameobject collides with any tiles in chunk
-            for _collided_tile in _chunk.collide_tiles(_tentative_rect):
-                if not phandler.is_collision_masks_overlap(_collided_tile._collision_mask, _rect_comp._collision_mask):
-                    continue
-
-                if _rect_comp._velocity.y > 0:
-                    _tentative_rect.bottom = _collided_tile._rect.top
-                    _rect_comp._velocity.y = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_BOTTOM] = True
-                elif _rect_comp._velocity.y < 0:
-                    _tentative_rect.top = _collided_tile._rect.bottom
-                    _rect_comp._velocity.y = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_TOP] = True
-
-                _collided_tile.on_collision(_gameobject)
+        # tiles with collision callbacks that were touched
+        for _collided_tile in _layer.collide_callback_tiles(_tentative_rect, _rect_comp._collision_mask):
+            _collided_tile.on_collision(_gameobject)
+        # resolve against the merged solid rects of the overlapped chunks
+        for _solid in _layer.collide_solid_rects(_tentative_rect, _rect_comp._collision_mask):
+            if _rect_comp._velocity.y > 0:
+                _tentative_rect.bottom = _solid.top
+                _rect_comp._velocity.y = 0
+                _rect_comp._touching[physics_comp.TOUCHING_BOTTOM] = True
+            elif _rect_comp._velocity.y < 0:
+                _tentative_rect.top = _solid.bottom
+                _rect_comp._velocity.y = 0
+                _rect_comp._touching[physics_comp.TOUCHING_TOP] = True
 
         # add acceleration again
         _rect_comp._velocity += _rect_comp._acceleration * 0.5 * singleton.DELTA_TIME
@@ -191,7 +237,6 @@ class WorldRectAspect(aspect.Aspect):
             _hitbox._rect.topleft + _gameobject.position,
             _hitbox._rect.size
         )
-        _center_chunk = world.get_chunk_from_pixel_position(_gameobject.position)
         
         _rect_comp._touching[0] = False
         _rect_comp._touching[1] = False
@@ -200,86 +245,71 @@ class WorldRectAspect(aspect.Aspect):
 
         # x-axis movement
         _tentative_rect.x += _rect_comp._velocity.x * singleton.DELTA_TIME
-        for dx, dy in singleton.ITER_CHUNK_3x3:
-            cx, cy = _center_chunk[0] + dx, _center_chunk[1] + dy
-            # get chunk
-            if (_chunk := _layer.get_chunk_at((cx, cy))) == None:
-                continue
-            # check if gameobject even contact with chunk
-            if not phandler.collide_rect_to_rect(_tentative_rect, _chunk._chunk_rect):
-                continue
-
-            # check if gameobject collides with any tiles in chunk
-            for _collided_tile in _chunk.collide_tiles(_tentative_rect):
-                if not phandler.is_collision_masks_overlap(_collided_tile._collision_mask, _rect_comp._collision_mask):
-                    continue
-
-                _collided_tile.on_collision(_gameobject)
-                if _collided_tile._transparent:
-                    continue
-                
-                if _rect_comp._velocity.x > 0:
-                    _tentative_rect.right = _collided_tile._rect.left
-                    _rect_comp._velocity.x = 0
-                    _rect_comp._acceleration.x = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_RIGHT] = True
-                elif _rect_comp._velocity.x < 0:
-                    _tentative_rect.left = _collided_tile._rect.right
-                    _rect_comp._velocity.x = 0
-                    _rect_comp._acceleration.x = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_LEFT] = True
+        # tiles with collision callbacks that were touched
+        for _collided_tile in _layer.collide_callback_tiles(_tentative_rect, _rect_comp._collision_mask):
+            _collided_tile.on_collision(_gameobject)
+        # resolve against the merged solid rects of the overlapped chunks
+        for _solid in _layer.collide_solid_rects(_tentative_rect, _rect_comp._collision_mask):
+            if _rect_comp._velocity.x > 0:
+                _tentative_rect.right = _solid.left
+                _rect_comp._velocity.x = 0
+                _rect_comp._acceleration.x = 0
+                _rect_comp._touching[physics_comp.TOUCHING_RIGHT] = True
+            elif _rect_comp._velocity.x < 0:
+                _tentative_rect.left = _solid.right
+                _rect_comp._velocity.x = 0
+                _rect_comp._acceleration.x = 0
+                _rect_comp._touching[physics_comp.TOUCHING_LEFT] = True
                 
         # y-axis movement
         _tentative_rect.y += _rect_comp._velocity.y * singleton.DELTA_TIME
-        for dx, dy in singleton.ITER_CHUNK_3x3:
-            cx, cy = _center_chunk[0] + dx, _center_chunk[1] + dy
-            # get chunk
-            if (_chunk := _layer.get_chunk_at((cx, cy))) == None:
-                continue
-            # check if gameobject even contact with chunk
-            if not phandler.collide_rect_to_rect(_tentative_rect, _chunk._chunk_rect):
-                continue
-
-            # check if gameobject collides with any tiles in chunk
-            for _collided_tile in _chunk.collide_tiles(_tentative_rect):
-                if not phandler.is_collision_masks_overlap(_collided_tile._collision_mask, _rect_comp._collision_mask):
-                    continue
-                
-                _collided_tile.on_collision(_gameobject)
-                if _collided_tile._transparent:
-                    continue
-                
-                if _rect_comp._velocity.y > 0:
-                    _tentative_rect.bottom = _collided_tile._rect.top
-                    _rect_comp._velocity.y = 0
-                    _rect_comp._acceleration.y = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_BOTTOM] = True
-                elif _rect_comp._velocity.y < 0:
-                    _tentative_rect.top = _collided_tile._rect.bottom
-                    _rect_comp._velocity.y = 0
-                    _rect_comp._acceleration.y = 0
-                    _rect_comp._touching[physics_comp.TOUCHING_TOP] = True
+        # tiles with collision callbacks that were touched
+        for _collided_tile in _layer.collide_callback_tiles(_tentative_rect, _rect_comp._collision_mask):
+            _collided_tile.on_collision(_gameobject)
+        # resolve against the merged solid rects of the overlapped chunks
+        for _solid in _layer.collide_solid_rects(_tentative_rect, _rect_comp._collision_mask):
+            if _rect_comp._velocity.y > 0:
+                _tentative_rect.bottom = _solid.top
+                _rect_comp._velocity.y = 0
+                _rect_comp._acceleration.y = 0
+                _rect_comp._touching[physics_comp.TOUCHING_BOTTOM] = True
+            elif _rect_comp._velocity.y < 0:
+                _tentative_rect.top = _solid.bottom
+                _rect_comp._velocity.y = 0
+                _rect_comp._acceleration.y = 0
+                _rect_comp._touching[physics_comp.TOUCHING_TOP] = True
 
         # add acceleration again
         _rect_comp._velocity += _rect_comp._acceleration * 0.5 * singleton.DELTA_TIME
 
         # update final coordinates
-        _gameobject.position.xy  = (
+        _new_position = (
             _tentative_rect.x - _hitbox._rect.x,
             _tentative_rect.y - _hitbox._rect.y
         )
+        if world.get_chunk_from_pixel_position(_gameobject.position) != world.get_chunk_from_pixel_position(_new_position):
+            _world._physics_handler.update_gameobject_chunk(_gameobject, _new_position)
+        _gameobject.position.xy = _new_position
         _rect_comp._rect.center = _gameobject.position
 
     def handle(self, camera: "Camera"):
         """ Handle the aspect """
         _world = self._handler._world
 
+        if self._body_store is not None:
+            self.get_body_store().step(_world)
+            return
+
         for _rect_comp in self.iter_components():
-            # check if rect to rect or bitmask to rect
-            if _rect_comp._has_hitbox:
-                self.handle_hitbox(_world, _rect_comp)
-            else:
-                self.handle_rect(_world, _rect_comp)
+            # distant gameobjects are simulated less often (or frozen)
+            _delta = _world._simulation.get_gameobject_delta(_rect_comp.get_gameobject())
+            if _delta is not None:
+                with world.override_delta_time(_delta):
+                    # check if rect to rect or bitmask to rect
+                    if _rect_comp._has_hitbox:
+                        self.handle_hitbox(_world, _rect_comp)
+                    else:
+                        self.handle_rect(_world, _rect_comp)
             
             # reset acceleration
             _rect_comp._acceleration.xy = (0, 0)
@@ -289,7 +319,13 @@ class WorldRectDebugAspect(aspect.Aspect):
 
     def __init__(self):
         """ Create a new World Rect Debug Aspect """
-        super().__init__(priority=1, target_component_classes=[WorldRectComponent])
+        super().__init__(
+            priority=1, 
+            target_component_classes=[WorldRectComponent],
+            reads=[WorldRectComponent, aspect.RESOURCE_GAMEOBJECTS],
+            writes=[aspect.RESOURCE_LAYER_BUFFERS],
+            debug=True,
+        )
     
     # ---------------------------- #
     # logic
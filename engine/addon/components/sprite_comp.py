@@ -42,9 +42,9 @@ class SpriteComponent(renderable_comp.RenderableComponent):
         
         if self._sprite_str:
             self.set_sprite_str(self._sprite_str)
-        if gameobject.get_component(animation_comp.COMPONENT_NAME):
+        if (_animation_comp := gameobject.get_component(animation_comp.COMPONENT_NAME)):
             self._is_animation = True 
-            self._animation_comp = gameobject.get_component(animation_comp.COMPONENT_NAME)
+            self._animation_comp = _animation_comp
 
     # ---------------------------- #
     # logic
@@ -66,7 +66,7 @@ class SpriteRendererAspect(aspect.Aspect):
             #     round(_gameobject.position.x - camera.position.x - _sprite_comp._sprite_rect.centerx),
             #     round(_gameobject.position.y - camera.position.y - _sprite_comp._sprite_rect.centery)
             # )
-            _position = _gameobject.position - camera.position - _sprite_comp._sprite_rect.center
+            _position = _gameobject.get_render_position() - camera.position - _sprite_comp._sprite_rect.center
             _layer_surface.blit(_sprite, _position)
 
 
@@ -74,7 +74,12 @@ class SpriteRendererDebugAspect(aspect.Aspect):
 
     def __init__(self):
         """ Create a new Sprite Renderer Debug Aspect """
-        super().__init__(target_component_classes=[SpriteRendererComponent])
+        super().__init__(
+            target_component_classes=[SpriteRendererComponent],
+            reads=[SpriteRendererComponent, renderable_comp.RenderableComponent, aspect.RESOURCE_GAMEOBJECTS],
+            writes=[aspect.RESOURCE_LAYER_BUFFERS],
+            debug=True,
+        )
     
     # ---------------------------- #
     # logic
@@ -91,7 +96,7 @@ class SpriteRendererDebugAspect(aspect.Aspect):
             _layer_surface = _gameobject._parent_phandler._world._layers[_gameobject.zlayer]._layer_buffer
             
             # render rect into world
-            _pos = _gameobject.position - camera.position - _sprite_comp._sprite_rect.center
+            _pos = _gameobject.get_render_position() - camera.position - _sprite_comp._sprite_rect.center
             pygame.draw.rect(
                 _layer_surface,
                 (255, 0, 0), 
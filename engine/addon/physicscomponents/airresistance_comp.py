@@ -47,6 +47,11 @@ class AirResistanceComponent(physicscomponent.PhysicsComponent):
     
     def update(self):
         """ Updates the handler using the component """
+        if (_store := self._rect_aspect.get_body_store()) is not None:
+            # make sure not touching ground
+            _airborne = ~_store._touching[:_store._count, physics_comp.TOUCHING_BOTTOM]
+            _store._acceleration[:_store._count][_airborne] -= _store._velocity[:_store._count][_airborne] * 0.3
+            return
         for _rect_comp in self._rect_aspect.iter_components():
 
             # make sure not touching ground
@@ -1,6 +1,8 @@
 import math
 import pygame
 
+import numpy as np
+
 from engine import utils
 from engine import singleton
 
@@ -51,6 +53,11 @@ class FrictionComponent(physicscomponent.PhysicsComponent):
         static_blend = math.pow(self._static, singleton.DELTA_TIME * 4)
         dynamic_blend = math.pow(self._dynamic, singleton.DELTA_TIME * 4)
         # print(static_blend, dynamic_blend)
+        if (_store := self._rect_aspect.get_body_store()) is not None:
+            _velocity = _store._velocity[:_store._count, 0]
+            _grounded = _store._touching[:_store._count, physics_comp.TOUCHING_BOTTOM]
+            _velocity *= np.where(_grounded, np.where(np.abs(_velocity) > 50, dynamic_blend, static_blend), 1)
+            return
         for _rect_comp in self._rect_aspect.iter_components():
             if _rect_comp._touching[physics_comp.TOUCHING_BOTTOM]:
                 if abs(_rect_comp._velocity.x) > 50:
@@ -47,6 +47,9 @@ class GravityComponent(physicscomponent.PhysicsComponent):
         # rotate gravity by 1 degree
         # self._gravity.rotate_ip(1)
         
+        if (_store := self._rect_aspect.get_body_store()) is not None:
+            _store._acceleration[:_store._count] += tuple(self._gravity)
+            return
         for _rect_comp in self._rect_aspect.iter_components():
             _rect_comp._acceleration += self._gravity
 
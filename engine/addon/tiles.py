@@ -5,6 +5,7 @@ from engine import singleton
 
 from engine.handler import world
 from engine.handler import signal
+from engine.handler import chunkcodec
 
 from engine.graphics import animation
 from engine.graphics import spritesheet
@@ -34,6 +35,22 @@ class SemiAnimatedTile(world.DefaultTile):
         
     # ---------------------------- #
     # logic
+
+    def get_palette_key(self) -> tuple:
+        """ Get the palette key - the sprite path changes every frame """
+        return (self.__class__, self._animation_json_path, self._collision_mask, self._transparent)
+
+    def get_codec_state(self) -> tuple:
+        """ Get the codec state """
+        return (self._animation_json_path,)
+
+    def set_codec_state(self, state: tuple):
+        """ Set the codec state """
+        self.__parent_class__ = self.__class__
+        self._animation_json_path = state[0]
+        self._animation_registry = None
+        self._signal_function_registry_key = state[0] + "||" + SYNCED_TILE_ANIMATION
+        self._sprite_path = None
     
     def __post_init__(self, chunk: "world.Chunk"):
         """ Post init """
@@ -88,6 +105,10 @@ def update_synced_sprite_animations(data: dict, **kwargs):
 # animated - dynamic tiles
 
 class AnimatedTile(world.DefaultTile):
+
+    # every tile has its own animation registry
+    _stateful = True
+
     def __init__(self, position: tuple, sprite: str, offset: int = 0) -> None:
         self.__parent_class__ = self.__class__
         
@@ -123,6 +144,19 @@ class AnimatedTile(world.DefaultTile):
         """ Update the tile """
         self._animation_registry.update()
         self._sprite_path = self._animation_registry.sprite_path
+
+    def get_codec_state(self) -> tuple:
+        """ Get the codec state """
+        return (self._animation_json_path, self._animation_registry._frame)
+
+    def set_codec_state(self, state: tuple):
+        """ Set the codec state """
+        self.__parent_class__ = self.__class__
+        self._animation_json_path = state[0]
+        self._animation_registry = animation.load_animation_from_json(self._animation_json_path).get_registry()
+        self._animation_registry.compile_layers = True
+        self._animation_registry._frame = state[1]
+        self._sprite_path = None
     
     # ---------------------------- #
     # serialization
@@ -136,6 +170,10 @@ class AnimatedTile(world.DefaultTile):
         """ Set state """
         super().__setstate__(state)
         # update all sprites
-        
-    
 
+
+# ---------------------------- #
+# chunk codec
+
+chunkcodec.register_tile_class(SemiAnimatedTile, 2, "s")
+chunkcodec.register_tile_class(AnimatedTile, 3, "sH")
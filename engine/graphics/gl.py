@@ -3,6 +3,7 @@ import pygame
 from array import array
 
 from engine import io
+from engine import profiler
 from engine import singleton
 
 from engine.handler import signal
@@ -112,14 +113,15 @@ class GLContext:
     @classmethod
     def render_to_opengl_window(cls, sprite: pygame.Surface, _shader: str, _vao: str, variables: dict = {}):
         """ Render a sprite to the opengl window """
-        singleton.CONTEXT.screen.use()
-        a_shader = shader.load_shader(_shader)
-        tex = surface_to_texture(sprite)
-        tex.use(0)
-        for key, value in variables.items():
-            a_shader[key] = value
-        a_shader.load_quad_vertexarray(_vao).render(mode=moderngl.TRIANGLE_STRIP)
-        tex.release()
+        with profiler.scope("gl upload", category="gl"):
+            singleton.CONTEXT.screen.use()
+            a_shader = shader.load_shader(_shader)
+            tex = surface_to_texture(sprite)
+            tex.use(0)
+            for key, value in variables.items():
+                a_shader[key] = value
+            a_shader.load_quad_vertexarray(_vao).render(mode=moderngl.TRIANGLE_STRIP)
+            tex.release()
     
     @classmethod
     def render_to_framebuffer(cls, framebuffer, _shader: str, _vao: str, variables: dict = {}, work_group_size: tuple = (8, 8, 8)):
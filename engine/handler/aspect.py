@@ -1,11 +1,23 @@
 
 
 
+import time
+import concurrent.futures
+
+from engine import profiler
+from engine import singleton
+
+
 # ---------------------------- #
 # constants
 
 ASPECT_CACHE = {}
 
+# shared state that is not a component -- used in aspect reads / writes
+RESOURCE_GAMEOBJECTS = "_gameobjects"
+RESOURCE_TILES = "_tiles"
+RESOURCE_LAYER_BUFFERS = "_layer_buffers"
+
 # ---------------------------- #
 # aspect handler
 
@@ -19,8 +31,17 @@ class AspectHandler:
         self._aspects = []
         self._world = _world
         self._aspect_targets: {"Component Class": ["Aspect Instance"]} = {}
+
+        # {(fixed step filter, debug): [aspects]} -- the aspects that run, in priority order
+        self._active_aspects = {}
+        # {(fixed step filter, debug): [[aspects]]} -- aspects in a layer do not conflict, layers run in order
+        self._schedules = {}
+        self._executor = None
+        # staggers the throttled aspects
+        self._next_tick_phase = 0
     
-        self._component_backlog = []
+        # components waiting for an aspect -- {class name: {component id: component}}
+        self._component_backlog: {str: {int: "Component"}} = {}
     
     def __post_init__(self):
         """ Post init function """
@@ -32,10 +53,74 @@ class AspectHandler:
     # ---------------------------- #
     # logic
 
-    def handle(self, camera: "Camera"):
-        """ Handle all the aspects """
-        for aspect in self._aspects:
-            aspect.handle(camera)
+    def handle(self, camera: "Camera", fixed_step: bool = None):
+        """ Handle the aspects -- only the fixed step (or only the other) aspects if `fixed_step` is given """
+        if not singleton.PARALLEL_ASPECTS:
+            # serial -- priority order on the main thread
+            for aspect in self.get_active_aspects(fixed_step):
+                handle_aspect(aspect, camera)
+            return
+        for _layer in self.get_schedule(fixed_step):
+            if len(_layer) == 1:
+                handle_aspect(_layer[0], camera)
+                continue
+            # the first aspect runs on the main thread
+            _futures = [self.get_executor().submit(handle_aspect, aspect, camera) for aspect in _layer[1:]]
+            try:
+                handle_aspect(_layer[0], camera)
+            finally:
+                concurrent.futures.wait(_futures)
+            for _future in _futures:
+                _future.result()
+
+    def get_active_aspects(self, fixed_step: bool = None) -> list:
+        """ 
+        Get the aspects that run, in priority order -- rebuilt when the aspects change
+
+        Disabled aspects + debug aspects (without `singleton.DEBUG`) are left out.
+        With `fixed_step` only the fixed step (or only the other) aspects are kept.
+        """
+        _key = (fixed_step, singleton.DEBUG)
+        if _key not in self._active_aspects:
+            self._active_aspects[_key] = [aspect for aspect in self._aspects if is_aspect_active(aspect, fixed_step)]
+        return self._active_aspects[_key]
+
+    def get_schedule(self, fixed_step: bool = None) -> list:
+        """ 
+        Get the layers of the active aspects -- rebuilt when the aspects change
+        
+        Every aspect goes into the layer after the last earlier (higher priority)
+        aspect it conflicts with, so conflicting aspects keep the priority order.
+        """
+        _key = (fixed_step, singleton.DEBUG)
+        if _key in self._schedules:
+            return self._schedules[_key]
+        _schedule = []
+        _layers = []
+        for aspect in self.get_active_aspects(fixed_step):
+            _index = 0
+            for _earlier, _layer_index in _layers:
+                if _layer_index >= _index and is_aspect_conflict(aspect, _earlier):
+                    _index = _layer_index + 1
+            if _index == len(_schedule):
+                _schedule.append([])
+            _schedule[_index].append(aspect)
+            _layers.append((aspect, _index))
+        self._schedules[_key] = _schedule
+        return _schedule
+
+    def invalidate_schedule(self):
+        """ Rebuild the active aspects + schedule on the next frame """
+        self._active_aspects = {}
+        self._schedules = {}
+
+    def get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """ Get the aspect thread pool """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=singleton.ASPECT_THREAD_WORKERS, thread_name_prefix="aspect"
+            )
+        return self._executor
 
     def add_aspect(self, aspect: "Aspect"):
         """ Add an aspect to the handler """
@@ -49,12 +134,18 @@ class AspectHandler:
         aspect._handler = self
         # sort the array - BIGGEST PRIORITY FIRST
         self._aspects.sort(key = lambda x: -x._priority)
+        self.invalidate_schedule()
+        if aspect._tick_phase is None:
+            aspect._tick_phase = self._next_tick_phase
+            self._next_tick_phase += 1
         # add targetted component classes
         for _class in aspect._target_component_classes:
             if _class.__name__ not in self._aspect_targets:
                 self._aspect_targets[_class.__name__] = []
             if aspect not in self._aspect_targets[_class.__name__]:
                 self._aspect_targets[_class.__name__].append(aspect)
+            # drain the backlogged components of this class
+            self._drain_backlog(_class.__name__)
         
         print("ADDING:", aspect)
         aspect.__post_init__()
@@ -68,13 +159,17 @@ class AspectHandler:
     
     def remove_aspect(self, aspect: "Aspect"):
         """ Remove an aspect from the handler """
-        self._aspect.remove(aspect)
+        self._aspects.remove(aspect)
+        for _targets in self._aspect_targets.values():
+            if aspect in _targets:
+                _targets.remove(aspect)
+        self.invalidate_schedule()
     
     def remove_aspect_by_str(self, _aspect_class: str):
         """ Remove an aspect by string """
-        for aspect in self._aspect:
+        for aspect in self._aspects:
             if aspect.__class__.__name__ == _aspect_class:
-                self._aspect.remove(aspect)
+                self.remove_aspect(aspect)
                 break
     
     # component logic
@@ -82,38 +177,86 @@ class AspectHandler:
         """ Register a component """
         component.__post_aspect__(self)
         # register component into aspect instances
-        if component.__class__.__name__ not in self._aspect_targets:
-            self._component_backlog.append(component)
+        _name = component.__class__.__name__
+        if _name not in self._aspect_targets:
+            if _name not in self._component_backlog:
+                self._component_backlog[_name] = {}
+            self._component_backlog[_name][component.get_component_id()] = component
             return
         
-        for aspect in self._aspect_targets[component.__class__.__name__]:
+        for aspect in self._aspect_targets[_name]:
             aspect.register_component(component)
-        
-        # update backlog of components
-        if not self._component_backlog:
+
+    def _drain_backlog(self, class_name: str):
+        """ Register all backlogged components of a class into its aspects """
+        _backlog = self._component_backlog.pop(class_name, None)
+        if not _backlog:
             return
-        index = 0
-        while index < len(self._component_backlog):
-            _comp = self._component_backlog[index]
-            if _comp.__class__.__name__ in self._aspect_targets:
-                for aspect in self._aspect_targets[_comp.__class__.__name__]:
-                    aspect.register_component(_comp)
-                self._component_backlog.pop(index)
-            else:
-                index += 1
+        for aspect in self._aspect_targets[class_name]:
+            for _comp in _backlog.values():
+                aspect.register_component(_comp)
+
+    def get_backlog_size(self) -> int:
+        """ Get the number of components waiting for an aspect """
+        return sum(len(_backlog) for _backlog in self._component_backlog.values())
+
+    def park_component(self, component: "Component") -> list:
+        """ Take a component out of its aspects -- returns the aspects for `unpark_component` """
+        _name = component.__class__.__name__
+        _backlog = self._component_backlog.get(_name)
+        if _backlog:
+            _backlog.pop(component.get_component_id(), None)
+        result = [aspect for aspect in self._aspect_targets.get(_name, ()) if component.get_component_id() in aspect._components]
+        for aspect in result:
+            aspect._remove_component_by_id(component.get_component_id())
+        return result
+
+    def unpark_component(self, component: "Component", aspects: list):
+        """ Put a parked component back into its aspects (no target lookup when it had any) """
+        if not aspects:
+            self.register_component(component)
+            return
+        for aspect in aspects:
+            if aspect._handler is self:
+                aspect.register_component(component)
 
     def _remove_component(self, component: "Component"):
         """ Remove a component """
-        for aspect in self._aspect:
+        for aspect in self._aspects:
             aspect._remove_component(component)
+        _backlog = self._component_backlog.get(component.__class__.__name__)
+        if _backlog:
+            _backlog.pop(component.get_component_id(), None)
     
     def _remove_component_by_id(self, component_id: int):
         """ Remove a component by id """
-        for aspect in self._aspect:
+        for aspect in self._aspects:
             if component_id in aspect._components:
                 aspect._remove_component_by_id(component_id)
+        for _backlog in self._component_backlog.values():
+            if _backlog.pop(component_id, None) is not None:
                 break
     
+    # ---------------------------- #
+    # serialize
+
+    def __getstate__(self):
+        """ Pickle state """
+        state = self.__dict__.copy()
+        # threads cannot be serialized
+        state["_active_aspects"] = {}
+        state["_schedules"] = {}
+        state["_executor"] = None
+        return state
+
+    def __setstate__(self, state):
+        """ Unpickle state """
+        self.__dict__.update(state)
+        self._active_aspects = {}
+        self._schedules = {}
+        self._executor = None
+        self.__dict__.setdefault("_next_tick_phase", len(self._aspects))
+    
 
 # ---------------------------- #
 # aspect
@@ -130,14 +273,50 @@ class Aspect:
 
     They are 'component handlers'
 
+    `reads` / `writes` list the component classes (or `RESOURCE_*` keys) the aspect
+    touches in `handle`. Aspects that do not conflict run at the same time on the
+    aspect thread pool. An aspect without `reads` + `writes` conflicts with every
+    other aspect and always runs alone.
+
+    `fixed_step` aspects (physics + gameplay) run with the physics handler in every
+    fixed simulation step when `singleton.FIXED_TIMESTEP` is on, the rest run once
+    per rendered frame.
+
+    `debug` aspects only run with `singleton.DEBUG`. Disabled aspects are not run
+    at all. Throttled aspects (see `set_tick_interval`) run every few ticks with
+    the delta time accumulated since they last ran, always alone.
+
     """
 
-    def __init__(self, priority: int = 0, target_component_classes: list = []):
+    # scheduling state -- class defaults also cover aspects saved before it existed
+    _fixed_step = False
+    _debug = False
+    _enabled = True
+    # ticks -- every `_tick_frames` ticks, at least `_tick_seconds` apart
+    _throttled = False
+    _tick_frames = 1
+    _tick_seconds = 0.0
+    _tick_phase = None
+    _ticks = 0
+    _accumulated_delta = 0.0
+    _tick_delta = 0.0
+    # time budget (seconds) -- see `iter_budgeted_components`
+    _time_budget = None
+    _budget_deadline = 0.0
+    _budget_cursor = 0
+    _budget_overruns = 0
+    _last_handle_time = 0.0
+
+    def __init__(self, priority: int = 0, target_component_classes: list = [], reads: list = None, writes: list = None, fixed_step: bool = False, debug: bool = False):
         """ The Init Function """
         self._components = {}
         self._priority = priority
         self._handler = None
         self._target_component_classes = target_component_classes
+        self._fixed_step = fixed_step
+        self._debug = debug
+        self._reads = tuple(reads) if reads is not None else None
+        self._writes = tuple(writes) if writes is not None else None
     
     def __post_init__(self):
         """ Post init function """
@@ -149,6 +328,16 @@ class Aspect:
     def handle(self, camera: "Camera"):
         """ Handle the aspect """
         pass
+
+    def tick(self) -> bool:
+        """ Count a tick of a throttled aspect -- True if it runs (with `_tick_delta`) """
+        self._accumulated_delta += singleton.DELTA_TIME
+        self._ticks += 1
+        if (self._ticks + (self._tick_phase or 0)) % self._tick_frames or self._accumulated_delta < self._tick_seconds:
+            return False
+        self._tick_delta = self._accumulated_delta
+        self._accumulated_delta = 0.0
+        return True
     
     def register_component(self, component: "Component"):
         """ Register a component """
@@ -179,7 +368,130 @@ class Aspect:
         for _class in self._target_component_classes:
             yield _class
 
+    def iter_budgeted_components(self):
+        """ 
+        Iterate through the components until the time budget runs out
+
+        The next call continues after the last component handled, so every
+        component is reached over a few ticks. Without a budget this is
+        `iter_components`.
+        """
+        if self._time_budget is None:
+            yield from self.iter_components()
+            return
+        _components = list(self._components.values())
+        if not _components:
+            return
+        _start = self._budget_cursor % len(_components)
+        for i in range(len(_components)):
+            # always handle at least one component
+            if i and time.perf_counter() >= self._budget_deadline:
+                break
+            self._budget_cursor = _start + i + 1
+            yield _components[(_start + i) % len(_components)]
+
+    # ---------------------------- #
+    # scheduling
+
+    def set_enabled(self, enabled: bool):
+        """ Enable / disable the aspect -- disabled aspects are skipped by the handler """
+        self._enabled = enabled
+        if self._handler:
+            self._handler.invalidate_schedule()
+
+    def is_enabled(self) -> bool:
+        """ Check if the aspect is enabled """
+        return self._enabled
+
+    def set_tick_interval(self, frames: int = 1, seconds: float = 0.0, phase: int = None):
+        """ 
+        Run the aspect every `frames` ticks and at least `seconds` apart
+        
+        `phase` offsets the ticks (None = staggered against the other aspects by the handler).
+        """
+        if frames < 1 or seconds < 0:
+            raise ValueError("The tick interval must be at least 1 frame and 0 seconds")
+        self._tick_frames = frames
+        self._tick_seconds = seconds
+        if phase is not None:
+            self._tick_phase = phase
+        self._throttled = frames > 1 or seconds > 0
+        if self._handler:
+            self._handler.invalidate_schedule()
+
+    def set_time_budget(self, seconds: float = None):
+        """ Set the time budget of a `handle` call (None = no budget) """
+        self._time_budget = seconds
+
+    def get_budget_overruns(self) -> int:
+        """ Number of `handle` calls that went over the time budget """
+        return self._budget_overruns
+
 # ---------------------------- #
 # util functions
 
+def handle_aspect(aspect: Aspect, camera: "Camera"):
+    """ Handle an aspect (profiled) -- throttled aspects run with their accumulated delta time """
+    if not aspect._throttled:
+        run_aspect(aspect, camera)
+        return
+    if not aspect.tick():
+        return
+    _delta = singleton.DELTA_TIME
+    singleton.DELTA_TIME = aspect._tick_delta
+    try:
+        run_aspect(aspect, camera)
+    finally:
+        singleton.DELTA_TIME = _delta
+
+def run_aspect(aspect: Aspect, camera: "Camera"):
+    """ Run the aspect + keep track of its time budget """
+    with profiler.scope(aspect.__class__.__name__, category="aspect"):
+        if aspect._time_budget is None:
+            aspect.handle(camera)
+            return
+        _start = time.perf_counter()
+        aspect._budget_deadline = _start + aspect._time_budget
+        aspect.handle(camera)
+        aspect._last_handle_time = time.perf_counter() - _start
+        if aspect._last_handle_time > aspect._time_budget:
+            aspect._budget_overruns += 1
+
+def is_aspect_active(aspect: Aspect, fixed_step: bool = None) -> bool:
+    """ Check if the handler runs the aspect """
+    return (
+        aspect._enabled
+        and (not aspect._debug or singleton.DEBUG)
+        and (fixed_step is None or aspect._fixed_step == fixed_step)
+    )
+
+def is_aspect_conflict(aspect: Aspect, other: Aspect) -> bool:
+    """ Check if two aspects cannot run at the same time -- throttled aspects change the delta time """
+    if aspect._throttled or other._throttled:
+        return True
+    _reads, _writes = getattr(aspect, "_reads", None), getattr(aspect, "_writes", None)
+    _other_reads, _other_writes = getattr(other, "_reads", None), getattr(other, "_writes", None)
+    if _reads is None or _writes is None or _other_reads is None or _other_writes is None:
+        return True
+    return (
+        is_access_overlap(_writes, _other_reads + _other_writes)
+        or is_access_overlap(_other_writes, _reads)
+    )
+
+def is_access_overlap(keys: tuple, other_keys: tuple) -> bool:
+    """ Check if two read / write lists share a key (a class overlaps its subclasses) """
+    for _key in keys:
+        for _other in other_keys:
+            if _key == _other:
+                return True
+            if isinstance(_key, type) and isinstance(_other, type) and (issubclass(_key, _other) or issubclass(_other, _key)):
+                return True
+            if isinstance(_key, type) != isinstance(_other, type) and get_access_key_name(_key) == get_access_key_name(_other):
+                return True
+    return False
+
+def get_access_key_name(key) -> str:
+    """ Get the name of a read / write key """
+    return key.__name__ if isinstance(key, type) else key
+
 
@@ -0,0 +1,232 @@
+import struct
+
+import dill
+import numpy as np
+
+
+# ---------------------------- #
+# constants
+
+CHUNK_CODEC_MAGIC = b"ELCK"
+CHUNK_CODEC_VERSION = 2
+# version 1 chunks have no custom tile data blob
+CHUNK_CODEC_CUSTOM_DATA_VERSION = 2
+
+# magic, version, width, height
+CHUNK_HEADER = struct.Struct("<4sHHH")
+# type id, collision mask, transparent, sprite string
+TILE_HEADER = struct.Struct("<HHBH")
+# local position of a stateful tile
+INSTANCE_POSITION = struct.Struct("<HH")
+COUNT = struct.Struct("<H")
+LENGTH = struct.Struct("<I")
+
+INDEX_DTYPE = np.dtype("<u2")
+
+NO_STRING = 0xFFFF
+
+# tiles of unregistered classes are stored with dill
+PICKLED_TILE_TYPE_ID = 0
+# type ids below this are used by the engine tiles
+GAME_TILE_TYPE_ID_START = 16
+
+# payload value formats
+# s = string (index into the chunk string table), B / H / I = unsigned ints, i = signed int, f = float
+PAYLOAD_FORMATS = {"B": struct.Struct("<B"), "H": struct.Struct("<H"), "I": struct.Struct("<I"), "i": struct.Struct("<i"), "f": struct.Struct("<f")}
+
+# type id -> (class, payload format) + class -> type id
+TILE_CLASS_REGISTRY = {}
+TILE_CLASS_IDS = {}
+
+
+# ---------------------------- #
+# string table
+
+class StringTable:
+    """ The strings (sprite paths, etc) used by a chunk -- each one is written once """
+
+    def __init__(self, strings: list = None) -> None:
+        """ Initialize the string table """
+        self._strings = strings if strings else []
+        self._lookup = {s: i for i, s in enumerate(self._strings)}
+
+    def get_index(self, string: str) -> int:
+        """ Get the index of the string (adds new strings) """
+        if string is None:
+            return NO_STRING
+        if string not in self._lookup:
+            self._lookup[string] = len(self._strings)
+            self._strings.append(string)
+        return self._lookup[string]
+
+    def __getitem__(self, index: int) -> str:
+        """ Get the string at the index """
+        return None if index == NO_STRING else self._strings[index]
+
+    def to_bytes(self) -> bytes:
+        """ Write the string table """
+        result = [COUNT.pack(len(self._strings))]
+        for _string in self._strings:
+            _encoded = _string.encode("utf-8")
+            result.append(COUNT.pack(len(_encoded)))
+            result.append(_encoded)
+        return b"".join(result)
+
+    @classmethod
+    def from_bytes(cls, data: memoryview, offset: int) -> tuple:
+        """ Read the string table -- returns (table, new offset) """
+        (_count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        _strings = []
+        for _ in range(_count):
+            (_length,) = COUNT.unpack_from(data, offset)
+            offset += COUNT.size
+            _strings.append(bytes(data[offset:offset + _length]).decode("utf-8"))
+            offset += _length
+        return cls(_strings), offset
+
+
+# ---------------------------- #
+# registry
+
+def register_tile_class(tile_class: type, type_id: int, payload_format: str = ""):
+    """
+    Register a tile class with the chunk codec
+
+    The payload format describes the values returned by `tile.get_codec_state()`,
+    one character per value (see `PAYLOAD_FORMATS`, `s` for strings).
+    """
+    if type_id == PICKLED_TILE_TYPE_ID or type_id > 0xFFFF:
+        raise ValueError(f"Tile type id must be between 1 and {0xFFFF}")
+    if type_id in TILE_CLASS_REGISTRY and TILE_CLASS_REGISTRY[type_id][0] is not tile_class:
+        raise ValueError(f"Tile type id {type_id} is already used by {TILE_CLASS_REGISTRY[type_id][0].__name__}")
+    for _char in payload_format:
+        if _char != "s" and _char not in PAYLOAD_FORMATS:
+            raise ValueError(f"Unknown payload format `{_char}` for {tile_class.__name__}")
+    TILE_CLASS_REGISTRY[type_id] = (tile_class, payload_format)
+    TILE_CLASS_IDS[tile_class] = type_id
+
+def get_tile_type_id(tile_class: type) -> int:
+    """ Get the type id of a tile class (`PICKLED_TILE_TYPE_ID` if not registered) """
+    return TILE_CLASS_IDS.get(tile_class, PICKLED_TILE_TYPE_ID)
+
+
+# ---------------------------- #
+# encode
+
+def encode_tile(tile, strings: StringTable) -> bytes:
+    """ Encode a single tile """
+    _type_id = get_tile_type_id(tile.__class__)
+    if _type_id == PICKLED_TILE_TYPE_ID:
+        _pickled = dill.dumps(tile)
+        return TILE_HEADER.pack(_type_id, 0, 0, NO_STRING) + LENGTH.pack(len(_pickled)) + _pickled
+    result = [TILE_HEADER.pack(_type_id, tile._collision_mask, tile._transparent, strings.get_index(tile._sprite_path))]
+    _format = TILE_CLASS_REGISTRY[_type_id][1]
+    _state = tile.get_codec_state()
+    if len(_state) != len(_format):
+        raise ValueError(f"{tile.__class__.__name__}.get_codec_state() returned {len(_state)} values, expected `{_format}`")
+    for _char, _value in zip(_format, _state):
+        if _char == "s":
+            result.append(COUNT.pack(strings.get_index(_value)))
+        else:
+            result.append(PAYLOAD_FORMATS[_char].pack(_value))
+    # custom tile data (`tile["key"] = value`) -- length prefixed, empty when there is none
+    _custom = tile.get_custom_data()
+    _pickled = dill.dumps(_custom) if _custom else b""
+    result.append(LENGTH.pack(len(_pickled)))
+    result.append(_pickled)
+    return b"".join(result)
+
+def encode_chunk(indices: np.ndarray, palette: dict, instances: dict) -> bytes:
+    """
+    Encode chunk data into the binary chunk format
+
+    indices = (rows, columns) array of palette indices
+    palette = {palette index: prototype tile}
+    instances = {(x, y): stateful tile}
+    """
+    strings = StringTable()
+    _palette = [encode_tile(palette[_index], strings) for _index in sorted(palette)]
+    # remap the (layer) palette indices to the order they are written in
+    _remap = {_index: _local + 1 for _local, _index in enumerate(sorted(palette))}
+    _indices = indices.astype(INDEX_DTYPE)
+    for _index, _local in _remap.items():
+        _indices[indices == _index] = _local
+    _instances = [
+        INSTANCE_POSITION.pack(_position[0], _position[1]) + encode_tile(_tile, strings)
+        for _position, _tile in instances.items()
+    ]
+    return b"".join([
+        CHUNK_HEADER.pack(CHUNK_CODEC_MAGIC, CHUNK_CODEC_VERSION, indices.shape[1], indices.shape[0]),
+        strings.to_bytes(),
+        COUNT.pack(len(_palette)),
+        *_palette,
+        _indices.tobytes(),
+        COUNT.pack(len(_instances)),
+        *_instances
+    ])
+
+
+# ---------------------------- #
+# decode
+
+def decode_tile(data: memoryview, offset: int, strings: StringTable, position: tuple, version: int = CHUNK_CODEC_VERSION) -> tuple:
+    """ Decode a single tile -- returns (tile, new offset) """
+    _type_id, _mask, _transparent, _sprite = TILE_HEADER.unpack_from(data, offset)
+    offset += TILE_HEADER.size
+    if _type_id == PICKLED_TILE_TYPE_ID:
+        (_length,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        return dill.loads(bytes(data[offset:offset + _length])), offset + _length
+    if _type_id not in TILE_CLASS_REGISTRY:
+        raise ValueError(f"Unknown tile type id {_type_id} -- was the tile class registered?")
+    _class, _format = TILE_CLASS_REGISTRY[_type_id]
+    _state = []
+    for _char in _format:
+        if _char == "s":
+            (_value,) = COUNT.unpack_from(data, offset)
+            _state.append(strings[_value])
+            offset += COUNT.size
+            continue
+        (_value,) = PAYLOAD_FORMATS[_char].unpack_from(data, offset)
+        _state.append(_value)
+        offset += PAYLOAD_FORMATS[_char].size
+    result = _class.create_from_codec(position, strings[_sprite], _mask, bool(_transparent), tuple(_state))
+    if version >= CHUNK_CODEC_CUSTOM_DATA_VERSION:
+        (_length,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        if _length:
+            result._data = dill.loads(bytes(data[offset:offset + _length]))
+            offset += _length
+    return result, offset
+
+def decode_chunk(data: bytes) -> dict:
+    """ Decode binary chunk data -- same layout as `Chunk.get_chunk_data` """
+    data = memoryview(data)
+    _magic, _version, _width, _height = CHUNK_HEADER.unpack_from(data, 0)
+    if _magic != CHUNK_CODEC_MAGIC:
+        raise ValueError("Data is not a binary chunk")
+    if _version > CHUNK_CODEC_VERSION:
+        raise ValueError(f"Chunk codec version {_version} is newer than the supported version {CHUNK_CODEC_VERSION}")
+    strings, offset = StringTable.from_bytes(data, CHUNK_HEADER.size)
+
+    (_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    _palette = {}
+    for _local in range(1, _count + 1):
+        _palette[_local], offset = decode_tile(data, offset, strings, (0, 0), _version)
+
+    _indices = np.frombuffer(data, dtype=INDEX_DTYPE, count=_width * _height, offset=offset).reshape(_height, _width).copy()
+    offset += _indices.nbytes
+
+    (_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    _instances = {}
+    for _ in range(_count):
+        _position = INSTANCE_POSITION.unpack_from(data, offset)
+        _instances[_position], offset = decode_tile(data, offset + INSTANCE_POSITION.size, strings, _position, _version)
+    return {"indices": _indices, "palette": _palette, "instances": _instances}
+
+def is_binary_chunk(data: bytes) -> bool:
+    """ Check if the data is a binary chunk (and not a pickled one) """
+    return data[:len(CHUNK_CODEC_MAGIC)] == CHUNK_CODEC_MAGIC
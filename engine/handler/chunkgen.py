@@ -0,0 +1,336 @@
+import math
+import concurrent.futures
+
+import numpy as np
+import opensimplex
+
+from engine import singleton
+
+from engine.handler import region
+
+
+# ---------------------------- #
+# constants
+
+# generated tile indices -- 0 = empty, everything else is a key of `ChunkGenerator.get_tiles()`
+GENERATED_INDEX_DTYPE = np.dtype("<u2")
+GENERATED_EMPTY_INDEX = 0
+
+# generated chunks are cached per (generator, version, seed, chunk size)
+GENERATED_CHUNK_CACHE_FOLDER = "assets/cache/generated/"
+GENERATED_CHUNK_CACHE_LAYER = 0
+# generated chunks written to the cache at once
+GENERATED_CHUNK_CACHE_BATCH = 16
+
+# noise terrain tile indices
+TERRAIN_SURFACE = 1
+TERRAIN_DIRT = 2
+TERRAIN_STONE = 3
+
+# per process -- {seed: OpenSimplex}
+NOISE_CACHE = {}
+
+
+# ---------------------------- #
+# generators
+
+class ChunkGenerator:
+    """
+    Turns a seed + chunk position into a tile index array.
+
+    `generate` runs inside of a worker process -- generators are pickled, so
+    they should only hold plain data. The tile prototypes for the generated
+    indices are only used on the main thread.
+
+    Bump `GENERATOR_VERSION` whenever the output changes, the cached chunks
+    of older versions are not used.
+
+    """
+
+    GENERATOR_NAME = "generator"
+    GENERATOR_VERSION = 1
+
+    def __init__(self, seed: int, tiles: dict) -> None:
+        """ Initialize the generator -- tiles = {generated index: prototype tile} """
+        if GENERATED_EMPTY_INDEX in tiles:
+            raise ValueError(f"Generated index {GENERATED_EMPTY_INDEX} is reserved for empty cells")
+        self._seed = seed
+        self._tiles = tiles
+
+    # ---------------------------- #
+    # logic
+
+    def generate(self, chunk_position: tuple, dimensions: tuple) -> np.ndarray:
+        """ Generate the (height, width) tile index array of the chunk -- to be overriden """
+        return np.zeros((dimensions[1], dimensions[0]), dtype=GENERATED_INDEX_DTYPE)
+
+    # ---------------------------- #
+    # utils
+
+    def get_tiles(self) -> dict:
+        """ Get the {generated index: prototype tile} """
+        return self._tiles
+
+    def get_cache_name(self) -> str:
+        """ Get the name of the generated chunk cache """
+        return f"{self.GENERATOR_NAME}-v{self.GENERATOR_VERSION}-{self._seed}"
+
+
+class NoiseTerrainGenerator(ChunkGenerator):
+    """
+    Side view terrain from opensimplex noise.
+
+    - a 1d noise height map for the surface
+    - the surface tile, `dirt_depth` dirt tiles, then stone
+    - caves where the 2d noise is above `cave_threshold`
+
+    The noise is sampled for the whole chunk at once.
+
+    """
+
+    GENERATOR_NAME = "noise_terrain"
+    GENERATOR_VERSION = 1
+
+    def __init__(
+            self,
+            seed: int,
+            tiles: dict,
+            surface_height: int = 0,
+            amplitude: float = 24,
+            frequency: float = 0.02,
+            dirt_depth: int = 4,
+            cave_frequency: float = 0.06,
+            cave_threshold: float = 0.45
+        ) -> None:
+        """ Initialize the noise terrain generator -- tiles need `TERRAIN_SURFACE`, `TERRAIN_DIRT` + `TERRAIN_STONE` """
+        for _index in (TERRAIN_SURFACE, TERRAIN_DIRT, TERRAIN_STONE):
+            if _index not in tiles:
+                raise ValueError(f"NoiseTerrainGenerator is missing the tile for index {_index}")
+        super().__init__(seed, tiles)
+        self._surface_height = surface_height
+        self._amplitude = amplitude
+        self._frequency = frequency
+        self._dirt_depth = dirt_depth
+        self._cave_frequency = cave_frequency
+        self._cave_threshold = cave_threshold
+
+    # ---------------------------- #
+    # logic
+
+    def generate(self, chunk_position: tuple, dimensions: tuple) -> np.ndarray:
+        """ Generate the (height, width) tile index array of the chunk """
+        _noise = get_noise(self._seed)
+        _xs = np.arange(dimensions[0], dtype=np.float64) + chunk_position[0] * dimensions[0]
+        _ys = np.arange(dimensions[1], dtype=np.float64) + chunk_position[1] * dimensions[1]
+
+        # surface height of each column (y points down)
+        _heights = np.floor(self._surface_height + self._amplitude * _noise.noise2array(_xs * self._frequency, np.zeros(1))[0])
+        _depth = _ys[:, None] - _heights[None, :]
+
+        result = np.full(_depth.shape, TERRAIN_STONE, dtype=GENERATED_INDEX_DTYPE)
+        result[_depth < self._dirt_depth] = TERRAIN_DIRT
+        result[_depth == 0] = TERRAIN_SURFACE
+        result[_depth < 0] = GENERATED_EMPTY_INDEX
+        # caves never break through the surface
+        _caves = _noise.noise2array(_xs * self._cave_frequency, _ys * self._cave_frequency) > self._cave_threshold
+        result[_caves & (_depth > 0)] = GENERATED_EMPTY_INDEX
+        return result
+
+
+# ---------------------------- #
+# cache
+
+class GeneratedChunkCache:
+    """ Generated tile index arrays on disk, stored in region files """
+
+    def __init__(self, generator: ChunkGenerator, dimensions: tuple) -> None:
+        """ Initialize the generated chunk cache """
+        self._dimensions = dimensions
+        self._store = region.get_region_store(
+            f"{GENERATED_CHUNK_CACHE_FOLDER}{generator.get_cache_name()}-{dimensions[0]}x{dimensions[1]}/")
+
+    def read(self, chunk_position: tuple) -> np.ndarray:
+        """ Read the cached indices of the chunk (None if it was not generated yet) """
+        data = self._store.read_chunk(chunk_position, GENERATED_CHUNK_CACHE_LAYER)
+        if data is None or len(data) != self._dimensions[0] * self._dimensions[1] * GENERATED_INDEX_DTYPE.itemsize:
+            return None
+        return np.frombuffer(data, dtype=GENERATED_INDEX_DTYPE).reshape(self._dimensions[1], self._dimensions[0]).copy()
+
+    def write_many(self, chunks: dict):
+        """ Write {chunk position: indices} """
+        self._store.write_chunks(GENERATED_CHUNK_CACHE_LAYER, {
+            _position: _indices.astype(GENERATED_INDEX_DTYPE).tobytes() for _position, _indices in chunks.items()
+        })
+
+
+# ---------------------------- #
+# generation queue
+
+class ChunkGenerationQueue:
+    """
+    Generates chunks for the layers that have a chunk generator.
+
+    Chunks are generated in a process pool, nearest to the camera (and the
+    direction it travels in) first. Results are written to the generated
+    chunk cache + applied on the main thread, a few chunks per frame.
+
+    With `CHUNK_GENERATION_WORKERS = 0` chunks are generated right away.
+
+    Note: on platforms that spawn worker processes the entry script needs an
+    `if __name__ == "__main__":` guard.
+
+    """
+
+    def __init__(self, world: "World") -> None:
+        """ Initialize the generation queue """
+        self._world = world
+        self._executor = None
+        # (layer id, chunk position) -> future
+        self._pending = {}
+        # layer id -> {chunk position: indices} waiting to be cached
+        self._cache_writes = {}
+
+        self._center = None
+        self._direction = (0, 0)
+
+    # ---------------------------- #
+    # logic
+
+    def update(self, center: tuple):
+        """ Update the queue -- call once per frame """
+        if center != self._center:
+            if self._center is not None:
+                self._direction = (
+                    (center[0] > self._center[0]) - (center[0] < self._center[0]),
+                    (center[1] > self._center[1]) - (center[1] < self._center[1])
+                )
+            self._center = center
+            self._cancel_out_of_range()
+            self._request_chunks()
+        self._apply_generated_chunks(singleton.CHUNK_GENERATION_APPLY_BUDGET)
+        # cache writes are batched -- every write remaps the region file
+        if not self._pending or sum(len(_c) for _c in self._cache_writes.values()) >= GENERATED_CHUNK_CACHE_BATCH:
+            self._write_cache()
+
+    def request(self, layer: "Layer", chunk_position: tuple):
+        """ Request the generated tiles of a (resident) chunk -- does not block on workers """
+        _id = (layer._layer_id, chunk_position)
+        if _id in self._pending:
+            return
+        _cached = layer._generator_cache.read(chunk_position)
+        if _cached is not None:
+            layer.apply_generated_chunk(chunk_position, _cached)
+            return
+        if singleton.CHUNK_GENERATION_WORKERS <= 0:
+            _indices = generate_chunk_indices(layer._generator, chunk_position, get_chunk_dimensions())
+            self._cache_writes.setdefault(layer._layer_id, {})[chunk_position] = _indices
+            layer.apply_generated_chunk(chunk_position, _indices)
+            return
+        if not self._executor:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=singleton.CHUNK_GENERATION_WORKERS)
+        self._pending[_id] = self._executor.submit(generate_chunk_indices, layer._generator, chunk_position, get_chunk_dimensions())
+
+    def _request_chunks(self):
+        """ Create (+ request) the missing chunks around the center """
+        for position in self.iterate_wanted_chunk_positions():
+            for layer in self._world._layers.values():
+                if not layer._generator:
+                    continue
+                _chunk = layer.get_chunk_at(position)
+                if _chunk:
+                    # generation was cancelled while the chunk stayed resident
+                    if not _chunk._generated and not self.is_pending(layer._layer_id, position):
+                        self.request(layer, position)
+                    continue
+                if layer.is_chunk_stored(position):
+                    continue
+                # the new chunk requests its generated tiles
+                layer.create_default_chunk(position)
+
+    def _cancel_out_of_range(self):
+        """ Cancel the generation of chunks that have not started + are no longer wanted """
+        _radius = singleton.CHUNK_GENERATION_RADIUS + singleton.CHUNK_GENERATION_LOOKAHEAD
+        for _id in list(self._pending):
+            if max(abs(_id[1][0] - self._center[0]), abs(_id[1][1] - self._center[1])) <= _radius:
+                continue
+            if self._pending[_id].cancel():
+                del self._pending[_id]
+
+    def _apply_generated_chunks(self, budget: int):
+        """ Apply up to `budget` finished chunks """
+        for _id in list(self._pending):
+            if budget <= 0:
+                return
+            if not self._pending[_id].done():
+                continue
+            _indices = self._pending.pop(_id).result()
+            layer = self._world._layers.get(_id[0])
+            if not layer or not layer._generator:
+                continue
+            self._cache_writes.setdefault(_id[0], {})[_id[1]] = _indices
+            layer.apply_generated_chunk(_id[1], _indices)
+            budget -= 1
+
+    def _write_cache(self):
+        """ Write the generated chunks into the cache (one write per layer) """
+        for _layer_id, _chunks in self._cache_writes.items():
+            layer = self._world._layers.get(_layer_id)
+            if layer and layer._generator_cache:
+                layer._generator_cache.write_many(_chunks)
+        self._cache_writes.clear()
+
+    # ---------------------------- #
+    # utils
+
+    def flush(self):
+        """ Block until every requested chunk is generated + applied """
+        concurrent.futures.wait(list(self._pending.values()))
+        self._apply_generated_chunks(len(self._pending))
+        self._write_cache()
+
+    def close(self):
+        """ Finish all work and stop the worker processes """
+        self.flush()
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+    def is_pending(self, layer_id: int, chunk_position: tuple) -> bool:
+        """ Check if the chunk is being generated """
+        return (layer_id, chunk_position) in self._pending
+
+    def iterate_wanted_chunk_positions(self):
+        """ Iterate chunks in the generation radius, nearest to the look ahead point first """
+        _radius = singleton.CHUNK_GENERATION_RADIUS
+        _ahead = (
+            self._center[0] + self._direction[0] * singleton.CHUNK_GENERATION_LOOKAHEAD,
+            self._center[1] + self._direction[1] * singleton.CHUNK_GENERATION_LOOKAHEAD
+        )
+        _area = [
+            (x, y)
+            for x in range(min(self._center[0], _ahead[0]) - _radius, max(self._center[0], _ahead[0]) + _radius + 1)
+            for y in range(min(self._center[1], _ahead[1]) - _radius, max(self._center[1], _ahead[1]) + _radius + 1)
+        ]
+        _area.sort(key=lambda p: math.hypot(p[0] - _ahead[0], p[1] - _ahead[1]))
+        yield from _area
+
+
+# ---------------------------- #
+# utils
+
+def generate_chunk_indices(generator: ChunkGenerator, chunk_position: tuple, dimensions: tuple) -> np.ndarray:
+    """ Generate the indices of a chunk (runs inside of the worker processes) """
+    result = generator.generate(chunk_position, dimensions)
+    if result.shape != (dimensions[1], dimensions[0]):
+        raise ValueError(f"{generator.__class__.__name__} generated shape {result.shape}, expected {(dimensions[1], dimensions[0])}")
+    return result.astype(GENERATED_INDEX_DTYPE, copy=False)
+
+def get_noise(seed: int) -> opensimplex.OpenSimplex:
+    """ Get the (per process cached) noise generator of the seed """
+    if seed not in NOISE_CACHE:
+        NOISE_CACHE[seed] = opensimplex.OpenSimplex(seed)
+    return NOISE_CACHE[seed]
+
+def get_chunk_dimensions() -> tuple:
+    """ Get the (width, height) of a chunk in tiles """
+    return (singleton.DEFAULT_CHUNK_WIDTH, singleton.DEFAULT_CHUNK_HEIGHT)
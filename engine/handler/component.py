@@ -90,6 +90,10 @@ class Component:
         """ Called after being added to an aspect """
         self._parent_aspect = _parent_aspect
 
+    def __pool_reset__(self):
+        """ Called before a pooled gameobject is spawned again -- reset the per life state """
+        pass
+
     # ---------------------------- #
     # attributes
 
@@ -0,0 +1,137 @@
+from engine.physics import gameobject
+
+
+# ---------------------------- #
+# constants
+
+# ---------------------------- #
+# query handler
+
+class QueryHandler:
+    """
+    Keeps the world queries up to date.
+
+    Gameobjects report every component add / remove, only the queries that
+    mention one of the component's classes (or its bases) are refreshed.
+
+    """
+
+    def __init__(self, _world: "World"):
+        """ Initialize the query handler """
+        self._world = _world
+        # {(component classes / class names): Query}
+        self._queries = {}
+        # {component class / class name: [Query]}
+        self._key_queries = {}
+
+    # ---------------------------- #
+    # logic
+
+    def query(self, component_classes: tuple) -> "Query":
+        """ Get the (cached) query for the component classes / class names """
+        if not component_classes:
+            raise ValueError("A query needs at least one component class")
+        if component_classes in self._queries:
+            return self._queries[component_classes]
+        _query = Query(component_classes)
+        self._queries[component_classes] = _query
+        for _key in set(component_classes):
+            if _key not in self._key_queries:
+                self._key_queries[_key] = []
+            self._key_queries[_key].append(_query)
+        # fill with the existing gameobjects
+        for _gameobject in self._world._physics_handler._gameobjects.values():
+            _query._refresh(_gameobject)
+        return _query
+
+    def add_gameobject(self, _gameobject: "GameObject"):
+        """ Add a (respawned) gameobject to the matching queries """
+        for _query in self._queries.values():
+            _query._refresh(_gameobject)
+
+    def remove_gameobject(self, _gameobject: "GameObject"):
+        """ Remove a (parked) gameobject from every query """
+        for _query in self._queries.values():
+            _query._remove(_gameobject)
+
+    def update_gameobject(self, _gameobject: "GameObject", component: "Component"):
+        """ A component was added to / removed from the gameobject """
+        if not self._key_queries:
+            return
+        _refreshed = set()
+        for _key in gameobject.get_component_index_keys(component.__class__):
+            for _query in self._key_queries.get(_key, ()):
+                if id(_query) in _refreshed:
+                    continue
+                _refreshed.add(id(_query))
+                _query._refresh(_gameobject)
+
+
+# ---------------------------- #
+# query
+
+class Query:
+    """
+    A live view over every gameobject that has all of the component classes.
+
+    Iterating yields one tuple of components per gameobject, in the order of
+    the classes given to `World.query`. The view is updated as components are
+    added + removed -- it is safe to add / remove components while iterating.
+
+    """
+
+    def __init__(self, component_classes: tuple):
+        """ Create a new query """
+        self._component_classes = component_classes
+        # {gameobject id: (components)}
+        self._rows = {}
+        self._snapshot = None
+
+    # ---------------------------- #
+    # logic
+
+    def _refresh(self, _gameobject: "GameObject"):
+        """ Update the row of a gameobject """
+        _row = tuple(_gameobject.get_component(_key) for _key in self._component_classes)
+        if None in _row:
+            if self._rows.pop(_gameobject._id, None) is not None:
+                self._snapshot = None
+            return
+        if self._rows.get(_gameobject._id) != _row:
+            self._rows[_gameobject._id] = _row
+            self._snapshot = None
+
+    def _remove(self, _gameobject: "GameObject"):
+        """ Remove the row of a gameobject """
+        if self._rows.pop(_gameobject._id, None) is not None:
+            self._snapshot = None
+
+    # ---------------------------- #
+    # utils
+
+    def get(self, _gameobject: "GameObject") -> tuple:
+        """ Get the components of a gameobject (None if it does not match) """
+        return self._rows.get(_gameobject._id)
+
+    def iter_gameobjects(self):
+        """ Iterate through the matching gameobjects """
+        for _row in self:
+            yield _row[0].get_gameobject()
+
+    def get_component_classes(self) -> tuple:
+        """ Get the queried component classes / class names """
+        return self._component_classes
+
+    def __iter__(self):
+        """ Iterate through the component tuples """
+        if self._snapshot is None:
+            self._snapshot = tuple(self._rows.values())
+        return iter(self._snapshot)
+
+    def __len__(self):
+        """ Number of matching gameobjects """
+        return len(self._rows)
+
+    def __contains__(self, _gameobject: "GameObject"):
+        """ Check if a gameobject matches """
+        return _gameobject._id in self._rows
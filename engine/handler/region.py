@@ -0,0 +1,290 @@
+import os
+import mmap
+import struct
+import threading
+
+import numpy as np
+
+
+# ---------------------------- #
+# constants
+
+REGION_MAGIC = b"ELRG"
+REGION_VERSION = 1
+
+# chunks per region (on each axis)
+DEFAULT_REGION_SIZE = 16
+
+# magic, version, region size
+REGION_HEADER = struct.Struct("<4sHH")
+# offset, length -- (0, 0) = no chunk
+REGION_INDEX_ENTRY = struct.Struct("<II")
+REGION_INDEX_DTYPE = np.dtype("<u4")
+
+REGION_FILE_EXTENSION = ".region"
+
+# compact a region file once this fraction of it is unused
+REGION_COMPACT_THRESHOLD = 0.5
+
+REGION_STORE_CACHE = {}
+REGION_STORE_CACHE_LOCK = threading.Lock()
+
+
+# ---------------------------- #
+# region file
+
+class RegionFile:
+    """
+    A single file holding NxN (serialized) chunks of a layer.
+
+    The file starts with a header + an index of (offset, length) entries, one
+    per chunk in the region. Chunk data is read through a memory map.
+
+    Rewritten chunks are appended to the end of the file, the old bytes stay
+    unused until the file is compacted.
+
+    """
+
+    def __init__(self, path: str, region_size: int = DEFAULT_REGION_SIZE) -> None:
+        """ Open (or create) the region file """
+        self._path = path
+        self._region_size = region_size
+        self._lock = threading.Lock()
+
+        self._file = None
+        self._mmap = None
+        self._index = None
+
+        if not os.path.exists(path):
+            self._create_empty_file()
+        self._open()
+
+    # ---------------------------- #
+    # logic
+
+    def read(self, local_index: int) -> bytes:
+        """ Read the chunk bytes at the local index (None if there is no chunk) """
+        with self._lock:
+            offset, length = self._index[local_index]
+            if not length:
+                return None
+            return self._mmap[offset:offset + length]
+
+    def write(self, local_index: int, data: bytes):
+        """ Write the chunk bytes at the local index """
+        self.write_many({local_index: data})
+
+    def write_many(self, entries: dict):
+        """ Write multiple {local index: bytes} entries (one remap) """
+        with self._lock:
+            # the file cannot be extended while it is mapped (on some platforms)
+            self._mmap.close()
+            self._file.seek(0, os.SEEK_END)
+            for local_index, data in entries.items():
+                self._index[local_index] = (self._file.tell(), len(data))
+                self._file.write(data)
+            for local_index in entries:
+                self._file.seek(REGION_HEADER.size + local_index * REGION_INDEX_ENTRY.size)
+                self._file.write(REGION_INDEX_ENTRY.pack(*self._index[local_index].tolist()))
+            self._file.flush()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def compact(self):
+        """ Rewrite the file without the unused bytes """
+        with self._lock:
+            _entries = {i: self._mmap[o:o + l] for i, (o, l) in enumerate(self._index.tolist()) if l}
+            self._close()
+            _tmp = self._path + ".tmp"
+            write_region_file(_tmp, self._region_size, _entries)
+            os.replace(_tmp, self._path)
+            self._open()
+
+    def close(self):
+        """ Close the region file """
+        with self._lock:
+            self._close()
+
+    # ---------------------------- #
+    # utils
+
+    def _create_empty_file(self):
+        """ Create a region file without any chunks """
+        write_region_file(self._path, self._region_size, {})
+
+    def _open(self):
+        """ Open + map the file and read the index """
+        self._file = open(self._path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        _magic, _version, _size = REGION_HEADER.unpack_from(self._mmap, 0)
+        if _magic != REGION_MAGIC:
+            raise ValueError(f"`{self._path}` is not a region file")
+        if _version != REGION_VERSION:
+            raise ValueError(f"Region file `{self._path}` has unsupported version {_version}")
+        if _size != self._region_size:
+            raise ValueError(f"Region file `{self._path}` has region size {_size}, expected {self._region_size}")
+        self._index = np.frombuffer(
+            self._mmap, dtype=REGION_INDEX_DTYPE, count=self._region_size ** 2 * 2, offset=REGION_HEADER.size
+        ).reshape(-1, 2).copy()
+
+    def _close(self):
+        """ Close the map + file """
+        if self._mmap:
+            self._mmap.close()
+        if self._file:
+            self._file.close()
+        self._mmap = None
+        self._file = None
+
+    def get_local_indices(self) -> list:
+        """ Get the local indices that hold a chunk """
+        with self._lock:
+            return np.flatnonzero(self._index[:, 1]).tolist()
+
+    def get_unused_ratio(self) -> float:
+        """ Get the fraction of the file that is not referenced by the index """
+        with self._lock:
+            _size = len(self._mmap)
+            _used = REGION_HEADER.size + self._index.size * REGION_INDEX_DTYPE.itemsize + int(self._index[:, 1].sum())
+            return 1 - _used / _size
+
+
+# ---------------------------- #
+# region store
+
+class RegionStore:
+    """
+    All region files of a world (for every layer).
+
+    Chunk positions are mapped to a region file + a local index.
+
+    """
+
+    def __init__(self, folder: str, region_size: int = DEFAULT_REGION_SIZE) -> None:
+        """ Initialize the region store """
+        self._folder = folder
+        self._region_size = region_size
+        self._regions = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------- #
+    # logic
+
+    def read_chunk(self, chunk_position: tuple, layer_id: int) -> bytes:
+        """ Read the chunk bytes (None if the chunk is not stored) """
+        _region = self.get_region(self.get_region_position(chunk_position), layer_id)
+        if not _region:
+            return None
+        return _region.read(self.get_local_index(chunk_position))
+
+    def write_chunk(self, chunk_position: tuple, layer_id: int, data: bytes):
+        """ Write the chunk bytes """
+        self.write_chunks(layer_id, {chunk_position: data})
+
+    def write_chunks(self, layer_id: int, chunks: dict):
+        """ Write multiple {chunk position: bytes} entries -- grouped per region file """
+        _grouped = {}
+        for _position, _data in chunks.items():
+            _grouped.setdefault(self.get_region_position(_position), {})[self.get_local_index(_position)] = _data
+        for _region_position, _entries in _grouped.items():
+            self.get_region(_region_position, layer_id, create=True).write_many(_entries)
+
+    def iterate_chunk_positions(self, layer_id: int):
+        """ Iterate the positions of all stored chunks of the layer """
+        if not os.path.exists(self._folder):
+            return
+        for _filename in os.listdir(self._folder):
+            _parts = parse_region_filename(_filename)
+            if not _parts or _parts[2] != layer_id:
+                continue
+            _region = self.get_region((_parts[0], _parts[1]), layer_id)
+            for _local_index in _region.get_local_indices():
+                yield (
+                    _parts[0] * self._region_size + _local_index % self._region_size,
+                    _parts[1] * self._region_size + _local_index // self._region_size
+                )
+
+    def flush(self):
+        """ Compact fragmented region files """
+        with self._lock:
+            _regions = list(self._regions.values())
+        for _region in _regions:
+            if _region.get_unused_ratio() > REGION_COMPACT_THRESHOLD:
+                _region.compact()
+
+    def close(self):
+        """ Close all region files """
+        with self._lock:
+            for _region in self._regions.values():
+                _region.close()
+            self._regions.clear()
+
+    # ---------------------------- #
+    # utils
+
+    def get_region(self, region_position: tuple, layer_id: int, create: bool = False) -> RegionFile:
+        """ Get the (open) region file """
+        _key = (region_position[0], region_position[1], layer_id)
+        with self._lock:
+            if _key in self._regions:
+                return self._regions[_key]
+            _path = self._folder + get_region_filename(region_position, layer_id)
+            if not create and not os.path.exists(_path):
+                return None
+            os.makedirs(self._folder, exist_ok=True)
+            self._regions[_key] = RegionFile(_path, self._region_size)
+            return self._regions[_key]
+
+    def get_region_position(self, chunk_position: tuple) -> tuple:
+        """ Get the region that holds the chunk """
+        return (int(chunk_position[0]) // self._region_size, int(chunk_position[1]) // self._region_size)
+
+    def get_local_index(self, chunk_position: tuple) -> int:
+        """ Get the index of the chunk inside of its region """
+        return (int(chunk_position[1]) % self._region_size) * self._region_size + int(chunk_position[0]) % self._region_size
+
+
+# ---------------------------- #
+# utils
+
+def get_region_store(folder: str) -> RegionStore:
+    """ Get the (cached) region store of a folder """
+    with REGION_STORE_CACHE_LOCK:
+        if folder not in REGION_STORE_CACHE:
+            REGION_STORE_CACHE[folder] = RegionStore(folder)
+        return REGION_STORE_CACHE[folder]
+
+def close_region_store(folder: str):
+    """ Close + forget the region store of a folder """
+    with REGION_STORE_CACHE_LOCK:
+        _store = REGION_STORE_CACHE.pop(folder, None)
+    if _store:
+        _store.close()
+
+def get_region_filename(region_position: tuple, layer_id: int) -> str:
+    """ Get the region file name -- `x==y==layer.region` """
+    return f"{region_position[0]}=={region_position[1]}=={layer_id}{REGION_FILE_EXTENSION}"
+
+def parse_region_filename(filename: str) -> tuple:
+    """ Parse a region file name into (x, y, layer) -- None if it is not a region file """
+    if not filename.endswith(REGION_FILE_EXTENSION):
+        return None
+    _parts = filename[:-len(REGION_FILE_EXTENSION)].split("==")
+    if len(_parts) != 3:
+        return None
+    try:
+        return tuple(int(_p) for _p in _parts)
+    except ValueError:
+        return None
+
+def write_region_file(path: str, region_size: int, entries: dict):
+    """ Write a complete region file from {local index: bytes} """
+    _index = np.zeros((region_size ** 2, 2), dtype=REGION_INDEX_DTYPE)
+    _offset = REGION_HEADER.size + _index.nbytes
+    for _local_index, _data in sorted(entries.items()):
+        _index[_local_index] = (_offset, len(_data))
+        _offset += len(_data)
+    with open(path, "wb") as f:
+        f.write(REGION_HEADER.pack(REGION_MAGIC, REGION_VERSION, region_size))
+        f.write(_index.tobytes())
+        for _local_index, _data in sorted(entries.items()):
+            f.write(_data)
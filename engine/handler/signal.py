@@ -1,6 +1,8 @@
 import time
 import pygame
 
+from engine import profiler
+
 
 # ---------------------------- #
 # util functions
@@ -22,10 +24,11 @@ def get_signal(name: str):
 
 def update_signals():
     """ Update all signals """
-    EVENT_QUEUE.sort(key=lambda e: [e[PARENT]._urgency, e[TIME]])
-    for item in EVENT_QUEUE:
-        item[PARENT].handle(item)
-    EVENT_QUEUE.clear()
+    with profiler.scope("signals"):
+        EVENT_QUEUE.sort(key=lambda e: [e[PARENT]._urgency, e[TIME]])
+        for item in EVENT_QUEUE:
+            item[PARENT].handle(item)
+        EVENT_QUEUE.clear()
 
 def push_to_signal_queue(parent, time: float, data: dict):
     """ Push a signal event to the queue """
@@ -1,19 +1,30 @@
 import os
 import dill
-import uuid
+import json
+import math
 import copy
 import pygame
 import pickle
+import contextlib
 import datetime
+import itertools
 import dataclasses
+import concurrent.futures
+
+import numpy as np
 
 from engine import io
 from engine import utils
+from engine import profiler
 from engine import singleton
 
 from engine.handler import signal
 from engine.handler import component
 from engine.handler import aspect
+from engine.handler import query
+from engine.handler import region
+from engine.handler import chunkcodec
+from engine.handler import chunkgen
 
 from engine.graphics import camera
 from engine.graphics import spritesheet
@@ -34,15 +45,53 @@ WORLD_SIGNAL_HANDLER = "_world_signal_handler"
 CAMERA_MOVED_CHUNKS = "_camera_moved_chunks"
 CAMERA_OLD_CHUNK = "_old_chunk"
 CAMERA_NEW_CHUNK = "_new_chunk"
+CAMERA_ENTERED_CHUNKS = "_entered_chunks"
+CAMERA_EXITED_CHUNKS = "_exited_chunks"
 
 
 WORLD_LEVEL_FOLDER = "assets/level/"
 WORLD_LEVEL_CHUNKS_FOLDER = "chunkdata/"
+# converted chunk files are moved here (not deleted)
+WORLD_LEVEL_CHUNKS_BACKUP_FOLDER = "chunkdata_backup/"
+WORLD_LEVEL_REGIONS_FOLDER = "regions/"
+WORLD_MANIFEST_FILE = "manifest.json"
+WORLD_MANIFEST_VERSION = 1
 
 WORLD_CACHE = {}
 
 TRANSPARENT_TILE_BITMASK = 0b10
 
+# tile index storage
+CHUNK_TILE_INDEX_DTYPE = np.uint16
+EMPTY_TILE_INDEX = 0
+INSTANCE_TILE_INDEX = 0xFFFF
+MAX_PALETTE_SIZE = INSTANCE_TILE_INDEX - 1
+
+# tile data keys written by the chunk (not custom data)
+CHUNK_TILE_DATA_KEYS = (CHUNK_TILE_PIXEL_COORD, CHUNK_TILE_PARENT_POSITION_KEY)
+
+# tile classes that override `DefaultTile.update`
+TILE_UPDATE_OVERRIDE_CACHE = {}
+
+# every collision mask bit
+ALL_COLLISION_MASK = 0xFFFF
+
+# tile classes that override `DefaultTile.on_collision`
+TILE_COLLISION_OVERRIDE_CACHE = {}
+
+# tile + chunk ids
+ID_COUNTER = itertools.count(1)
+
+# chunk keys -- (x, y) packed into a single int (32 bits each)
+CHUNK_KEY_BITS = 32
+CHUNK_KEY_MASK = (1 << CHUNK_KEY_BITS) - 1
+CHUNK_KEY_SIGN = 1 << (CHUNK_KEY_BITS - 1)
+
+# simulation level of detail tiers
+SIMULATION_TIER_FULL = 0
+SIMULATION_TIER_REDUCED = 1
+SIMULATION_TIER_FROZEN = 2
+
 # ---------------------------- #
 # tile
 
@@ -57,36 +106,53 @@ class DefaultTile:
     
     """
         
-    _tile_id: str
+    _tile_id: int
     _index_position: tuple
     _sprite_path: str
-    _rect: "pygame.Rect"
     _collision_mask: int
     _data: dict
     _transparent: bool
-    
+
+    # child classes without `__slots__` still get a `__dict__`
+    __slots__ = ("_tile_id", "_index_position", "_sprite_path", "_collision_mask", "_data", "_transparent", "_parent_chunk", "__parent_class__")
+
+    # stateful tiles are stored as full objects inside of the chunk, all other
+    # tiles are shared (per layer) through the tile palette
+    _stateful = False
+
     def __init__(self, position: tuple, sprite: str, transparent: bool = False) -> None:
         """ Initialize the default tile """
-        if not "__parent_class__" in self.__dict__:
+        if not hasattr(self, "__parent_class__"):
             self.__parent_class__ = DefaultTile
         
         self._tile_id = generate_id()
         
         self._index_position = position
         self._sprite_path = sprite
-        self._rect = pygame.FRect(
-            position[0] * singleton.DEFAULT_TILE_WIDTH,
-            position[1] * singleton.DEFAULT_TILE_HEIGHT, 
-            singleton.DEFAULT_TILE_WIDTH, 
-            singleton.DEFAULT_TILE_HEIGHT
-        )
         # 0 = basic collision
         # 1 = projectile collide
         self._collision_mask = 0b0000000000000001
         self._transparent = transparent
         
-        # extra data storage for custom data objects (child classes)
-        self._data = {}
+        # extra data storage for custom data objects (child classes) -- created on first write
+        self._data = None
+        # the chunk that holds the (stateful) tile -- data writes mark it as dirty
+        self._parent_chunk = None
+
+    # ---------------------------- #
+    # properties
+
+    @property
+    def _rect(self) -> pygame.FRect:
+        """ Get the collision rect of the tile (derived from the cell) """
+        if self._parent_chunk:
+            return self._parent_chunk.get_tile_rect(self._index_position)
+        return pygame.FRect(
+            self._index_position[0] * singleton.DEFAULT_TILE_WIDTH,
+            self._index_position[1] * singleton.DEFAULT_TILE_HEIGHT,
+            singleton.DEFAULT_TILE_WIDTH,
+            singleton.DEFAULT_TILE_HEIGHT
+        )
     
     # ---------------------------- #
     # to be overriden
@@ -123,6 +189,8 @@ class DefaultTile:
             self._collision_mask |= 0b1 << (mask_index)
         else:
             self._collision_mask &= ~(0b1 << (mask_index))
+        if self._parent_chunk:
+            self._parent_chunk.update_cell_collision(self._index_position)
     
     def get_mask_value(self, mask_index: int):
         """ Get the mask value """
@@ -134,21 +202,77 @@ class DefaultTile:
         """ Get the mask """
         return self._collision_mask
 
+    # ---------------------------- #
+    # palette
+
+    def is_stateful(self) -> bool:
+        """ Check if the tile needs to be stored as its own object """
+        if self._stateful:
+            return True
+        # custom data is per instance
+        return bool(self.get_custom_data())
+
+    def get_custom_data(self) -> dict:
+        """ Get the custom data items (without the chunk placement keys) -- None if there are none """
+        if not self._data:
+            return None
+        result = {key: value for key, value in self._data.items() if key not in CHUNK_TILE_DATA_KEYS}
+        return result if result else None
+
+    def get_palette_key(self) -> tuple:
+        """ Get the key used to share this tile through a palette """
+        return (self.__class__, self._sprite_path, self._collision_mask, self._transparent)
+
+    # ---------------------------- #
+    # codec
+
+    def get_codec_state(self) -> tuple:
+        """ Get the per-type values written by the chunk codec (matches the registered payload format) """
+        return ()
+
+    def set_codec_state(self, state: tuple):
+        """ Set the per-type values read by the chunk codec """
+        pass
+
+    @classmethod
+    def create_from_codec(cls, position: tuple, sprite: str, collision_mask: int, transparent: bool, state: tuple) -> "DefaultTile":
+        """ Create a tile from chunk codec data -- `__init__` is not called """
+        result = cls.__new__(cls)
+        result.__parent_class__ = DefaultTile
+        result._tile_id = generate_id()
+        result._index_position = position
+        result._sprite_path = sprite
+        result._collision_mask = collision_mask
+        result._transparent = transparent
+        result._data = None
+        result._parent_chunk = None
+        result.set_codec_state(state)
+        return result
+
     def __setitem__(self, key, value):
         """ Set the data item """
+        if self._data is None:
+            self._data = {}
         # check if item can be serialized
-        if key in self._data:
-            self._data[key] = value
-            return
-        # check if it works in dill
-        try:
-            dill.dumps(value)
-            self._data[key] = value
-        except Exception as e:
-            raise ValueError(f"Data item `{key}` cannot be serialized because value: `{value}` is not serializable\nError as : {e}")
+        if key not in self._data:
+            # check if it works in dill
+            try:
+                dill.dumps(value)
+            except Exception as e:
+                raise ValueError(f"Data item `{key}` cannot be serialized because value: `{value}` is not serializable\nError as : {e}")
+        self._data[key] = value
+        if self._parent_chunk and key not in CHUNK_TILE_DATA_KEYS:
+            self._parent_chunk._dirty = True
     
     def __getitem__(self, key):
         """ Get the data item """
+        # placement data is derived from the cell
+        if self._parent_chunk and key == CHUNK_TILE_PIXEL_COORD:
+            return self._parent_chunk.get_tile_pixel_coord(self._index_position)
+        if self._parent_chunk and key == CHUNK_TILE_PARENT_POSITION_KEY:
+            return self._parent_chunk._chunk_hash_str
+        if self._data is None:
+            raise KeyError(key)
         return self._data[key]
     
     def __hash__(self):
@@ -160,16 +284,204 @@ class DefaultTile:
     
     def __getstate__(self):
         """ Get the state of the tile """
-        state = self.__dict__.copy()
+        state = {key: getattr(self, key) for key in DefaultTile.__slots__ if hasattr(self, key)}
+        state.update(getattr(self, "__dict__", {}))
         del state['_data']
+        state.pop('_parent_chunk', None)
         return state
 
     def __setstate__(self, state):
         """ Set the state of the tile """
-        self.__dict__.update(state)
-        self._data = {}
+        # older saves stored the rect + a per tile stateful flag
+        state.pop('_rect', None)
+        state.pop('_stateful', None)
+        for key, value in state.items():
+            setattr(self, key, value)
+        self._data = None
+        self._parent_chunk = None
         # check if sprite is loaded in global
-        
+
+
+chunkcodec.register_tile_class(DefaultTile, 1)
+
+
+# ---------------------------- #
+# tile palette
+
+class TilePalette:
+    """
+    A list of tile prototypes shared by every chunk in a layer.
+
+    Chunks only store the index of the prototype for each cell.
+    Index 0 is reserved for empty cells.
+
+    """
+
+    def __init__(self) -> None:
+        """ Initialize the tile palette """
+        self._tiles = [None]
+        self._lookup = {}
+        # indices of the prototypes that override `update` (+ how many prototypes were checked)
+        self._tick_indices = []
+        self._tick_checked = 1
+        # collision mask + transparency of every index (rebuilt when prototypes were added)
+        self._mask_array = None
+        self._transparent_array = None
+
+    # ---------------------------- #
+    # logic
+
+    def get_index(self, tile: DefaultTile) -> int:
+        """ Get the palette index of the tile - adds a new prototype if needed """
+        key = tile.get_palette_key()
+        if key in self._lookup:
+            return self._lookup[key]
+        if len(self._tiles) > MAX_PALETTE_SIZE:
+            raise ValueError(f"Tile palette is full, cannot add more than {MAX_PALETTE_SIZE} tile prototypes")
+        # a copy becomes the prototype for all tiles that look like it -- later changes to
+        # the caller's tile would leave the lookup key + cell masks stale
+        self._lookup[key] = len(self._tiles)
+        self._tiles.append(copy_tile(tile))
+        return self._lookup[key]
+
+    def get_tick_indices(self) -> list:
+        """ Get the indices of the prototypes that override `update` """
+        # older saves have no tick indices
+        if not hasattr(self, "_tick_indices"):
+            self._tick_indices = []
+            self._tick_checked = 1
+        for i in range(self._tick_checked, len(self._tiles)):
+            if tile_overrides_update(self._tiles[i]):
+                self._tick_indices.append(i)
+        self._tick_checked = len(self._tiles)
+        return self._tick_indices
+
+    def get_mask_arrays(self) -> tuple:
+        """ Get the (collision mask, transparent) arrays indexed by palette index -- empty cells are transparent """
+        # older saves have no mask arrays
+        if getattr(self, "_mask_array", None) is None or len(self._mask_array) != len(self._tiles):
+            self._mask_array = np.array([0] + [_tile._collision_mask for _tile in self._tiles[1:]], dtype=np.uint16)
+            self._transparent_array = np.array([True] + [_tile._transparent for _tile in self._tiles[1:]], dtype=bool)
+        return self._mask_array, self._transparent_array
+
+    def get_remap_array(self, other: "TilePalette") -> np.ndarray:
+        """ Get an array that maps indices of `other` into this palette """
+        result = np.zeros(len(other), dtype=CHUNK_TILE_INDEX_DTYPE)
+        for i in range(1, len(other)):
+            result[i] = self.get_index(other[i])
+        return result
+
+    # ---------------------------- #
+    # utils
+
+    def __getitem__(self, index: int) -> DefaultTile:
+        """ Get the prototype at the index """
+        return self._tiles[index]
+
+    def __len__(self) -> int:
+        """ Get the number of indices (including the empty index) """
+        return len(self._tiles)
+
+
+# ---------------------------- #
+# tile view
+
+class TileView:
+    """
+    A view of a palette tile placed inside of a chunk.
+
+    Views are created on access and act like the tile they point to.
+    Writing data into a view turns the cell into a full tile object.
+
+    """
+
+    __slots__ = ("_chunk", "_position", "_prototype")
+
+    def __init__(self, chunk: "Chunk", position: tuple, prototype: DefaultTile) -> None:
+        """ Initialize the tile view """
+        self._chunk = chunk
+        self._position = position
+        self._prototype = prototype
+
+    # ---------------------------- #
+    # properties
+
+    @property
+    def _index_position(self) -> tuple:
+        """ Get the position of the tile inside of the chunk """
+        return self._position
+
+    @property
+    def _rect(self) -> pygame.FRect:
+        """ Get the world collision rect of the tile """
+        return self._chunk.get_tile_rect(self._position)
+
+    # ---------------------------- #
+    # utils
+
+    def set_mask_value(self, mask_index: int, value: bool):
+        """ Set the mask value - moves the cell to a different prototype """
+        tile = copy_tile(self._prototype)
+        tile.set_mask_value(mask_index, value)
+        self._chunk.set_tile_at(self._position, tile)
+        self._prototype = self._chunk._palette[self._chunk._tile_indices[self._position[1], self._position[0]]]
+
+    def __getattr__(self, name: str):
+        """ Read everything else from the prototype """
+        return getattr(self._prototype, name)
+
+    def __getitem__(self, key):
+        """ Get the data item """
+        if key == CHUNK_TILE_PIXEL_COORD:
+            return self._chunk.get_tile_pixel_coord(self._position)
+        if key == CHUNK_TILE_PARENT_POSITION_KEY:
+            return self._chunk._chunk_hash_str
+        return self._prototype[key]
+
+    def __setitem__(self, key, value):
+        """ Set the data item - the cell now needs its own tile """
+        self._chunk.materialize_tile_at(self._position)[key] = value
+
+    def __eq__(self, other):
+        """ Check if two views point to the same cell """
+        if isinstance(other, TileView):
+            return self._chunk is other._chunk and self._position == other._position
+        return False
+
+    def __hash__(self):
+        """ Hash the view """
+        return hash((self._chunk._chunk_id, self._position))
+
+    def __repr__(self):
+        """ String representation of the view """
+        return f"TileView({self._position} -> {self._prototype})"
+
+
+# ---------------------------- #
+# tile region
+
+class TileRegion:
+    """
+    A copied block of tiles (see `Layer.copy_region`).
+
+    The cells hold indices into the palette of the layer it was copied from,
+    stateful tiles are kept as copies.
+
+    """
+
+    __slots__ = ("_palette", "_indices", "_instances")
+
+    def __init__(self, palette: TilePalette, indices: np.ndarray, instances: dict) -> None:
+        """ Initialize the tile region -- instances = {region position: tile} """
+        self._palette = palette
+        self._indices = indices
+        self._instances = instances
+
+    @property
+    def size(self) -> tuple:
+        """ Get the (width, height) of the region in tiles """
+        return (self._indices.shape[1], self._indices.shape[0])
+
 
 # ---------------------------- #
 # chunk
@@ -185,6 +497,7 @@ class Chunk:
         """ Initialize the (square) chunks """
         self._chunk_id = generate_id()
         self._chunk_hash_str = f"{chunk_position[0]}=={chunk_position[1]}"
+        self._chunk_key = pack_chunk_key(chunk_position)
         self._layer = None
         self._world_storage_key = None
         
@@ -211,89 +524,431 @@ class Chunk:
         self._chunk_gameobjects = set()
     
         # create tile storage
-        self._tiles = [ 
-            [ 
-                None 
-                for j in range(self._chunk_tile_dimensions[0]) 
-            ] 
-            for i in range(self._chunk_tile_dimensions[1])
-        ]
+        # - each cell holds an index into the (layer) tile palette
+        # - stateful tiles are kept as objects + marked with `INSTANCE_TILE_INDEX`
+        self._palette = TilePalette()
+        self._tile_indices = create_tile_index_array(self._chunk_tile_dimensions)
+        self._tile_instances = {}
 
         # all images need to resized / set to the right dimensions (to the dimension of the tile)
         # this script will cache the loaded sprites for faster access
         self._sprite_cacher = spritecacher.SpriteCacher(self._tile_pixel_area)
+
+        # static tiles are rendered once into the baked surface
+        # - tiles that update themselves are drawn every frame (overlay)
+        self._baked_surface = None
+        self._baked_dirty = True
+        self._overlay_cells = []
+
+        # occupancy bitmaps -- kept up to date with the tile indices
+        # - the collision mask of every filled cell (bit n = bitmap of mask bit n)
+        # - cells holding a non transparent tile
+        self._tile_masks = np.zeros(self._tile_indices.shape, dtype=np.uint16)
+        self._solid_cells = np.zeros(self._tile_indices.shape, dtype=bool)
+
+        # merged solid rects (built lazily, see `get_collision_rects`)
+        # - cells whose tile overrides `on_collision` (None = rebuild)
+        # - {body collision mask: [world rect]}
+        self._collision_callback_cells = None
+        self._collision_rects = {}
+        # {(mask, solid): bool array} -- see `get_mask_cells`
+        self._mask_cells = {}
+
+        # tick list -- only tiles whose class overrides `update` are updated
+        # - shared prototypes are updated once per chunk {palette index: cell count}
+        # - stateful tiles are updated one by one {position: tile}
+        self._tick_indices = {}
+        self._tick_instances = {}
+
+        # filled in by the layer chunk generator
+        self._generated = False
+
+        # changed since the chunk file was last written
+        self._dirty = False
     
     # ---------------------------- #
     # logic
     
     def update_and_render(self, surface: pygame.Surface, _camera: camera.PseudoCamera):
         """ Update and render the chunk """
-        # update all tiles
-        for row in self._tiles:
-            for tile in row:
-                if not tile:
-                    continue
-                # update logic
-                tile.update()
-                # render logic
-                surface.blit(
-                    self._sprite_cacher[tile._sprite_path], 
-                    tile[CHUNK_TILE_PIXEL_COORD] - _camera.position + self._chunk_offset
+        if self._baked_dirty:
+            self.bake()
+        _offset = self._chunk_offset - _camera.position
+        surface.blit(self._baked_surface, _offset)
+        self.update_tiles()
+        # render all dynamic tiles
+        for x, y in self._overlay_cells:
+            tile = self.get_tile_object_at((x, y))
+            surface.blit(self._sprite_cacher[tile._sprite_path], (x * self._tile_pixel_area[0] + _offset.x, y * self._tile_pixel_area[1] + _offset.y))
+        
+        if not singleton.DEBUG and not singleton.EDITOR_DEBUG:
+            return
+        for y, x in self.get_filled_cells():
+            pygame.draw.rect(surface, (255, 255, 255, 150),
+                pygame.Rect(self.get_tile_pixel_coord((x, y)) + _offset, self._tile_pixel_area), 1)
+
+    def update_tiles(self):
+        """ Update the tiles in the tick list """
+        for _index in self._tick_indices:
+            self._palette[_index].update()
+        for _tile in self._tick_instances.values():
+            _tile.update()
+
+    def bake(self):
+        """ Render all static tiles into the baked chunk surface """
+        if not self._baked_surface:
+            self._baked_surface = pygame.Surface((
+                self._chunk_tile_dimensions[0] * self._tile_pixel_area[0],
+                self._chunk_tile_dimensions[1] * self._tile_pixel_area[1]
+            ), singleton.DEFAULT_SURFACE_FLAGS).convert_alpha()
+        self._baked_surface.fill((0, 0, 0, 0))
+        self._overlay_cells.clear()
+        for y, x in self.get_filled_cells():
+            tile = self.get_tile_object_at((x, y))
+            if tile_overrides_update(tile):
+                self._overlay_cells.append((x, y))
+                continue
+            self._baked_surface.blit(self._sprite_cacher[tile._sprite_path], (x * self._tile_pixel_area[0], y * self._tile_pixel_area[1]))
+        self._baked_dirty = False
+
+    def invalidate_baked_surface(self):
+        """ Rebake the chunk surface before the next render """
+        self._baked_dirty = True
+
+    def invalidate_tile_caches(self):
+        """ Rebake the chunk surface + rebuild the collision geometry before they are used next """
+        self._baked_dirty = True
+        self._collision_callback_cells = None
+        self._collision_rects = {}
+        self._mask_cells = {}
+
+    # ---------------------------- #
+    # collision geometry
+
+    def build_collision_callback_cells(self):
+        """ Collect the cells whose tile overrides `on_collision` """
+        self._collision_callback_cells = []
+        # shared tiles -- one lookup per prototype
+        for _index in set(self._tile_indices.ravel().tolist()) - {EMPTY_TILE_INDEX, INSTANCE_TILE_INDEX}:
+            if tile_overrides_collision(self._palette[_index]):
+                self._collision_callback_cells.extend((x, y) for y, x in np.argwhere(self._tile_indices == _index).tolist())
+        for _position, _tile in self._tile_instances.items():
+            if tile_overrides_collision(_tile):
+                self._collision_callback_cells.append(_position)
+
+    def get_collision_rects(self, mask: int) -> list:
+        """ 
+        Get the merged solid rects that collide with the (body) collision mask
+
+        Solid cells that share a mask bit with the body are greedy meshed into
+        maximal world rects. The rects are cached per mask + rebuilt after the tiles changed.
+        """
+        if mask not in self._collision_rects:
+            self._collision_rects[mask] = [
+                pygame.FRect(
+                    x * self._tile_pixel_area[0] + self._pixel_coords[0],
+                    y * self._tile_pixel_area[1] + self._pixel_coords[1],
+                    w * self._tile_pixel_area[0],
+                    h * self._tile_pixel_area[1]
                 )
-                if singleton.DEBUG or singleton.EDITOR_DEBUG:
-                    pygame.draw.rect(surface, (255, 255, 255, 150),
-                        pygame.Rect(tile[CHUNK_TILE_PIXEL_COORD] - _camera.position + self._chunk_offset, 
-                            self._sprite_cacher[tile._sprite_path].get_size()), 1)
+                for x, y, w, h in greedy_mesh(self.get_mask_cells(mask, solid=True))
+            ]
+        return self._collision_rects[mask]
+
+    def get_collision_callback_cells(self) -> list:
+        """ Get the cells [(x, y)] whose tile overrides `on_collision` """
+        if self._collision_callback_cells is None:
+            self.build_collision_callback_cells()
+        return self._collision_callback_cells
+
+    def is_mask_at(self, position: tuple, mask: int, solid: bool = False) -> bool:
+        """ Check if the cell holds a tile that shares a bit with the mask (+ is not transparent) """
+        if solid and not self._solid_cells[position[1], position[0]]:
+            return False
+        return bool(self._tile_masks[position[1], position[0]] & mask)
+
+    def get_mask_cells(self, mask: int, solid: bool = False) -> np.ndarray:
+        """ Get the (rows, columns) bool array of the cells that share a bit with the mask -- cached, do not modify """
+        if (mask, solid) not in self._mask_cells:
+            result = (self._tile_masks & mask) != 0
+            if solid:
+                result &= self._solid_cells
+            self._mask_cells[(mask, solid)] = result
+        return self._mask_cells[(mask, solid)]
+
+    def get_callback_cells(self, mask: int) -> np.ndarray:
+        """ Get the (rows, columns) bool array of the collision callback cells that share a bit with the mask -- cached """
+        if (mask, None) not in self._mask_cells:
+            result = np.zeros(self._tile_indices.shape, dtype=bool)
+            for x, y in self.get_collision_callback_cells():
+                result[y, x] = bool(self._tile_masks[y, x] & mask)
+            self._mask_cells[(mask, None)] = result
+        return self._mask_cells[(mask, None)]
+
+    def collide_solid_rects(self, rect: pygame.Rect, mask: int) -> "Iterable":
+        """ 
+        Collide the merged solid rects of the mask with the rect
+
+        The rect is tested again for every solid rect, it can be moved while iterating.
+        """
+        for _solid in self.get_collision_rects(mask):
+            if phandler.collide_rect_to_rect(rect, _solid):
+                yield _solid
+
+    def collide_callback_tiles(self, rect: pygame.Rect, mask: int) -> "Iterable":
+        """ Collide the tiles with collision callbacks (+ an overlapping mask) with the rect """
+        for _position in self.get_collision_callback_cells():
+            if not self._tile_masks[_position[1], _position[0]] & mask:
+                continue
+            if phandler.collide_rect_to_rect(rect, self.get_tile_rect(_position)):
+                yield self.get_tile_at(_position)
 
     def collide_tiles(self, rect: pygame.Rect) -> "Iterable":
         """ Collide the tiles """
-        for j in range(self._chunk_tile_dimensions[1]):
-            for i in range(self._chunk_tile_dimensions[0]):
-                # check if tile exists
-                if not self._tiles[j][i]:
-                    continue
+        _start, _end = get_tile_range_from_rect(rect, self._tile_pixel_area)
+        yield from self.collide_tile_range(
+            rect,
+            (max(_start[0] - self._chunk_position[0] * self._chunk_tile_dimensions[0], 0),
+                max(_start[1] - self._chunk_position[1] * self._chunk_tile_dimensions[1], 0)),
+            (min(_end[0] - self._chunk_position[0] * self._chunk_tile_dimensions[0], self._chunk_tile_dimensions[0] - 1),
+                min(_end[1] - self._chunk_position[1] * self._chunk_tile_dimensions[1], self._chunk_tile_dimensions[1] - 1))
+        )
 
+    def collide_tile_range(self, rect: pygame.Rect, start: tuple, end: tuple) -> "Iterable":
+        """ 
+        Collide the tiles inside of the (inclusive) local tile range 
+
+        The rect is tested again for every tile, it can be moved while iterating.
+        """
+        if start[0] > end[0] or start[1] > end[1]:
+            return
+        _block = self._tile_indices[start[1]:end[1] + 1, start[0]:end[0] + 1].tolist()
+        for j, _row in enumerate(_block):
+            for i, _index in enumerate(_row):
+                if _index == EMPTY_TILE_INDEX:
+                    continue
                 # check if colliding
-                if phandler.collide_rect_to_rect(rect, self._tiles[j][i]._rect):
-                    yield self._tiles[j][i]
+                if phandler.collide_rect_to_rect(rect, self.get_tile_rect((start[0] + i, start[1] + j))):
+                    yield self.get_tile_at((start[0] + i, start[1] + j))
 
     # ---------------------------- #
     # utils
     
     def get_tile_at(self, position: tuple) -> DefaultTile:
         """ Get the tile at the position """
-        return self._tiles[position[1]][position[0]]
+        index = self._tile_indices[position[1], position[0]]
+        if index == EMPTY_TILE_INDEX:
+            return None
+        if index == INSTANCE_TILE_INDEX:
+            return self._tile_instances[(position[0], position[1])]
+        return TileView(self, (position[0], position[1]), self._palette[index])
+
+    def get_tile_object_at(self, position: tuple) -> DefaultTile:
+        """ Get the tile object (prototype or instance) at the position - no view is created """
+        index = self._tile_indices[position[1], position[0]]
+        if index == INSTANCE_TILE_INDEX:
+            return self._tile_instances[(position[0], position[1])]
+        return self._palette[index]
     
     def set_tile_at(self, position: tuple, tile: DefaultTile):
         """ Set the tile at the position """
+        position = (int(position[0]), int(position[1]))
+        self._remove_tick(position, self._tile_indices[position[1], position[0]])
+        if (_old := self._tile_instances.pop(position, None)):
+            _old._parent_chunk = None
+        self.invalidate_tile_caches()
+        self._dirty = True
         # check if need to just REMOVE the tile
         if not tile:
-            self._tiles[position[1]][position[0]] = None
+            self._tile_indices[position[1], position[0]] = EMPTY_TILE_INDEX
+            self._set_cell_mask(position, None)
             return
-        self._tiles[position[1]][position[0]] = tile
-        tile._index_position = (position[0], position[1])
-        # define the collision rect of the tile
-        tile._rect.topleft = (
-            position[0] * self._tile_pixel_area[0] + self._pixel_coords[0],
-            position[1] * self._tile_pixel_area[1] + self._pixel_coords[1]
-        )
-        tile._rect.size = (self._tile_pixel_area[0], self._tile_pixel_area[1])
-        # define the position of the tile -- topleft
-        tile[CHUNK_TILE_PIXEL_COORD] = pygame.math.Vector2(
-            self._tile_pixel_area[0] * position[0],
-            self._tile_pixel_area[1] * position[1],
-        )
+        # placing a view = placing the tile it points to
+        if isinstance(tile, TileView):
+            tile = tile._prototype
         
-        # set parent definition into tile
-        tile[CHUNK_TILE_PARENT_POSITION_KEY] = self.get_chunk_hash_str(self._chunk_position)
+        if tile.is_stateful():
+            self._place_tile_instance(position, tile)
+            return
+
+        # shared tile - only store the palette index
+        index = self._palette.get_index(tile)
+        self._tile_indices[position[1], position[0]] = index
+        tile = self._palette[index]
+        self._set_cell_mask(position, tile)
+        if tile_overrides_update(tile):
+            self._tick_indices[index] = self._tick_indices.get(index, 0) + 1
+        tile.__post_init__(self)
+
+        # cache sprite
+        self._sprite_cacher.load_sprite(tile._sprite_path)
+
+    def _place_tile_instance(self, position: tuple, tile: DefaultTile):
+        """ Place a stateful tile object into the chunk """
+        self._tile_indices[position[1], position[0]] = INSTANCE_TILE_INDEX
+        self._tile_instances[position] = tile
+        # the rect + pixel coords + parent key are derived from the cell
+        tile._index_position = position
+        tile._parent_chunk = self
+        self._set_cell_mask(position, tile)
+        if tile_overrides_update(tile):
+            self._tick_instances[position] = tile
         tile.__post_init__(self)
 
         # cache sprite
         self._sprite_cacher.load_sprite(tile._sprite_path)
+
+    def materialize_tile_at(self, position: tuple) -> DefaultTile:
+        """ Turn the palette tile at the position into its own (stateful) tile object """
+        position = (int(position[0]), int(position[1]))
+        index = self._tile_indices[position[1], position[0]]
+        if index == EMPTY_TILE_INDEX:
+            return None
+        if index == INSTANCE_TILE_INDEX:
+            return self._tile_instances[position]
+        tile = copy_tile(self._palette[index])
+        self._remove_tick(position, index)
+        self._place_tile_instance(position, tile)
+        self._dirty = True
+        return tile
+
+    def _set_cell_mask(self, position: tuple, tile: DefaultTile):
+        """ Write the collision mask + solidity of the tile into the occupancy bitmaps """
+        self._tile_masks[position[1], position[0]] = tile._collision_mask if tile else 0
+        self._solid_cells[position[1], position[0]] = bool(tile) and not tile._transparent
+
+    def update_cell_collision(self, position: tuple):
+        """ Re-read the collision mask of the (stateful) tile at the position """
+        self._set_cell_mask(position, self.get_tile_object_at(position))
+        self.invalidate_tile_caches()
+
+    def _rebuild_cell_masks(self):
+        """ Rebuild the occupancy bitmaps from the tile indices + stateful tiles """
+        _masks, _transparent = self._palette.get_mask_arrays()
+        _indices = np.where(self._tile_indices == INSTANCE_TILE_INDEX, EMPTY_TILE_INDEX, self._tile_indices)
+        self._tile_masks = _masks[_indices]
+        self._solid_cells = ~_transparent[_indices]
+        for _position, _tile in self._tile_instances.items():
+            self._set_cell_mask(_position, _tile)
+
+    def _remove_tick(self, position: tuple, index: int):
+        """ Remove the cell (holding the index) from the tick list """
+        if index == INSTANCE_TILE_INDEX:
+            self._tick_instances.pop(position, None)
+            return
+        if index not in self._tick_indices:
+            return
+        self._tick_indices[index] -= 1
+        if not self._tick_indices[index]:
+            del self._tick_indices[index]
+
+    def fill_empty_cells(self, indices: np.ndarray, tiles: dict):
+        """ 
+        Fill the empty cells with generated tiles
+        
+        indices = (rows, columns) array of `tiles` keys (0 = empty)
+        tiles = {index: prototype tile}
+        """
+        _remap = np.zeros(max(tiles, default=0) + 1, dtype=CHUNK_TILE_INDEX_DTYPE)
+        for _index, _tile in tiles.items():
+            _remap[_index] = self._palette.get_index(_tile)
+        _new = _remap[indices]
+        _mask = (self._tile_indices == EMPTY_TILE_INDEX) & (_new != EMPTY_TILE_INDEX)
+        self._tile_indices[_mask] = _new[_mask]
+        # run post init + cache sprites once per prototype
+        for _index in np.unique(_new[_mask]):
+            self._palette[_index].__post_init__(self)
+            self._sprite_cacher.load_sprite(self._palette[_index]._sprite_path)
+        self._rebuild_tick_indices()
+        self._rebuild_cell_masks()
+        self.invalidate_tile_caches()
+
+    def set_tile_block(self, start: tuple, indices: np.ndarray, instances: dict = None, mask: np.ndarray = None):
+        """ 
+        Write a block of (palette) indices at the local start position
+
+        Every cell of the block that is written is treated like `set_tile_at`,
+        but the tick list + baked surface are only updated once.
+
+        instances = {local position: stateful tile}, placed after the indices
+        mask = cells of the block that are written (all if None)
+        """
+        _h, _w = indices.shape
+        if mask is None:
+            mask = np.ones(indices.shape, dtype=bool)
+        # stateful tiles that are replaced
+        for _position in [
+            _p for _p in self._tile_instances
+            if start[0] <= _p[0] < start[0] + _w and start[1] <= _p[1] < start[1] + _h and mask[_p[1] - start[1], _p[0] - start[0]]
+        ]:
+            self._tick_instances.pop(_position, None)
+            self._tile_instances.pop(_position)._parent_chunk = None
+        self._tile_indices[start[1]:start[1] + _h, start[0]:start[0] + _w][mask] = indices[mask]
+        # run post init + cache sprites once per prototype
+        for _index in set(indices[mask].tolist()) - {EMPTY_TILE_INDEX, INSTANCE_TILE_INDEX}:
+            self._palette[_index].__post_init__(self)
+            self._sprite_cacher.load_sprite(self._palette[_index]._sprite_path)
+        for _position, _tile in (instances or {}).items():
+            self._place_tile_instance(_position, _tile)
+        self._rebuild_tick_indices()
+        self._rebuild_cell_masks()
+        self.invalidate_tile_caches()
+        self._dirty = True
+
+    def _rebuild_tick_indices(self):
+        """ Count the cells of all shared tiles that override `update` """
+        self._tick_indices = {}
+        for _index in self._palette.get_tick_indices():
+            if (_count := int(np.count_nonzero(self._tile_indices == _index))):
+                self._tick_indices[_index] = _count
+
+    def get_tile_rect(self, position: tuple) -> pygame.FRect:
+        """ Get the world collision rect of the cell at the position """
+        return pygame.FRect(
+            position[0] * self._tile_pixel_area[0] + self._pixel_coords[0],
+            position[1] * self._tile_pixel_area[1] + self._pixel_coords[1],
+            self._tile_pixel_area[0],
+            self._tile_pixel_area[1]
+        )
+
+    def get_tile_pixel_coord(self, position: tuple) -> pygame.math.Vector2:
+        """ Get the position of the cell relative to the chunk -- topleft """
+        return pygame.math.Vector2(
+            self._tile_pixel_area[0] * position[0],
+            self._tile_pixel_area[1] * position[1]
+        )
+
+    def set_palette(self, palette: TilePalette):
+        """ Move the chunk onto a different tile palette """
+        if palette is self._palette:
+            return
+        # nothing to remap (new chunks)
+        if len(self._palette) == 1:
+            self._palette = palette
+            self._rebuild_tick_indices()
+            self.invalidate_tile_caches()
+            return
+        _remap = palette.get_remap_array(self._palette)
+        # keep the instance marker as is
+        _instances = self._tile_indices == INSTANCE_TILE_INDEX
+        self._tile_indices = _remap[np.where(_instances, EMPTY_TILE_INDEX, self._tile_indices)]
+        self._tile_indices[_instances] = INSTANCE_TILE_INDEX
+        self._palette = palette
+        self._rebuild_tick_indices()
+        self.invalidate_tile_caches()
+
+    def iter_tiles(self) -> "Iterable":
+        """ Iterate all (position, tile) pairs in the chunk """
+        for y, x in self.get_filled_cells():
+            yield (x, y), self.get_tile_at((x, y))
+
+    def get_filled_cells(self) -> list:
+        """ Get the [row, column] of all non empty cells """
+        return np.argwhere(self._tile_indices).tolist()
     
     def __hash__(self):
         """ Hash the chunk """
-        return hash(self._chunk_hash_str)
+        return self._chunk_key
 
     def __str__(self):
         """ String representation of the chunk """
@@ -308,9 +963,9 @@ class Chunk:
         return f"{position[0]}=={position[1]}"
     
     @classmethod
-    def get_chunk_hash(cls, position: tuple) -> str:
-        """ Get the chunk hash """
-        return hash(cls.get_chunk_hash_str(position))
+    def get_chunk_key(cls, position: tuple) -> int:
+        """ Get the chunk key (stable across interpreter runs) """
+        return pack_chunk_key(position)
 
     @classmethod
     def generate_chunk_rect_given_chunk_position(cls, chunk_pos: tuple, camera: camera.PseudoCamera):
@@ -335,20 +990,26 @@ class Chunk:
         """ Get the state of the chunk """
         state = self.__dict__.copy()
         # load all chunks into a chunk save file
-        _filename = self._chunk_hash_str + "==" + str(self._layer._layer_id)
-        
+        del state["_tile_indices"]
+        del state["_tile_instances"]
+        del state["_sprite_cacher"]
+        del state["_baked_surface"]
+        del state["_overlay_cells"]
+        del state["_tile_masks"]
+        del state["_solid_cells"]
+        del state["_collision_callback_cells"]
+        del state["_collision_rects"]
+        del state["_mask_cells"]
+        del state["_tick_indices"]
+        del state["_tick_instances"]
         if not singleton.SAVING_WORLD_FLAG:
-            del state["_tiles"]
-            del state["_sprite_cacher"]
             return state
 
-        # the chunk save folder should already exist
-        # we save the chunkdata into the file to isolate chunk data and world data (transferrable terrain) 
-        with open(WORLD_LEVEL_FOLDER + self._world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER + _filename, 'wb') as f:
-            print("Saving Chunk: ", self._chunk_hash_str, " | to file: ", WORLD_LEVEL_FOLDER + self._world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER + _filename)
-            f.write(pickle.dumps(self._tiles))
-        del state["_tiles"]
-        del state["_sprite_cacher"]
+        # chunks are written by `Layer.save_dirty_chunks` -- only unsaved edits are left here
+        if self._dirty:
+            write_chunk_data(self._world_storage_key, self._chunk_position, self._layer._layer_id, self.serialize_chunk_data())
+            self._layer._stored_chunk_keys.add(self._chunk_key)
+            self._dirty = False
         # return the state
         return state
     
@@ -356,26 +1017,99 @@ class Chunk:
         """ Set the state of the chunk """
         # recreate the hash str
         self.__dict__.update(state)
+        # older saves have no chunk key
+        self._chunk_key = pack_chunk_key(self._chunk_position)
         # update size
         self._tile_pixel_area = (
             singleton.DEFAULT_TILE_WIDTH if not self.__tile_pixel_area[0] else self.__tile_pixel_area[0],
             singleton.DEFAULT_TILE_HEIGHT if not self.__tile_pixel_area[1] else self.__tile_pixel_area[1]
         )
+        # empty tile storage - filled by `load_chunk_data`
+        if "_palette" not in state:
+            self._palette = TilePalette()
+        self._tile_indices = create_tile_index_array(self._chunk_tile_dimensions)
+        self._tile_instances = {}
         # create a new sprite cacher
         self._sprite_cacher = spritecacher.SpriteCacher(self._tile_pixel_area)
+        self._baked_surface = None
+        self._baked_dirty = True
+        self._overlay_cells = []
+        self._tile_masks = np.zeros(self._tile_indices.shape, dtype=np.uint16)
+        self._solid_cells = np.zeros(self._tile_indices.shape, dtype=bool)
+        self._collision_callback_cells = None
+        self._collision_rects = {}
+        self._mask_cells = {}
+        self._tick_indices = {}
+        self._tick_instances = {}
+        self._dirty = False
+        self._generated = state.get("_generated", False)
+
+    def serialize_chunk_data(self) -> bytes:
+        """ Serialize the chunk data (main thread) -- the bytes can be written anywhere """
+        _data = self.get_chunk_data()
+        return chunkcodec.encode_chunk(_data["indices"], _data["palette"], _data["instances"])
+
+    def get_chunk_data(self) -> dict:
+        """ 
+        Get the tile data of the chunk (what gets written into the chunk file)
+        
+        The palette is stored per chunk (only the used prototypes) so that
+        chunk files can be loaded into any layer.
+        """
+        _used = np.unique(self._tile_indices)
+        _used = _used[(_used != EMPTY_TILE_INDEX) & (_used != INSTANCE_TILE_INDEX)]
+        return {
+            "indices": self._tile_indices.copy(),
+            "palette": {int(i): self._palette[i] for i in _used},
+            "instances": dict(self._tile_instances),
+        }
 
     def load_chunk_data(self):
         """ Load the chunk data """
         # load up the chunk save file
-        _filename = self._chunk_hash_str + "==" + str(self._layer._layer_id)
-        with open(WORLD_LEVEL_FOLDER + "/" + self._world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER + _filename, 'rb') as f:
-            _tiles = dill.load(f)
-        self._tiles = [ [ None for x in range(len(_tiles[y])) ] for y in range(len(_tiles)) ]
-        # re "place" all the tiles
-        for y in range(len(_tiles)):
-            for x in range(len(_tiles[y])):
-                if _tiles[y][x]:
-                    self.set_tile_at((x, y), _tiles[y][x])        
+        self.apply_chunk_data(read_chunk_data(self._world_storage_key, self._chunk_position, self._layer._layer_id))
+
+    def apply_chunk_data(self, _data: object):
+        """ 
+        Apply chunk data read from a chunk file (main thread)
+
+        The data can be read on any thread with `read_chunk_data`.
+        """
+        self._dirty = False
+        self._tile_indices = create_tile_index_array(self._chunk_tile_dimensions)
+        self._tile_instances = {}
+        self._tick_indices = {}
+        self._tick_instances = {}
+        self._tile_masks = np.zeros(self._tile_indices.shape, dtype=np.uint16)
+        self._solid_cells = np.zeros(self._tile_indices.shape, dtype=bool)
+        self.invalidate_tile_caches()
+
+        # legacy chunk files -- nested list of tiles
+        if isinstance(_data, list):
+            # re "place" all the tiles
+            for y in range(len(_data)):
+                for x in range(len(_data[y])):
+                    if _data[y][x]:
+                        self.set_tile_at((x, y), _data[y][x])
+            return
+
+        # palette chunk files
+        _remap = np.zeros(INSTANCE_TILE_INDEX + 1, dtype=CHUNK_TILE_INDEX_DTYPE)
+        _remap[INSTANCE_TILE_INDEX] = INSTANCE_TILE_INDEX
+        for _index, _tile in _data["palette"].items():
+            _remap[_index] = self._palette.get_index(_tile)
+        self._tile_indices = _remap[_data["indices"]]
+        self._rebuild_tick_indices()
+        self._rebuild_cell_masks()
+        # run post init + cache sprites once per prototype
+        for _index in np.unique(self._tile_indices):
+            if _index == EMPTY_TILE_INDEX or _index == INSTANCE_TILE_INDEX:
+                continue
+            self._palette[_index].__post_init__(self)
+            self._sprite_cacher.load_sprite(self._palette[_index]._sprite_path)
+        # re "place" all the stateful tiles
+        for _position, _tile in _data["instances"].items():
+            self._place_tile_instance(_position, _tile)
     
         
 # ---------------------------- #
@@ -394,6 +1128,16 @@ class Layer:
         # chunk handler
         self._chunks = {}
         self._world = None
+        # keys of all chunks that have a chunk file (resident or not)
+        self._stored_chunk_keys = set()
+        # resident chunks inside of the camera view -- {chunk key: chunk}
+        self._visible_chunks = {}
+        # procedural chunks -- new chunks request their tiles from the generator
+        self._generator = None
+        self._generator_cache = None
+
+        # tile prototypes shared by all chunks in the layer
+        self._palette = TilePalette()
 
         # data
         self._data = {}
@@ -405,16 +1149,14 @@ class Layer:
         """ Update and render the layer """
         self._layer_buffer.fill((0, 0, 0, 0))
         # update the chunks
-        for chunk_hash_str in self._world._renderable_chunks_hash_strs:
-            if chunk_hash_str not in self._chunks:
-                continue
-            self._chunks[chunk_hash_str].update_and_render(self._layer_buffer, camera)
+        for chunk in self._visible_chunks.values():
+            chunk.update_and_render(self._layer_buffer, camera)
             
             if not singleton.DEBUG and not singleton.EDITOR_DEBUG:
                 continue
             # draw chunk rect
             pygame.draw.rect(self._layer_buffer, (255, 255, 255, 150), 
-                Chunk.generate_chunk_rect_given_chunk_position(self._chunks[chunk_hash_str]._chunk_position, camera), 1)
+                Chunk.generate_chunk_rect_given_chunk_position(chunk._chunk_position, camera), 1)
     
     def render(self, surface: pygame.Surface):
         """ Render the layer """
@@ -460,24 +1202,25 @@ class Layer:
 
     def set_chunk_at(self, chunk: Chunk):
         """ Set the chunk at the position """
-        self._chunks[hash(chunk)] = chunk
+        self._chunks[chunk._chunk_key] = chunk
+        if chunk._chunk_key in self._world._visible_chunk_keys:
+            self._visible_chunks[chunk._chunk_key] = chunk
         # set world variables
         chunk._layer = self
         chunk._world_storage_key = self._world._world_storage_key
+        chunk.set_palette(self._palette)
     
     def get_chunk_at(self, position: tuple) -> Chunk:
         """ Get the chunk at the position """
-        return self._chunks.get(Chunk.get_chunk_hash(position))
+        return self._chunks.get(pack_chunk_key(position))
 
     def get_chunk_at_or_default(self, position: tuple) -> Chunk:
         """ Get the chunk at the position or create a default chunk """
-        result = self._chunks.get(Chunk.get_chunk_hash(position))
+        result = self._chunks.get(pack_chunk_key(position))
         if result:
             return result
         # generate default chunk
-        result = Chunk(position)
-        self.set_chunk_at(result)
-        return result
+        return self.create_default_chunk(position)
 
     def get_tile_at(self, global_tile_position: tuple) -> DefaultTile:
         """ Get the tile at the global position """
@@ -495,6 +1238,43 @@ class Layer:
             )
         )
     
+    def collide_tiles(self, rect: pygame.Rect) -> "Iterable":
+        """ 
+        Collide the tiles that overlap the rect (across chunk borders)
+
+        Only the cells inside of the rect's tile range are tested. Chunks are visited
+        column by column and cells row by row.
+        """
+        _start, _end = get_tile_range_from_rect(rect)
+        for cx in range(_start[0] // singleton.DEFAULT_CHUNK_WIDTH, _end[0] // singleton.DEFAULT_CHUNK_WIDTH + 1):
+            for cy in range(_start[1] // singleton.DEFAULT_CHUNK_HEIGHT, _end[1] // singleton.DEFAULT_CHUNK_HEIGHT + 1):
+                if (_chunk := self.get_chunk_at((cx, cy))) == None:
+                    continue
+                _ox, _oy = cx * singleton.DEFAULT_CHUNK_WIDTH, cy * singleton.DEFAULT_CHUNK_HEIGHT
+                yield from _chunk.collide_tile_range(
+                    rect,
+                    (max(_start[0] - _ox, 0), max(_start[1] - _oy, 0)),
+                    (min(_end[0] - _ox, singleton.DEFAULT_CHUNK_WIDTH - 1), min(_end[1] - _oy, singleton.DEFAULT_CHUNK_HEIGHT - 1))
+                )
+    
+    def collide_solid_rects(self, rect: pygame.Rect, mask: int) -> "Iterable":
+        """ Collide the merged solid rects (of every chunk the rect overlaps) with the rect """
+        for _chunk in self.iterate_rect_chunks(rect):
+            yield from _chunk.collide_solid_rects(rect, mask)
+
+    def collide_callback_tiles(self, rect: pygame.Rect, mask: int) -> "Iterable":
+        """ Collide the tiles with collision callbacks (of every chunk the rect overlaps) with the rect """
+        for _chunk in self.iterate_rect_chunks(rect):
+            yield from _chunk.collide_callback_tiles(rect, mask)
+
+    def iterate_rect_chunks(self, rect: pygame.Rect) -> "Iterable":
+        """ Iterate the loaded chunks that the (pixel) rect overlaps """
+        _start, _end = get_tile_range_from_rect(rect)
+        for cx in range(_start[0] // singleton.DEFAULT_CHUNK_WIDTH, _end[0] // singleton.DEFAULT_CHUNK_WIDTH + 1):
+            for cy in range(_start[1] // singleton.DEFAULT_CHUNK_HEIGHT, _end[1] // singleton.DEFAULT_CHUNK_HEIGHT + 1):
+                if (_chunk := self.get_chunk_at((cx, cy))) != None:
+                    yield _chunk
+
     def set_tile_at(self, global_tile_position: tuple, tile: DefaultTile = None):
         """ Set the tile at the global position """
         chunk_pos = (
@@ -512,15 +1292,309 @@ class Layer:
             tile
         )
 
+    # ---------------------------- #
+    # bulk tiles
+
+    def fill_rect(self, rect: pygame.Rect, tile: DefaultTile = None):
+        """ Fill the (tile coordinate) rect with the tile -- None clears the rect """
+        rect = pygame.Rect(rect)
+        if rect.w <= 0 or rect.h <= 0:
+            return
+        _indices = np.full((rect.h, rect.w), EMPTY_TILE_INDEX, dtype=CHUNK_TILE_INDEX_DTYPE)
+        _instances = {}
+        if isinstance(tile, TileView):
+            tile = tile._prototype
+        if tile and tile.is_stateful():
+            # every cell needs its own tile object
+            _instances = {(x, y): copy_tile(tile) for y in range(rect.top, rect.bottom) for x in range(rect.left, rect.right)}
+        elif tile:
+            _indices[:] = self._palette.get_index(tile)
+        self.write_tile_block(rect.topleft, _indices, _instances)
+
+    def stamp(self, array: np.ndarray, origin: tuple, tiles: dict = None, skip_empty: bool = True):
+        """ 
+        Write a (rows, columns) array of tiles with its topleft at the (tile coordinate) origin
+
+        tiles = {array value: tile}, if None the array holds palette indices of this layer
+        skip_empty = cells with a 0 value are left as they are (instead of being cleared)
+        """
+        array = np.asarray(array)
+        if array.ndim != 2:
+            raise ValueError(f"Stamp array must be 2d, got shape {array.shape}")
+        _instances = {}
+        if tiles is None:
+            if array.size and (array.min() < 0 or array.max() >= len(self._palette)):
+                raise ValueError("Stamp array holds indices that are not in the layer palette")
+            _indices = array.astype(CHUNK_TILE_INDEX_DTYPE)
+        else:
+            # validate + add each tile type once
+            _remap = np.zeros(max(max(tiles, default=0), int(array.max(initial=0))) + 1, dtype=CHUNK_TILE_INDEX_DTYPE)
+            _stateful = []
+            for _value, _tile in tiles.items():
+                if _value == EMPTY_TILE_INDEX:
+                    raise ValueError(f"Stamp value {EMPTY_TILE_INDEX} is reserved for empty cells")
+                if isinstance(_tile, TileView):
+                    _tile = _tile._prototype
+                if not _tile:
+                    continue
+                if _tile.is_stateful():
+                    _stateful.append((_value, _tile))
+                    continue
+                _remap[_value] = self._palette.get_index(_tile)
+            _indices = _remap[array]
+            for _value, _tile in _stateful:
+                for y, x in np.argwhere(array == _value).tolist():
+                    _instances[(origin[0] + x, origin[1] + y)] = copy_tile(_tile)
+        _mask = array != EMPTY_TILE_INDEX if skip_empty else None
+        self.write_tile_block(origin, _indices, _instances, _mask)
+
+    def copy_region(self, rect: pygame.Rect) -> TileRegion:
+        """ Copy the tiles inside of the (tile coordinate) rect """
+        rect = pygame.Rect(rect)
+        _indices = np.full((max(rect.h, 0), max(rect.w, 0)), EMPTY_TILE_INDEX, dtype=CHUNK_TILE_INDEX_DTYPE)
+        _instances = {}
+        for chunk, _local, _block in self.iterate_chunk_blocks(rect.topleft, _indices.shape):
+            if not chunk:
+                continue
+            _indices[_block] = chunk._tile_indices[_local]
+            _ox = chunk._chunk_position[0] * singleton.DEFAULT_CHUNK_WIDTH - rect.left
+            _oy = chunk._chunk_position[1] * singleton.DEFAULT_CHUNK_HEIGHT - rect.top
+            for (x, y), _tile in chunk._tile_instances.items():
+                if 0 <= x + _ox < rect.w and 0 <= y + _oy < rect.h:
+                    _instances[(x + _ox, y + _oy)] = copy_tile(_tile)
+        return TileRegion(self._palette, _indices, _instances)
+
+    def paste_region(self, tile_region: TileRegion, origin: tuple, skip_empty: bool = False):
+        """ Paste a copied region with its topleft at the (tile coordinate) origin """
+        _indices = tile_region._indices
+        _mask = _indices != EMPTY_TILE_INDEX if skip_empty else None
+        # the stateful tiles are placed after the indices
+        _indices = np.where(_indices == INSTANCE_TILE_INDEX, EMPTY_TILE_INDEX, _indices)
+        if tile_region._palette is not self._palette:
+            _indices = self._palette.get_remap_array(tile_region._palette)[_indices]
+        _instances = {
+            (origin[0] + x, origin[1] + y): copy_tile(_tile) for (x, y), _tile in tile_region._instances.items()
+        }
+        self.write_tile_block(origin, _indices, _instances, _mask)
+
+    def get_tile_indices(self, coords: np.ndarray) -> np.ndarray:
+        """ Get the palette indices at the (N, 2) global tile coords (`INSTANCE_TILE_INDEX` for stateful tiles) """
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+        result = np.full(len(coords), EMPTY_TILE_INDEX, dtype=CHUNK_TILE_INDEX_DTYPE)
+        for chunk, _rows, _xs, _ys in self.iterate_coord_groups(coords):
+            if chunk:
+                result[_rows] = chunk._tile_indices[_ys, _xs]
+        return result
+
+    def get_tiles(self, coords: np.ndarray) -> list:
+        """ Get the tiles at the (N, 2) global tile coords -- same results as `get_tile_at` """
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+        result = [None] * len(coords)
+        for chunk, _rows, _xs, _ys in self.iterate_coord_groups(coords):
+            if not chunk:
+                continue
+            for _row, x, y, _index in zip(_rows.tolist(), _xs.tolist(), _ys.tolist(), chunk._tile_indices[_ys, _xs].tolist()):
+                if _index == EMPTY_TILE_INDEX:
+                    continue
+                if _index == INSTANCE_TILE_INDEX:
+                    result[_row] = chunk._tile_instances[(x, y)]
+                    continue
+                result[_row] = TileView(chunk, (x, y), self._palette[_index])
+        return result
+
+    # ---------------------------- #
+    # mask queries
+
+    def is_mask_at(self, global_tile_position: tuple, mask: int, solid: bool = False) -> bool:
+        """ Check if the cell holds a tile that shares a bit with the mask (+ is not transparent) """
+        chunk = self.get_chunk_at((
+            global_tile_position[0] // singleton.DEFAULT_CHUNK_WIDTH,
+            global_tile_position[1] // singleton.DEFAULT_CHUNK_HEIGHT
+        ))
+        if not chunk:
+            return False
+        return chunk.is_mask_at(
+            (
+                global_tile_position[0] % singleton.DEFAULT_CHUNK_WIDTH,
+                global_tile_position[1] % singleton.DEFAULT_CHUNK_HEIGHT
+            ),
+            mask,
+            solid
+        )
+
+    def get_mask_values(self, coords: np.ndarray, mask: int, solid: bool = False) -> np.ndarray:
+        """ Check the (N, 2) global tile coords against the mask -- bool array """
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+        result = np.zeros(len(coords), dtype=bool)
+        for chunk, _rows, _xs, _ys in self.iterate_coord_groups(coords):
+            if not chunk:
+                continue
+            result[_rows] = (chunk._tile_masks[_ys, _xs] & mask) != 0
+            if solid:
+                result[_rows] &= chunk._solid_cells[_ys, _xs]
+        return result
+
+    def get_mask_cells(self, rect: pygame.Rect, mask: int, solid: bool = False) -> np.ndarray:
+        """ Get the (rows, columns) bool array of the cells inside of the (tile coordinate) rect that share a bit with the mask """
+        rect = pygame.Rect(rect)
+        result = np.zeros((rect.h, rect.w), dtype=bool)
+        for chunk, _local, _block in self.iterate_chunk_blocks(rect.topleft, (rect.h, rect.w)):
+            if chunk:
+                result[_block] = chunk.get_mask_cells(mask, solid)[_local]
+        return result
+
+    def any_mask_in_rect(self, rect: pygame.Rect, mask: int, solid: bool = False) -> bool:
+        """ Check if any cell inside of the (tile coordinate) rect shares a bit with the mask """
+        rect = pygame.Rect(rect)
+        for chunk, _local, _ in self.iterate_chunk_blocks(rect.topleft, (rect.h, rect.w)):
+            if chunk and chunk.get_mask_cells(mask, solid)[_local].any():
+                return True
+        return False
+
+    def raycast_mask(self, start: tuple, end: tuple, mask: int, solid: bool = False) -> tuple:
+        """ 
+        Walk the cells on the (pixel) line from start to end
+
+        Returns (global tile position, pixel point where the line enters the cell) of the
+        first cell that shares a bit with the mask, None if nothing is hit.
+        """
+        _tw, _th = singleton.DEFAULT_TILE_WIDTH, singleton.DEFAULT_TILE_HEIGHT
+        _dx, _dy = end[0] - start[0], end[1] - start[1]
+        x, y = pixel_to_tile_coords(start)
+        _end = pixel_to_tile_coords(end)
+        _step_x, _step_y = (1 if _dx > 0 else -1), (1 if _dy > 0 else -1)
+        # line progress (0 - 1) at the next cell border + between two borders
+        _next_x = ((x + (_dx > 0)) * _tw - start[0]) / _dx if _dx else math.inf
+        _next_y = ((y + (_dy > 0)) * _th - start[1]) / _dy if _dy else math.inf
+        _delta_x = _tw / abs(_dx) if _dx else math.inf
+        _delta_y = _th / abs(_dy) if _dy else math.inf
+        _t = 0.0
+        _chunk_position, chunk = None, None
+        for _ in range(abs(_end[0] - x) + abs(_end[1] - y) + 1):
+            if (x // singleton.DEFAULT_CHUNK_WIDTH, y // singleton.DEFAULT_CHUNK_HEIGHT) != _chunk_position:
+                _chunk_position = (x // singleton.DEFAULT_CHUNK_WIDTH, y // singleton.DEFAULT_CHUNK_HEIGHT)
+                chunk = self.get_chunk_at(_chunk_position)
+            if chunk and chunk.is_mask_at((x % singleton.DEFAULT_CHUNK_WIDTH, y % singleton.DEFAULT_CHUNK_HEIGHT), mask, solid):
+                return (x, y), (start[0] + _dx * _t, start[1] + _dy * _t)
+            if _next_x < _next_y:
+                x += _step_x
+                _t = _next_x
+                _next_x += _delta_x
+            else:
+                y += _step_y
+                _t = _next_y
+                _next_y += _delta_y
+        return None
+
+    # ---------------------------- #
+    # block utils
+
+    def write_tile_block(self, origin: tuple, indices: np.ndarray, instances: dict = None, mask: np.ndarray = None):
+        """ 
+        Write a block of palette indices with its topleft at the (tile coordinate) origin -- split per chunk
+
+        instances = {global tile position: stateful tile}
+        mask = cells of the block that are written (all if None)
+        """
+        if mask is None:
+            mask = np.ones(indices.shape, dtype=bool)
+        # group the stateful tiles by chunk
+        _chunk_instances = {}
+        for (x, y), _tile in (instances or {}).items():
+            _chunk_instances.setdefault(
+                (x // singleton.DEFAULT_CHUNK_WIDTH, y // singleton.DEFAULT_CHUNK_HEIGHT), {}
+            )[(x % singleton.DEFAULT_CHUNK_WIDTH, y % singleton.DEFAULT_CHUNK_HEIGHT)] = _tile
+        for chunk_position, _local, _block in self.iterate_chunk_block_positions(origin, indices.shape):
+            _mask = mask[_block]
+            _instances = _chunk_instances.get(chunk_position)
+            if not _mask.any() and not _instances:
+                continue
+            chunk = self.get_chunk_at(chunk_position)
+            if not chunk:
+                # nothing to clear inside of a missing chunk
+                if not _instances and not indices[_block][_mask].any():
+                    continue
+                chunk = self.create_default_chunk(chunk_position)
+            chunk.set_tile_block((_local[1].start, _local[0].start), indices[_block], _instances, _mask)
+
+    def iterate_chunk_block_positions(self, origin: tuple, shape: tuple):
+        """ 
+        Split a (rows, columns) block at the (tile coordinate) origin over the chunks
+
+        Yields (chunk position, local chunk slices, block slices)
+        """
+        _cw, _ch = singleton.DEFAULT_CHUNK_WIDTH, singleton.DEFAULT_CHUNK_HEIGHT
+        _h, _w = shape
+        if _w <= 0 or _h <= 0:
+            return
+        for cy in range(origin[1] // _ch, (origin[1] + _h - 1) // _ch + 1):
+            _y0, _y1 = max(origin[1], cy * _ch), min(origin[1] + _h, (cy + 1) * _ch)
+            for cx in range(origin[0] // _cw, (origin[0] + _w - 1) // _cw + 1):
+                _x0, _x1 = max(origin[0], cx * _cw), min(origin[0] + _w, (cx + 1) * _cw)
+                yield (
+                    (cx, cy),
+                    (slice(_y0 - cy * _ch, _y1 - cy * _ch), slice(_x0 - cx * _cw, _x1 - cx * _cw)),
+                    (slice(_y0 - origin[1], _y1 - origin[1]), slice(_x0 - origin[0], _x1 - origin[0]))
+                )
+
+    def iterate_chunk_blocks(self, origin: tuple, shape: tuple):
+        """ Same as `iterate_chunk_block_positions` -- yields the (resident) chunk instead of its position """
+        for chunk_position, _local, _block in self.iterate_chunk_block_positions(origin, shape):
+            yield self.get_chunk_at(chunk_position), _local, _block
+
+    def iterate_coord_groups(self, coords: np.ndarray):
+        """ 
+        Group (N, 2) global tile coords by chunk
+
+        Yields (chunk or None, rows into coords, local xs, local ys)
+        """
+        if not len(coords):
+            return
+        _chunks = coords // (singleton.DEFAULT_CHUNK_WIDTH, singleton.DEFAULT_CHUNK_HEIGHT)
+        _locals = coords % (singleton.DEFAULT_CHUNK_WIDTH, singleton.DEFAULT_CHUNK_HEIGHT)
+        # sort by packed chunk key + split where the key changes
+        _keys = (_chunks[:, 0] << CHUNK_KEY_BITS) | (_chunks[:, 1] & CHUNK_KEY_MASK)
+        _order = np.argsort(_keys, kind="stable")
+        _splits = np.flatnonzero(np.diff(_keys[_order])) + 1
+        for _rows in np.split(_order, _splits):
+            _first = int(_rows[0])
+            yield self.get_chunk_at((int(_chunks[_first, 0]), int(_chunks[_first, 1]))), _rows, _locals[_rows, 0], _locals[_rows, 1]
+
     def create_default_chunk(self, position: tuple):
         """ Create a default chunk """
-        _c = Chunk(position)
-        _c._layer = self
-        _c._world_storage_key = self._world._world_storage_key
-        self._chunks[hash(_c)] = _c
-        print(hash(_c), _c._chunk_hash_str)
+        # the chunk was streamed out -- load it back instead
+        if pack_chunk_key(position) in self._stored_chunk_keys:
+            return self.load_stored_chunk(pack_chunk_key(position))
+        _c = Chunk(tuple(position))
+        self.set_chunk_at(_c)
+        # the generated tiles are filled in once they are ready
+        if self._generator:
+            self._world.get_chunk_generation().request(self, _c._chunk_position)
         return _c
 
+    # ---------------------------- #
+    # generation
+
+    def set_chunk_generator(self, generator: "chunkgen.ChunkGenerator"):
+        """ Set the generator for chunks that are not stored (None to disable) """
+        self._generator = generator
+        self._generator_cache = chunkgen.GeneratedChunkCache(generator, chunkgen.get_chunk_dimensions()) if generator else None
+
+    def apply_generated_chunk(self, position: tuple, indices: np.ndarray):
+        """ Fill a resident chunk with its generated tiles """
+        chunk = self.get_chunk_at(position)
+        if not chunk or chunk._generated:
+            return
+        chunk.fill_empty_cells(indices, self._generator.get_tiles())
+        chunk._generated = True
+        # stored before the generation landed -- the stored copy lacks the terrain (dirty chunks are written anyway)
+        if self.is_chunk_stored(position):
+            chunk._dirty = True
+
+    def is_chunk_stored(self, position: tuple) -> bool:
+        """ Check if the chunk has been written to the region files """
+        return pack_chunk_key(position) in self._stored_chunk_keys
+
     # ---------------------------- #
     # serializable
     
@@ -528,6 +1602,12 @@ class Layer:
         """ Get the state of the layer """
         state = self.__dict__.copy()
         del state["_layer_buffer"]
+        # rebuilt from the world visible chunk keys
+        state["_visible_chunks"] = {}
+        state["_generator_cache"] = None
+        # the chunk data lives in the region files -- the chunks are recreated from `_stored_chunk_keys`
+        if singleton.SAVING_WORLD_FLAG:
+            state["_chunks"] = {}
         return state
     
     def __setstate__(self, state):
@@ -536,11 +1616,87 @@ class Layer:
         # load unserializable data
         self._layer_buffer = pygame.Surface(singleton.FB_SIZE, pygame.SRCALPHA, 16).convert_alpha()
         self._layer_buffer.fill((0, 0, 0, 0))
+        # older saves have no palette
+        if "_palette" not in state:
+            self._palette = TilePalette()
+        for _chunk in self._chunks.values():
+            _chunk._palette = self._palette
+        # rekey the chunks -- older saves used salted `hash(str)` keys
+        self._chunks = {pack_chunk_key(_chunk._chunk_position): _chunk for _chunk in self._chunks.values()}
+        if "_stored_chunk_keys" not in state:
+            self._stored_chunk_keys = set(self._chunks)
+        self._visible_chunks = {}
+        self.set_chunk_generator(state.get("_generator"))
     
     def load_layer_data(self):
         """ Load the layer data """
         for _chunk in self._chunks.values():
             _chunk.load_chunk_data()
+        self.load_stored_chunks()
+
+    def save_dirty_chunks(self) -> int:
+        """ 
+        Write the chunks that changed since they were last written 
+        
+        Returns the number of chunks written.
+        """
+        # untouched chunks of a generated layer are generated again instead
+        _dirty = [
+            _chunk for _key, _chunk in self._chunks.items()
+            if _chunk._dirty or (_key not in self._stored_chunk_keys and not self._generator)
+        ]
+        if not _dirty:
+            return 0
+        region.get_region_store(get_world_region_folder(self._world._world_storage_key)).write_chunks(
+            self._layer_id, {_chunk._chunk_position: _chunk.serialize_chunk_data() for _chunk in _dirty})
+        for _chunk in _dirty:
+            self._stored_chunk_keys.add(_chunk._chunk_key)
+            _chunk._dirty = False
+        return len(_dirty)
+
+    # ---------------------------- #
+    # streaming
+
+    def load_stored_chunk(self, key: int, data: object = None) -> Chunk:
+        """ 
+        Make a stored chunk resident again
+        
+        If no data is given, the chunk file is read right away (blocking).
+        """
+        if data is None:
+            # a streamed out chunk may still be waiting to be written
+            if self._world._chunk_streamer:
+                self._world._chunk_streamer.wait_for_writes()
+            data = read_chunk_data(self._world._world_storage_key, unpack_chunk_key(key), self._layer_id)
+        _c = Chunk(unpack_chunk_key(key))
+        self.set_chunk_at(_c)
+        _c.apply_chunk_data(data)
+        return _c
+
+    def load_stored_chunks(self):
+        """ Load every stored chunk that is not resident """
+        for _key in self._stored_chunk_keys - self._chunks.keys():
+            self.load_stored_chunk(_key)
+
+    def unload_chunk(self, key: int) -> Chunk:
+        """ Remove a chunk from memory -- the caller writes it back if it is dirty """
+        self._visible_chunks.pop(key, None)
+        return self._chunks.pop(key, None)
+
+    # ---------------------------- #
+    # visibility
+
+    def update_visible_chunks(self, entered: set, exited: set):
+        """ Apply a change of the world visible chunk keys """
+        for key in exited:
+            self._visible_chunks.pop(key, None)
+        for key in entered:
+            if key in self._chunks:
+                self._visible_chunks[key] = self._chunks[key]
+
+    def reset_visible_chunks(self):
+        """ Rebuild the visible chunks from the world visible chunk keys """
+        self._visible_chunks = {key: self._chunks[key] for key in self._world._visible_chunk_keys if key in self._chunks}
 
 # ---------------------------- #
 # world
@@ -569,6 +1725,7 @@ class World:
         # ECS system
         self._aspect_handler = aspect.AspectHandler(self)
         self._component_handler = component.ComponentHandler(self)
+        self._query_handler = query.QueryHandler(self)
 
         # camera data
         self._camera = camera.PseudoCamera((0, 0), singleton.FB_SIZE)
@@ -584,11 +1741,21 @@ class World:
             int(self.camera.center[1] // singleton.DEFAULT_CHUNK_PIXEL_HEIGHT)
         )
         self._render_distance = singleton.DEFAULT_CHUNK_RENDER_DISTANCE
-        self._renderable_chunks_hash_strs = set()
+        # chunks overlapping the camera rect -- (left, top, right, bottom) chunk range + keys
+        self._visible_chunk_range = None
+        self._visible_chunk_keys = set()
         self._update_invisible_chunks = singleton.UPDATE_INVISIBLE_CHUNKS
+        self._chunk_streamer = None
+        self._chunk_generation = None
+        self._simulation = SimulationScheduler(self)
+        # fixed timestep -- unsimulated frame time + how far the drawn gameobjects are between the last two steps (None = not interpolating)
+        self._step_accumulator = 0.0
+        self._interpolation_alpha = None
 
         # signal handler
         self._layer_signals = signal.Signal(WORLD_SIGNAL_HANDLER)
+        self._camera_signal = signal.Signal(CAMERA_MOVED_CHUNKS)
+        self._camera_signal_emitter = self._camera_signal.get_unique_emitter()
         self._layers = {_ - 2 : Layer(_ - 2) for _ in range(singleton.DEFAULT_LAYER_COUNT)}
         # give each layer a signal emitter
         for layer in self._layers.values():
@@ -607,7 +1774,8 @@ class World:
 
     def __post_init__(self):
         """ Post init function """
-        self.update_renderable_chunks()
+        self.update_visible_chunks()
+        self.set_chunk_streaming(singleton.CHUNK_STREAMING)
         self._physics_handler.__post_init__()
         self._aspect_handler.__post_init__()
 
@@ -616,27 +1784,89 @@ class World:
 
     def update_and_render_world(self, surface: pygame.Surface):
         """ Update and render the world """
-        # check if camera entered new chunk
-        new_c_chunk = (
-            int(self.camera.center[0] // singleton.DEFAULT_CHUNK_PIXEL_WIDTH), 
-            int(self.camera.center[1] // singleton.DEFAULT_CHUNK_PIXEL_HEIGHT)
-        )
-        if self._camera_old_chunk != new_c_chunk:
-            self._camera_old_chunk = new_c_chunk
-            self.update_renderable_chunks()
-
-        # update layers
-        for layer in self._layers:
-            self._layers[layer].update(self.camera)
-        # update aspects
-        self._aspect_handler.handle(self.camera)
-        # render layers
-        for layer in self._layers:
-            self._layers[layer].render(surface)
+        with profiler.scope("world"):
+            # check if the camera view covers different chunks
+            self.update_visible_chunks()
+            # stream chunks in + out, generate chunks ahead of the camera
+            with profiler.scope("chunk streaming"):
+                if self._chunk_streamer:
+                    self._chunk_streamer.update(self._camera_old_chunk)
+                if self._chunk_generation:
+                    self._chunk_generation.update(self._camera_old_chunk)
+
+            # update layers
+            for layer in self._layers:
+                with profiler.scope("layer update", layer):
+                    self._layers[layer].update(self.camera)
+            # fixed steps already caught up the reduced chunks + ran the fixed step aspects
+            _fixed_step = singleton.FIXED_TIMESTEP
+            if not _fixed_step:
+                with profiler.scope("reduced chunks"):
+                    self.update_reduced_chunks()
+            # update aspects
+            with profiler.scope("aspects"):
+                self._aspect_handler.handle(self.camera, False if _fixed_step else None)
+            # render layers
+            for layer in self._layers:
+                with profiler.scope("layer render", layer):
+                    self._layers[layer].render(surface)
             
     def update_and_render_physics(self):
         """ Update and render the physics """
+        if singleton.FIXED_TIMESTEP:
+            self.update_fixed_steps()
+            return
+        if self._interpolation_alpha is not None:
+            # back from fixed steps
+            self._physics_handler.clear_render_positions()
+            self._interpolation_alpha = None
+        with profiler.scope("simulation"):
+            self._simulation.update()
+        self._physics_handler.update()
+
+    def update_fixed_steps(self):
+        """ 
+        Simulate the frame in fixed steps of `1 / singleton.SIMULATION_RATE` seconds
+
+        The frame time goes into an accumulator and every whole step in it is run
+        (physics + reduced chunks + fixed step aspects). At most
+        `singleton.MAX_SIMULATION_STEPS` run per frame, a longer backlog is dropped
+        so a slow frame cannot snowball. The gameobjects are drawn between the
+        last two steps by the leftover time.
+        """
+        _step = 1 / singleton.SIMULATION_RATE
+        self._step_accumulator += singleton.DELTA_TIME
+        _steps = 0
+        while self._step_accumulator >= _step and _steps < singleton.MAX_SIMULATION_STEPS:
+            self._physics_handler.store_previous_positions()
+            with override_delta_time(_step):
+                self.step_simulation()
+            self._step_accumulator -= _step
+            _steps += 1
+        # spiral of death guard -- only keep the partial step
+        if self._step_accumulator >= _step:
+            self._step_accumulator %= _step
+        self._interpolation_alpha = self._step_accumulator / _step
+        self._physics_handler.interpolate_positions(self._interpolation_alpha)
+
+    def step_simulation(self):
+        """ Run a single simulation step with the current delta time """
+        with profiler.scope("simulation"):
+            self._simulation.update()
         self._physics_handler.update()
+        with profiler.scope("reduced chunks"):
+            self.update_reduced_chunks()
+        with profiler.scope("fixed step aspects"):
+            self._aspect_handler.handle(self.camera, True)
+
+    def update_reduced_chunks(self):
+        """ Catch up the tiles of the reduced simulation chunks that are due this frame """
+        with override_delta_time(self._simulation.get_due_delta()):
+            for position in self._simulation.iterate_due_reduced_chunk_positions():
+                key = pack_chunk_key(position)
+                for layer in self._layers.values():
+                    if key in layer._chunks:
+                        layer._chunks[key].update_tiles()
 
     def get_layer_at(self, layer: int):
         """ Get the layer at the index """
@@ -648,6 +1878,7 @@ class World:
         # setup layer
         layer._signal_emitter = self._layer_signals.get_unique_emitter()
         layer._world = self
+        layer.reset_visible_chunks()
     
     def remove_layer(self, layer: int) -> Layer:
         """ Remove a layer from the world """
@@ -689,19 +1920,57 @@ class World:
         """ Remove an aspect by string """
         self._aspect_handler.remove_aspect_by_str(_aspect_class)
     
+    # queries
+
+    def query(self, *component_classes) -> "Query":
+        """ Get a live view of the gameobjects having all the component classes / class names """
+        return self._query_handler.query(component_classes)
+    
     # chunk stuff
 
-    def update_renderable_chunks(self):
-        """ Update the renderable chunks """
-        self._renderable_chunks_hash_strs.clear()
-        for rx, ry in self.iterate_renderable_chunk_positions():
-            self._renderable_chunks_hash_strs.add(Chunk.get_chunk_hash((rx, ry)))
+    def update_visible_chunks(self) -> bool:
+        """ 
+        Update the chunks that overlap the camera rect (+ margin)
+        
+        Only the entered + exited chunks are applied to the layers. Emits
+        `CAMERA_MOVED_CHUNKS` with the diff. Returns True if the set changed.
+        """
+        _new_chunk = self.get_camera_chunk()
+        _range = self.get_visible_chunk_range()
+        if _range == self._visible_chunk_range:
+            self._camera_old_chunk = _new_chunk
+            return False
+        _keys = {pack_chunk_key((x, y)) for x in range(_range[0], _range[2] + 1) for y in range(_range[1], _range[3] + 1)}
+        _entered = _keys - self._visible_chunk_keys
+        _exited = self._visible_chunk_keys - _keys
+        self._visible_chunk_range = _range
+        self._visible_chunk_keys = _keys
+        for layer in self._layers.values():
+            layer.update_visible_chunks(_entered, _exited)
+
+        self._camera_signal_emitter.emit({
+            CAMERA_OLD_CHUNK: self._camera_old_chunk,
+            CAMERA_NEW_CHUNK: _new_chunk,
+            CAMERA_ENTERED_CHUNKS: [unpack_chunk_key(key) for key in _entered],
+            CAMERA_EXITED_CHUNKS: [unpack_chunk_key(key) for key in _exited]
+        })
+        self._camera_old_chunk = _new_chunk
+        return True
+
+    def get_visible_chunk_range(self) -> tuple:
+        """ Get the (left, top, right, bottom) range of chunks that overlap the camera rect """
+        _rect = self.camera.rect.inflate(singleton.CHUNK_VISIBLE_MARGIN * 2, singleton.CHUNK_VISIBLE_MARGIN * 2)
+        return (
+            _rect.left // singleton.DEFAULT_CHUNK_PIXEL_WIDTH,
+            _rect.top // singleton.DEFAULT_CHUNK_PIXEL_HEIGHT,
+            (_rect.right - 1) // singleton.DEFAULT_CHUNK_PIXEL_WIDTH,
+            (_rect.bottom - 1) // singleton.DEFAULT_CHUNK_PIXEL_HEIGHT
+        )
 
     def iterate_renderable_chunk_positions(self):
-        """ Iterate the renderable chunks """
-        for cx in range(self._camera_old_chunk[0] - self._render_distance[0], self._camera_old_chunk[0] + self._render_distance[0] + 1):
-            for cy in range(self._camera_old_chunk[1] - self._render_distance[0], self._camera_old_chunk[1] + self._render_distance[0] + 1):
-                yield (cx, cy)
+        """ Iterate the renderable (visible) chunks """
+        for key in self._visible_chunk_keys:
+            yield unpack_chunk_key(key)
 
     def get_camera_chunk(self):
         """ Get the camera chunk """
@@ -709,6 +1978,27 @@ class World:
             int(self.camera.center[0] // singleton.DEFAULT_CHUNK_PIXEL_WIDTH),
             int(self.camera.center[1] // singleton.DEFAULT_CHUNK_PIXEL_HEIGHT)
         )
+
+    def get_chunk_generation(self) -> "chunkgen.ChunkGenerationQueue":
+        """ Get the chunk generation queue (created on first use) """
+        if not self._chunk_generation:
+            self._chunk_generation = chunkgen.ChunkGenerationQueue(self)
+        return self._chunk_generation
+
+    def set_chunk_streaming(self, enabled: bool):
+        """ 
+        Enable / disable chunk streaming 
+        
+        Disabling streaming loads every stored chunk back into memory.
+        """
+        if enabled and not self._chunk_streamer:
+            self._chunk_streamer = ChunkStreamer(self)
+            self._chunk_streamer.update(self._camera_old_chunk)
+        elif not enabled and self._chunk_streamer:
+            self._chunk_streamer.close()
+            self._chunk_streamer = None
+            for layer in self._layers.values():
+                layer.load_stored_chunks()
     
     # ---------------------------- #
     # serializable
@@ -717,18 +2007,35 @@ class World:
         """ Get the state of the world """
         state = self.__dict__.copy()
         
+        # threads cannot be serialized
+        state["_chunk_streamer"] = None
+        state["_chunk_generation"] = None
+        state["_simulation"] = None
+        
         # check if actually saving (officially)
         if not singleton.SAVING_WORLD_FLAG:
             return state
+        # finish all streaming reads + writes
+        if self._chunk_streamer:
+            self._chunk_streamer.flush()
+        # generated tiles still on the way belong to the saved chunks
+        if self._chunk_generation:
+            self._chunk_generation.flush()
         
         # create a blob storage file - this should run first
         if not os.path.exists(WORLD_LEVEL_FOLDER + self._world_storage_key):
             print("Creating world folder: ", WORLD_LEVEL_FOLDER + self._world_storage_key)
             os.mkdir(WORLD_LEVEL_FOLDER + self._world_storage_key)
-        if not os.path.exists(WORLD_LEVEL_FOLDER + self._world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER):
-            print("Creating world chunk folder: ", WORLD_LEVEL_FOLDER + self._world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER)
-            os.mkdir(WORLD_LEVEL_FOLDER + self._world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER)
+        if not os.path.exists(get_world_region_folder(self._world_storage_key)):
+            print("Creating world region folder: ", get_world_region_folder(self._world_storage_key))
+            os.mkdir(get_world_region_folder(self._world_storage_key))
         
+        # older worlds store every chunk in its own file -- moved into the regions on the first save
+        convert_chunk_files_to_regions(self._world_storage_key)
+        # only the changed chunks are written
+        _written = {layer._layer_id: layer.save_dirty_chunks() for layer in self._layers.values()}
+        print("Saved chunks: ", sum(_written.values()))
+        self.write_save_manifest(_written)
         return state
     
     def __setstate__(self, state):
@@ -738,10 +2045,36 @@ class World:
             spritesheet.load_spritesheet(_path, framedata=_data)
             
         self.__dict__.update(state)
-
-        # load world data
+        # older saves stored salted string hashes
+        self.__dict__.pop("_renderable_chunks_hash_strs", None)
+        self.__dict__.pop("_renderable_chunk_keys", None)
+        if "_query_handler" not in state:
+            self._query_handler = query.QueryHandler(self)
+        if "_step_accumulator" not in state:
+            self._step_accumulator = 0.0
+            self._interpolation_alpha = None
+        if "_camera_signal" not in state:
+            self._camera_signal = signal.Signal(CAMERA_MOVED_CHUNKS)
+            self._camera_signal_emitter = self._camera_signal.get_unique_emitter()
+        self._visible_chunk_range = None
+        self._visible_chunk_keys = set()
+        self.update_visible_chunks()
+        self._chunk_generation = None
+        self._simulation = SimulationScheduler(self)
+
+        # load world data -- older worlds store every chunk in its own file (read until the world is saved)
+        migrate_chunk_files(self._world_storage_key)
+        self._chunk_streamer = None
+        if singleton.CHUNK_STREAMING:
+            # chunks are streamed in around the camera
+            for layer in self._layers.values():
+                layer._chunks.clear()
+                layer.reset_visible_chunks()
+            self.set_chunk_streaming(True)
+            return
         for layer in self._layers:
             self._layers[layer].load_layer_data()
+            self._layers[layer].reset_visible_chunks()
     
     def get_world_saving_main_file(self):
         """ Get the world saving folder """
@@ -751,6 +2084,33 @@ class World:
         """ Get the world saving folder """
         return WORLD_LEVEL_FOLDER + self._world_storage_key
 
+    def get_world_manifest_file(self):
+        """ Get the world save manifest file """
+        return WORLD_LEVEL_FOLDER + self._world_storage_key + "/" + WORLD_MANIFEST_FILE
+
+    def write_save_manifest(self, written: dict):
+        """ Write the save manifest -- {layer id: chunks written} """
+        self._data["SAVE_COUNT"] = self._data.get("SAVE_COUNT", 0) + 1
+        _manifest = {
+            "version": WORLD_MANIFEST_VERSION,
+            "region_size": region.DEFAULT_REGION_SIZE,
+            "save_count": self._data["SAVE_COUNT"],
+            "saved_at": datetime.datetime.now().isoformat(),
+            "layers": {
+                str(layer._layer_id): {
+                    "stored_chunks": len(layer._stored_chunk_keys),
+                    "written_chunks": written.get(layer._layer_id, 0),
+                }
+                for layer in self._layers.values()
+            }
+        }
+        with open(self.get_world_manifest_file(), "w") as f:
+            json.dump(_manifest, f, indent=4)
+
+    def flush_chunk_storage(self):
+        """ Compact the region files of the world (after saving) """
+        region.get_region_store(get_world_region_folder(self._world_storage_key)).flush()
+
     # ---------------------------- #
     # caching
     
@@ -794,12 +2154,425 @@ class World:
         WORLD_CACHE[world_key] = result
         return result
     
+# ---------------------------- #
+# chunk streaming
+
+class ChunkStreamer:
+    """
+    Streams chunk tile data in and out around the camera chunk.
+
+    Chunk files are read + written on a background thread. The read data is
+    applied on the main thread, a few chunks per frame. Chunks beyond the evict
+    radius are written back (if dirty) and dropped.
+
+    """
+
+    def __init__(self, world: World) -> None:
+        """ Initialize the chunk streamer """
+        self._world = world
+        # one worker -- reads + writes of the same file stay in order
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk_streamer")
+        # (layer id, chunk key) -> future, in request order (nearest first)
+        self._pending_reads = {}
+        self._pending_writes = []
+
+        self._center = None
+        self._direction = (0, 0)
+
+    # ---------------------------- #
+    # logic
+
+    def update(self, center: tuple):
+        """ Update the streamer -- call once per frame """
+        if center != self._center:
+            if self._center is not None:
+                self._direction = (
+                    (center[0] > self._center[0]) - (center[0] < self._center[0]),
+                    (center[1] > self._center[1]) - (center[1] < self._center[1])
+                )
+            self._center = center
+            self._evict_chunks()
+            self._request_chunks()
+        self._apply_loaded_chunks(singleton.CHUNK_STREAM_APPLY_BUDGET)
+        self._check_writes()
+
+    def _request_chunks(self):
+        """ Queue reads for stored chunks around the center + in the direction of travel """
+        for position in self.iterate_wanted_chunk_positions():
+            key = pack_chunk_key(position)
+            for layer in self._world._layers.values():
+                if key in layer._chunks or key not in layer._stored_chunk_keys:
+                    continue
+                if (layer._layer_id, key) in self._pending_reads:
+                    continue
+                self._pending_reads[(layer._layer_id, key)] = self._executor.submit(
+                    read_chunk_data, self._world._world_storage_key, position, layer._layer_id)
+
+    def _evict_chunks(self):
+        """ Write back + drop chunks beyond the evict radius """
+        for layer in self._world._layers.values():
+            for key in [k for k in layer._chunks if not self.in_range(k)]:
+                chunk = layer.unload_chunk(key)
+                if chunk._dirty:
+                    self.write_chunk(chunk)
+        # reads that are no longer needed
+        for _id in [k for k in self._pending_reads if not self.in_range(k[1])]:
+            self._pending_reads.pop(_id).cancel()
+
+    def _apply_loaded_chunks(self, budget: int):
+        """ Apply up to `budget` finished reads """
+        for _id in list(self._pending_reads):
+            if budget <= 0:
+                return
+            if not self._pending_reads[_id].done():
+                continue
+            data = self._pending_reads.pop(_id).result()
+            layer = self._world._layers.get(_id[0])
+            # the chunk was loaded (blocking) or the layer was removed
+            if not layer or _id[1] in layer._chunks:
+                continue
+            layer.load_stored_chunk(_id[1], data)
+            budget -= 1
+
+    def _check_writes(self):
+        """ Remove finished writes (raises write errors) """
+        for future in [f for f in self._pending_writes if f.done()]:
+            self._pending_writes.remove(future)
+            future.result()
+
+    # ---------------------------- #
+    # utils
+
+    def write_chunk(self, chunk: Chunk):
+        """ Write the chunk into its region file on the background thread """
+        self._pending_writes.append(self._executor.submit(
+            write_chunk_data, chunk._world_storage_key, chunk._chunk_position, chunk._layer._layer_id, chunk.serialize_chunk_data()))
+        chunk._layer._stored_chunk_keys.add(chunk._chunk_key)
+        chunk._dirty = False
+
+    def wait_for_writes(self):
+        """ Block until all queued writes are done """
+        concurrent.futures.wait(self._pending_writes)
+        self._check_writes()
+
+    def flush(self):
+        """ Block until all queued reads + writes are done """
+        concurrent.futures.wait(list(self._pending_reads.values()))
+        self._apply_loaded_chunks(len(self._pending_reads))
+        self.wait_for_writes()
+
+    def close(self):
+        """ Finish all work and stop the background thread """
+        self.flush()
+        self._executor.shutdown()
+
+    def is_chunk_loading(self, chunk_position: tuple) -> bool:
+        """ Check if a layer has the chunk stored but not resident yet (its tiles are missing) """
+        key = pack_chunk_key(chunk_position)
+        for layer in self._world._layers.values():
+            if key in layer._stored_chunk_keys and key not in layer._chunks:
+                return True
+        return False
+
+    def in_range(self, key: int) -> bool:
+        """ Check if the chunk is inside of the evict radius """
+        x, y = unpack_chunk_key(key)
+        return max(abs(x - self._center[0]), abs(y - self._center[1])) <= singleton.CHUNK_STREAM_EVICT_RADIUS
+
+    def iterate_wanted_chunk_positions(self):
+        """ Iterate chunks in the load radius (nearest first), then the prefetched chunks """
+        _radius = singleton.CHUNK_STREAM_LOAD_RADIUS
+        _area = [(self._center[0] + x, self._center[1] + y) for x in range(-_radius, _radius + 1) for y in range(-_radius, _radius + 1)]
+        _area.sort(key=lambda p: max(abs(p[0] - self._center[0]), abs(p[1] - self._center[1])))
+        yield from _area
+        if self._direction == (0, 0):
+            return
+        # the area ahead of the camera
+        _ahead = (
+            self._center[0] + self._direction[0] * singleton.CHUNK_STREAM_PREFETCH_DISTANCE,
+            self._center[1] + self._direction[1] * singleton.CHUNK_STREAM_PREFETCH_DISTANCE
+        )
+        for x in range(_ahead[0] - _radius, _ahead[0] + _radius + 1):
+            for y in range(_ahead[1] - _radius, _ahead[1] + _radius + 1):
+                if max(abs(x - self._center[0]), abs(y - self._center[1])) > _radius:
+                    yield (x, y)
+
+
+# ---------------------------- #
+# simulation level of detail
+
+class SimulationScheduler:
+    """
+    Decides how often the chunks (tiles + gameobjects) around the camera are simulated.
+
+    - full: visible chunks + chunks in the render distance, updated every frame
+    - reduced: chunks in `SIMULATION_REDUCED_RADIUS`, updated every
+      `SIMULATION_REDUCED_INTERVAL` frames with the accumulated delta time
+    - frozen: everything further away, not updated -- and streamed chunks that are
+      not resident yet (nothing would collide with their tiles)
+
+    Reduced chunks are split into phases by position, so every frame only
+    catches up a slice of them. Without `_update_invisible_chunks` there is
+    no reduced tier.
+
+    """
+
+    def __init__(self, world: World) -> None:
+        """ Initialize the simulation scheduler """
+        self._world = world
+        self._interval = max(1, singleton.SIMULATION_REDUCED_INTERVAL)
+        self._frame = 0
+        # delta time accumulated by each phase since it was last updated
+        self._accumulated = [0.0] * self._interval
+        self._due_phase = 0
+
+    # ---------------------------- #
+    # logic
+
+    def update(self):
+        """ Advance the scheduler by a frame -- call once per frame, before updating """
+        # the phase that was caught up last frame starts accumulating again
+        self._accumulated[self._due_phase] = 0.0
+        for i in range(self._interval):
+            self._accumulated[i] += singleton.DELTA_TIME
+        self._frame += 1
+        self._due_phase = self._frame % self._interval
+
+    def get_tier(self, chunk_position: tuple) -> int:
+        """ Get the simulation tier of the chunk """
+        if self._world._chunk_streamer and self._world._chunk_streamer.is_chunk_loading(chunk_position):
+            return SIMULATION_TIER_FROZEN
+        _center = self._world._camera_old_chunk
+        _distance = max(abs(chunk_position[0] - _center[0]), abs(chunk_position[1] - _center[1]))
+        if _distance <= self._world._render_distance[0] or pack_chunk_key(chunk_position) in self._world._visible_chunk_keys:
+            return SIMULATION_TIER_FULL
+        if self._world._update_invisible_chunks and _distance <= self.get_reduced_radius():
+            return SIMULATION_TIER_REDUCED
+        return SIMULATION_TIER_FROZEN
+
+    def get_chunk_delta(self, chunk_position: tuple) -> float:
+        """ Get the delta time to update the chunk with this frame (None = skip the chunk) """
+        _tier = self.get_tier(chunk_position)
+        if _tier == SIMULATION_TIER_FULL:
+            return singleton.DELTA_TIME
+        if _tier == SIMULATION_TIER_REDUCED and self.get_phase(chunk_position) == self._due_phase:
+            return self._accumulated[self._due_phase]
+        return None
+
+    def get_gameobject_delta(self, gameobject: "GameObject") -> float:
+        """ Get the delta time to update the gameobject with this frame (None = skip the gameobject) """
+        return self.get_chunk_delta(get_chunk_from_pixel_position(gameobject.position))
+
+    def iterate_due_reduced_chunk_positions(self):
+        """ Iterate the reduced chunks that are caught up this frame """
+        if not self._world._update_invisible_chunks:
+            return
+        _center = self._world._camera_old_chunk
+        _full = self._world._render_distance[0]
+        _radius = self.get_reduced_radius()
+        for x in range(_center[0] - _radius, _center[0] + _radius + 1):
+            for y in range(_center[1] - _radius, _center[1] + _radius + 1):
+                if max(abs(x - _center[0]), abs(y - _center[1])) <= _full or pack_chunk_key((x, y)) in self._world._visible_chunk_keys:
+                    continue
+                if self.get_phase((x, y)) == self._due_phase:
+                    yield (x, y)
+
+    # ---------------------------- #
+    # utils
+
+    def get_phase(self, chunk_position: tuple) -> int:
+        """ Get the frame phase the (reduced) chunk is updated in """
+        return (chunk_position[0] + chunk_position[1]) % self._interval
+
+    def get_reduced_radius(self) -> int:
+        """ Get the radius of the reduced tier -- streamed worlds only keep the load radius resident """
+        if self._world._chunk_streamer:
+            return min(singleton.SIMULATION_REDUCED_RADIUS, singleton.CHUNK_STREAM_LOAD_RADIUS)
+        return singleton.SIMULATION_REDUCED_RADIUS
+
+    def get_due_delta(self) -> float:
+        """ Get the delta time of the reduced chunks that are caught up this frame """
+        return self._accumulated[self._due_phase]
+
+
 # ---------------------------- #
 # utils
 
-def generate_id() -> str:
-    """ Generate a unique id """
-    return uuid.uuid4().hex
+@contextlib.contextmanager
+def override_delta_time(delta: float):
+    """ Run code with a different `singleton.DELTA_TIME` (catch-up updates) """
+    _old = singleton.DELTA_TIME
+    singleton.DELTA_TIME = delta
+    try:
+        yield
+    finally:
+        singleton.DELTA_TIME = _old
+
+def generate_id() -> int:
+    """ Generate a unique (per run) id """
+    return next(ID_COUNTER)
+
+def pack_chunk_key(position: tuple) -> int:
+    """ Pack a chunk position into a single int key """
+    return ((int(position[0]) & CHUNK_KEY_MASK) << CHUNK_KEY_BITS) | (int(position[1]) & CHUNK_KEY_MASK)
+
+def unpack_chunk_key(key: int) -> tuple:
+    """ Unpack a chunk key into the chunk position """
+    x, y = (key >> CHUNK_KEY_BITS) & CHUNK_KEY_MASK, key & CHUNK_KEY_MASK
+    return ((x ^ CHUNK_KEY_SIGN) - CHUNK_KEY_SIGN, (y ^ CHUNK_KEY_SIGN) - CHUNK_KEY_SIGN)
+
+def get_chunk_filename(position: tuple, layer_id: int) -> str:
+    """ Get the (stable) chunk file name -- `x==y==layer` """
+    return f"{int(position[0])}=={int(position[1])}=={layer_id}"
+
+def get_chunk_file_path(world_storage_key: str, position: tuple, layer_id: int) -> str:
+    """ Get the path of a (legacy) chunk file """
+    return WORLD_LEVEL_FOLDER + world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER + get_chunk_filename(position, layer_id)
+
+def get_world_region_folder(world_storage_key: str) -> str:
+    """ Get the region folder of the world """
+    return WORLD_LEVEL_FOLDER + world_storage_key + "/" + WORLD_LEVEL_REGIONS_FOLDER
+
+def read_chunk_data(world_storage_key: str, position: tuple, layer_id: int) -> object:
+    """ Read the chunk data from its region file (safe to call from any thread) """
+    _data = region.get_region_store(get_world_region_folder(world_storage_key)).read_chunk(position, layer_id)
+    if _data is None:
+        # chunk file that was not converted yet
+        with open(get_chunk_file_path(world_storage_key, position, layer_id), 'rb') as f:
+            _data = f.read()
+    return decode_chunk_data(_data)
+
+def decode_chunk_data(data: bytes) -> object:
+    """ Decode serialized chunk data (binary or pickled) """
+    if chunkcodec.is_binary_chunk(data):
+        return chunkcodec.decode_chunk(data)
+    return dill.loads(data)
+
+def write_chunk_data(world_storage_key: str, position: tuple, layer_id: int, data: bytes):
+    """ Write a serialized chunk into its region file (safe to call from any thread) """
+    region.get_region_store(get_world_region_folder(world_storage_key)).write_chunk(position, layer_id, data)
+
+def convert_chunk_files_to_regions(world_storage_key: str) -> int:
+    """ 
+    Move all `x==y==layer` chunk files of the world into region files
+
+    Chunks that are already stored in a region are kept. The chunk files are
+    moved into the backup folder once the region holds them (checked by reading
+    them back). Returns the number of converted chunks.
+    """
+    _folder = WORLD_LEVEL_FOLDER + world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER
+    if not os.path.exists(_folder):
+        return 0
+    _store = region.get_region_store(get_world_region_folder(world_storage_key))
+    _layers = {}
+    _files = []
+    for _filename in os.listdir(_folder):
+        _parts = _filename.split("==")
+        if len(_parts) != 3:
+            continue
+        try:
+            _x, _y, _layer = (int(_p) for _p in _parts)
+        except ValueError:
+            continue
+        _files.append(((_x, _y), _layer, _folder + _filename))
+        if _store.read_chunk((_x, _y), _layer) is not None:
+            continue
+        with open(_folder + _filename, 'rb') as f:
+            _layers.setdefault(_layer, {})[(_x, _y)] = f.read()
+    for _layer, _chunks in _layers.items():
+        _store.write_chunks(_layer, _chunks)
+    # only back up the files the regions really hold
+    _backup = WORLD_LEVEL_FOLDER + world_storage_key + "/" + WORLD_LEVEL_CHUNKS_BACKUP_FOLDER
+    for _position, _layer, _path in _files:
+        _data = _layers.get(_layer, {}).get(_position)
+        _stored = _store.read_chunk(_position, _layer)
+        if _stored is None or (_data is not None and bytes(_stored) != _data):
+            print("Chunk file was not converted, keeping it: ", _path)
+            continue
+        os.makedirs(_backup, exist_ok=True)
+        os.replace(_path, _backup + os.path.basename(_path))
+    return sum(len(_chunks) for _chunks in _layers.values())
+
+def migrate_chunk_files(world_storage_key: str, default_layer: int = 0) -> list:
+    """ 
+    Migrate legacy chunk files in the world chunk folder
+    
+    Files named `x==y` (no layer id) are renamed to `x==y==<default_layer>` if that
+    file does not exist yet (+ the chunk is not in a region). Returns the list of migrated file names.
+    """
+    _folder = WORLD_LEVEL_FOLDER + world_storage_key + "/" + WORLD_LEVEL_CHUNKS_FOLDER
+    if not os.path.exists(_folder):
+        return []
+    _store = region.get_region_store(get_world_region_folder(world_storage_key))
+    result = []
+    for _filename in os.listdir(_folder):
+        _parts = _filename.split("==")
+        if len(_parts) != 2:
+            continue
+        try:
+            _position = (int(_parts[0]), int(_parts[1]))
+        except ValueError:
+            continue
+        _new = get_chunk_filename(_position, default_layer)
+        if os.path.exists(_folder + _new) or _store.read_chunk(_position, default_layer) is not None:
+            continue
+        os.rename(_folder + _filename, _folder + _new)
+        result.append(_new)
+    return result
+
+def tile_overrides_update(tile: DefaultTile) -> bool:
+    """ Check if the tile class has its own update logic """
+    _class = tile.__class__
+    if _class not in TILE_UPDATE_OVERRIDE_CACHE:
+        TILE_UPDATE_OVERRIDE_CACHE[_class] = _class.update is not DefaultTile.update
+    return TILE_UPDATE_OVERRIDE_CACHE[_class]
+
+def tile_overrides_collision(tile: DefaultTile) -> bool:
+    """ Check if the tile class has its own collision callback """
+    _class = tile.__class__
+    if _class not in TILE_COLLISION_OVERRIDE_CACHE:
+        TILE_COLLISION_OVERRIDE_CACHE[_class] = _class.on_collision is not DefaultTile.on_collision
+    return TILE_COLLISION_OVERRIDE_CACHE[_class]
+
+def greedy_mesh(cells: np.ndarray) -> list:
+    """ 
+    Merge the filled cells of a (rows, columns) bool array into maximal rects -- [(x, y, w, h)]
+
+    Runs are grown to the right first, then downwards while the whole run below is filled.
+    """
+    _h, _w = cells.shape
+    _open = cells.tolist()
+    result = []
+    for y in range(_h):
+        x = 0
+        while x < _w:
+            if not _open[y][x]:
+                x += 1
+                continue
+            _right = x
+            while _right < _w and _open[y][_right]:
+                _right += 1
+            _bottom = y + 1
+            while _bottom < _h and all(_open[_bottom][x:_right]):
+                _bottom += 1
+            for _row in range(y, _bottom):
+                _open[_row][x:_right] = [False] * (_right - x)
+            result.append((x, y, _right - x, _bottom - y))
+            x = _right
+    return result
+
+def create_tile_index_array(dimensions: tuple) -> np.ndarray:
+    """ Create an empty tile index array - (rows, columns) """
+    return np.zeros((dimensions[1], dimensions[0]), dtype=CHUNK_TILE_INDEX_DTYPE)
+
+def copy_tile(tile: DefaultTile) -> DefaultTile:
+    """ Create an unplaced copy of a tile (keeps the tile class, state + custom data) """
+    result = copy.copy(tile)
+    result._tile_id = generate_id()
+    # the chunk placement keys are derived from the new cell
+    result._data = tile.get_custom_data()
+    result._parent_chunk = None
+    return result
 
 def get_chunk_from_pixel_position(pos: tuple):
     """ Get the chunk from the position """
@@ -821,3 +2594,11 @@ def pixel_to_tile_coords(pos: tuple):
         int(pos[0] // singleton.DEFAULT_TILE_WIDTH),
         int(pos[1] // singleton.DEFAULT_TILE_HEIGHT)
     )
+
+def get_tile_range_from_rect(rect: pygame.Rect, tile_area: tuple = None):
+    """ Get the (inclusive) range of global tile coordinates that a rect overlaps """
+    _tw, _th = tile_area if tile_area else (singleton.DEFAULT_TILE_WIDTH, singleton.DEFAULT_TILE_HEIGHT)
+    return (
+        (int(rect.left // _tw), int(rect.top // _th)),
+        (math.ceil(rect.right / _tw) - 1, math.ceil(rect.bottom / _th) - 1)
+    )
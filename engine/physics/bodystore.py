@@ -0,0 +1,432 @@
+import math
+import pygame
+
+import numpy as np
+
+from engine import singleton
+
+from engine.handler import world
+
+
+# ---------------------------- #
+# constants
+
+BODY_STORE_INITIAL_CAPACITY = 64
+
+# touching flags (same order as `physics_comp.TOUCHING_*`)
+TOUCHING_LEFT = 0
+TOUCHING_RIGHT = 1
+TOUCHING_TOP = 2
+TOUCHING_BOTTOM = 3
+
+# component attributes that become views into the store
+BODY_VECTOR_FIELDS = ("_velocity", "_acceleration", "_force")
+
+
+# ---------------------------- #
+# body store
+
+class BodyStore:
+    """
+    Structure of arrays storage for world rect bodies.
+
+    Every attached component owns a dense slot (`_body_slot`) into the arrays,
+    its `_velocity`, `_acceleration`, `_force` and `_touching` attributes become
+    views into its row. Removing a body moves the last body into the free slot.
+
+    The store holds the collision rect (topleft + size) of each body, the
+    gameobject position is `topleft + offset`.
+
+    """
+
+    def __init__(self, capacity: int = BODY_STORE_INITIAL_CAPACITY) -> None:
+        """ Initialize the body store """
+        self._count = 0
+        self._components = []
+
+        self._positions = np.zeros((capacity, 2), dtype=np.float64)
+        self._velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self._acceleration = np.zeros((capacity, 2), dtype=np.float64)
+        self._force = np.zeros((capacity, 2), dtype=np.float64)
+        self._sizes = np.zeros((capacity, 2), dtype=np.float64)
+        self._offsets = np.zeros((capacity, 2), dtype=np.float64)
+        self._masks = np.zeros(capacity, dtype=np.uint16)
+        self._zlayers = np.zeros(capacity, dtype=np.int64)
+        self._touching = np.zeros((capacity, 4), dtype=bool)
+        # hitbox bodies drop the acceleration of an axis on contact
+        self._hitbox = np.zeros(capacity, dtype=bool)
+
+    # ---------------------------- #
+    # slots
+
+    def add_body(self, component: "WorldRectComponent"):
+        """ Move the physics state of the component into the store """
+        if self._count == len(self._positions):
+            self._grow()
+        _slot = self._count
+        self._count += 1
+        self._components.append(component)
+        component._body_store = self
+        component._body_slot = _slot
+
+        for _field in BODY_VECTOR_FIELDS:
+            getattr(self, _field)[_slot] = tuple(getattr(component, _field))
+            setattr(component, _field, BodyVector(component, _field))
+        self._touching[_slot] = component._touching
+        component._touching = BodyFlags(component, "_touching")
+        self.refresh_body(component)
+
+    def remove_body(self, component: "WorldRectComponent"):
+        """ Move the physics state back into the component + free its slot """
+        _slot = component._body_slot
+        for _field in BODY_VECTOR_FIELDS:
+            setattr(component, _field, pygame.math.Vector2(getattr(self, _field)[_slot].tolist()))
+        component._touching = self._touching[_slot].tolist()
+        component._body_store = None
+        component._body_slot = -1
+
+        # move the last body into the slot
+        _last = self._count - 1
+        if _slot != _last:
+            for _array in self.iter_arrays():
+                _array[_slot] = _array[_last]
+            self._components[_slot] = self._components[_last]
+            self._components[_slot]._body_slot = _slot
+        self._components.pop()
+        self._count -= 1
+
+    def refresh_body(self, component: "WorldRectComponent"):
+        """ Re-read the rect, mask + layer of the component (after it was moved / resized) """
+        _slot = component._body_slot
+        _gameobject = component.get_gameobject()
+        if component._has_hitbox:
+            _hitbox = component._hitbox._rect
+            self._positions[_slot] = (_gameobject.position.x + _hitbox.x, _gameobject.position.y + _hitbox.y)
+            self._sizes[_slot] = _hitbox.size
+            self._offsets[_slot] = (-_hitbox.x, -_hitbox.y)
+        else:
+            self._positions[_slot] = component._rect.topleft
+            self._sizes[_slot] = component._area
+            self._offsets[_slot] = (component._area[0] / 2, component._area[1] / 2)
+        self._masks[_slot] = component._collision_mask
+        self._zlayers[_slot] = _gameobject.zlayer
+        self._hitbox[_slot] = component._has_hitbox
+
+    def _grow(self):
+        """ Double the capacity of every array """
+        for _name in self.iter_array_names():
+            _array = getattr(self, _name)
+            _new = np.zeros((len(_array) * 2,) + _array.shape[1:], dtype=_array.dtype)
+            _new[:len(_array)] = _array
+            setattr(self, _name, _new)
+
+    # ---------------------------- #
+    # logic
+
+    def step(self, _world: "World"):
+        """ Integrate + resolve all bodies against the world tiles (array operations) """
+        if not self._count:
+            return
+        _dt = self.get_delta_times(_world)
+        _index = np.flatnonzero(~np.isnan(_dt))
+        if len(_index):
+            self._step_bodies(_world, _index, _dt[_index, None])
+        # reset acceleration
+        self._acceleration[:self._count] = 0
+
+    def _step_bodies(self, _world: "World", index: np.ndarray, dt: np.ndarray):
+        """ Step the bodies at the slots with their delta time """
+        _positions = self._positions[index]
+        _velocity = self._velocity[index]
+        _acceleration = self._acceleration[index]
+        _touching = np.zeros((len(index), 4), dtype=bool)
+        _start = _positions.copy()
+
+        # add acceleration
+        _velocity += _acceleration * 0.5 * dt
+        # x-axis movement
+        _positions[:, 0] += _velocity[:, 0] * dt[:, 0]
+        self._resolve_axis(_world, index, _positions, _velocity, _acceleration, _touching, 0)
+        # y-axis movement
+        _positions[:, 1] += _velocity[:, 1] * dt[:, 0]
+        self._resolve_axis(_world, index, _positions, _velocity, _acceleration, _touching, 1)
+        # add acceleration again
+        _velocity += _acceleration * 0.5 * dt
+
+        self._positions[index] = _positions
+        self._velocity[index] = _velocity
+        self._acceleration[index] = _acceleration
+        self._touching[index] = _touching
+
+        # update the components of the bodies that moved
+        _moved = np.flatnonzero((_positions != _start).any(axis=1))
+        if len(_moved):
+            self._sync_components(_world, index[_moved], _start[_moved], _positions[_moved])
+
+    def _resolve_axis(self, _world: "World", index: np.ndarray, positions: np.ndarray, velocity: np.ndarray, acceleration: np.ndarray, touching: np.ndarray, axis: int):
+        """ Resolve the moved rects along the axis against the solid cells (+ fire the tile callbacks) """
+        _sizes = self._sizes[index]
+        _tile = (singleton.DEFAULT_TILE_WIDTH, singleton.DEFAULT_TILE_HEIGHT)
+        # (inclusive) tile range of every rect -- same as `world.get_tile_range_from_rect`
+        _start = np.floor(positions / _tile).astype(np.int64)
+        _end = np.ceil((positions + _sizes) / _tile).astype(np.int64) - 1
+
+        # bodies are grouped by (layer, collision mask)
+        _groups = (self._zlayers[index] << 16) | self._masks[index]
+        _unique = np.unique(_groups)
+        for _group in _unique.tolist():
+            _rows = np.arange(len(index)) if len(_unique) == 1 else np.flatnonzero(_groups == _group)
+            _layer = _world.get_layer_at(_group >> 16)
+            _first, _last, _hit, _callback = self.collect_cells(_layer, _group & 0xFFFF, _start[_rows], _end[_rows], axis)
+
+            # tiles with collision callbacks that were touched
+            for _row in _rows[_callback].tolist():
+                self.fire_callbacks(_layer, int(index[_row]), positions[_row])
+
+            # resolve against the nearest solid column / row along the movement
+            _forward = _hit & (velocity[_rows, axis] > 0)
+            _backward = _hit & (velocity[_rows, axis] < 0)
+            _forward_rows, _backward_rows = _rows[_forward], _rows[_backward]
+            positions[_forward_rows, axis] = _first[_forward] * _tile[axis] - _sizes[_forward_rows, axis]
+            positions[_backward_rows, axis] = (_last[_backward] + 1) * _tile[axis]
+
+            _resolved = np.concatenate((_forward_rows, _backward_rows))
+            velocity[_resolved, axis] = 0
+            acceleration[_resolved[self._hitbox[index[_resolved]]], axis] = 0
+            touching[_forward_rows, TOUCHING_RIGHT if axis == 0 else TOUCHING_BOTTOM] = True
+            touching[_backward_rows, TOUCHING_LEFT if axis == 0 else TOUCHING_TOP] = True
+
+    def collect_cells(self, layer: "Layer", mask: int, start: np.ndarray, end: np.ndarray, axis: int) -> tuple:
+        """
+        Look up the cells inside of the (inclusive) global tile ranges in the chunk occupancy bitmaps
+
+        Returns (first solid column / row, last solid column / row, has a solid cell, touches a callback tile)
+        per range -- columns for axis 0, rows for axis 1.
+        """
+        _cw, _ch = singleton.DEFAULT_CHUNK_WIDTH, singleton.DEFAULT_CHUNK_HEIGHT
+        _span = end - start + 1
+        # every (column, row) offset of the largest range -- (offsets, ranges)
+        _columns, _rows = np.meshgrid(np.arange(_span[:, 0].max()), np.arange(_span[:, 1].max()), indexing="ij")
+        _columns, _rows = _columns.reshape(-1, 1), _rows.reshape(-1, 1)
+        _valid = (_columns < _span[:, 0]) & (_rows < _span[:, 1])
+        _xs = start[:, 0] + np.where(_valid, _columns, 0)
+        _ys = start[:, 1] + np.where(_valid, _rows, 0)
+
+        # one table entry per chunk that is touched
+        _cxs, _cys = _xs // _cw, _ys // _ch
+        _keys, _first, _inverse = np.unique(
+            (_cxs << world.CHUNK_KEY_BITS) | (_cys & world.CHUNK_KEY_MASK),
+            return_index=True, return_inverse=True
+        )
+        _solid_table = np.zeros((len(_keys), _ch, _cw), dtype=bool)
+        _callback_table = np.zeros((len(_keys), _ch, _cw), dtype=bool)
+        for i, _position in enumerate(zip(_cxs.ravel()[_first].tolist(), _cys.ravel()[_first].tolist())):
+            if (_chunk := layer.get_chunk_at(_position)) is None:
+                continue
+            _solid_table[i] = _chunk.get_mask_cells(mask, solid=True)
+            _callback_table[i] = _chunk.get_callback_cells(mask)
+        _inverse = _inverse.reshape(_xs.shape)
+        _solid = _solid_table[_inverse, _ys % _ch, _xs % _cw] & _valid
+        _callback = _callback_table[_inverse, _ys % _ch, _xs % _cw] & _valid
+
+        _coords = _xs if axis == 0 else _ys
+        return (
+            np.where(_solid, _coords, np.iinfo(np.int64).max).min(axis=0),
+            np.where(_solid, _coords, np.iinfo(np.int64).min).max(axis=0),
+            _solid.any(axis=0),
+            _callback.any(axis=0),
+        )
+
+    def fire_callbacks(self, layer: "Layer", slot: int, position: np.ndarray):
+        """ Run `on_collision` of the callback tiles the body rect touches """
+        _component = self._components[slot]
+        _rect = pygame.FRect(position.tolist(), self._sizes[slot].tolist())
+        for _tile in layer.collide_callback_tiles(_rect, int(self._masks[slot])):
+            _tile.on_collision(_component.get_gameobject())
+
+    def _sync_components(self, _world: "World", slots: np.ndarray, start: np.ndarray, positions: np.ndarray):
+        """ Write the new positions into the gameobjects + rects (and move them between chunks) """
+        _chunk_size = (singleton.DEFAULT_CHUNK_PIXEL_WIDTH, singleton.DEFAULT_CHUNK_PIXEL_HEIGHT)
+        _offsets = self._offsets[slots]
+        _centers = positions + _offsets
+        _changed = (np.floor((start + _offsets) / _chunk_size) != np.floor(_centers / _chunk_size)).any(axis=1)
+        for _slot, _topleft, _center, _chunk_changed in zip(slots.tolist(), positions.tolist(), _centers.tolist(), _changed.tolist()):
+            _component = self._components[_slot]
+            _gameobject = _component._parent_gameobject
+            if _chunk_changed:
+                _world._physics_handler.update_gameobject_chunk(_gameobject, _center)
+            _gameobject.position.xy = _center
+            if self._hitbox[_slot]:
+                _component._rect.center = _center
+            else:
+                _component._rect.topleft = _topleft
+
+    # ---------------------------- #
+    # utils
+
+    def get_delta_times(self, _world: "World") -> np.ndarray:
+        """ Get the delta time of every body (simulation tier of its chunk) -- nan = frozen """
+        _chunks = np.floor(
+            (self._positions[:self._count] + self._offsets[:self._count])
+            / (singleton.DEFAULT_CHUNK_PIXEL_WIDTH, singleton.DEFAULT_CHUNK_PIXEL_HEIGHT)
+        ).astype(np.int64)
+        _keys, _first, _inverse = np.unique(
+            (_chunks[:, 0] << world.CHUNK_KEY_BITS) | (_chunks[:, 1] & world.CHUNK_KEY_MASK),
+            return_index=True, return_inverse=True
+        )
+        _deltas = np.array([
+            math.nan if (_delta := _world._simulation.get_chunk_delta(_position)) is None else _delta
+            for _position in map(tuple, _chunks[_first].tolist())
+        ], dtype=np.float64)
+        return _deltas[_inverse.reshape(-1)]
+
+    def iter_array_names(self):
+        """ Iterate the names of the body arrays """
+        yield from ("_positions", "_velocity", "_acceleration", "_force", "_sizes", "_offsets", "_masks", "_zlayers", "_touching", "_hitbox")
+
+    def iter_arrays(self):
+        """ Iterate the body arrays """
+        for _name in self.iter_array_names():
+            yield getattr(self, _name)
+
+    def __len__(self) -> int:
+        """ Get the number of bodies """
+        return self._count
+
+
+# ---------------------------- #
+# views
+
+class BodyFlags:
+    """ A list-like view of the row of a component inside of a body store array """
+
+    __slots__ = ("_component", "_field")
+
+    def __init__(self, component: "WorldRectComponent", field: str) -> None:
+        """ Initialize the view """
+        self._component = component
+        self._field = field
+
+    def _row(self) -> np.ndarray:
+        """ Get the row of the component (slots + arrays can move) """
+        return getattr(self._component._body_store, self._field)[self._component._body_slot]
+
+    def __getitem__(self, index):
+        """ Get a value of the row """
+        return self._row()[index].tolist()
+
+    def __setitem__(self, index, value):
+        """ Set a value of the row """
+        self._row()[index] = value
+
+    def __len__(self) -> int:
+        """ Get the length of the row """
+        return len(self._row())
+
+    def __iter__(self):
+        """ Iterate the row """
+        return iter(self._row().tolist())
+
+    def __repr__(self):
+        """ String representation of the view """
+        return f"{self.__class__.__name__}({self._row().tolist()})"
+
+
+class BodyVector(BodyFlags):
+    """ A Vector2-like view of the row of a component -- arithmetic returns a plain Vector2 """
+
+    __slots__ = ()
+
+    # ---------------------------- #
+    # components
+
+    @property
+    def x(self) -> float:
+        return float(self._row()[0])
+
+    @x.setter
+    def x(self, value: float):
+        self._row()[0] = value
+
+    @property
+    def y(self) -> float:
+        return float(self._row()[1])
+
+    @y.setter
+    def y(self, value: float):
+        self._row()[1] = value
+
+    @property
+    def xy(self) -> pygame.math.Vector2:
+        return self.copy()
+
+    @xy.setter
+    def xy(self, value: tuple):
+        self._row()[:] = tuple(value)
+
+    # ---------------------------- #
+    # in place
+
+    def __iadd__(self, other):
+        self._row()[:] += tuple(other)
+        return self
+
+    def __isub__(self, other):
+        self._row()[:] -= tuple(other)
+        return self
+
+    def __imul__(self, scalar: float):
+        self._row()[:] *= scalar
+        return self
+
+    # ---------------------------- #
+    # arithmetic
+
+    def __add__(self, other):
+        return self.copy() + other
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.copy() - other
+
+    def __rsub__(self, other):
+        return other - self.copy()
+
+    def __mul__(self, other):
+        return self.copy() * other
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar: float):
+        return self.copy() / scalar
+
+    def __neg__(self):
+        return -self.copy()
+
+    def __eq__(self, other):
+        return self.copy() == other
+
+    def __bool__(self) -> bool:
+        return bool(self._row().any())
+
+    # ---------------------------- #
+    # utils
+
+    def copy(self) -> pygame.math.Vector2:
+        """ Get a plain Vector2 copy of the row """
+        return pygame.math.Vector2(self._row().tolist())
+
+    def length(self) -> float:
+        return math.hypot(*self._row().tolist())
+
+    magnitude = length
+
+    def length_squared(self) -> float:
+        return self.copy().length_squared()
+
+    def rotate(self, angle: float) -> pygame.math.Vector2:
+        return self.copy().rotate(angle)
+
+    def normalize(self) -> pygame.math.Vector2:
+        return self.copy().normalize()
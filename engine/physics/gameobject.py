@@ -7,6 +7,8 @@ from engine import singleton
 # ---------------------------- #
 # constants
 
+# {component class: (index keys)} -- every class + class name in the mro
+COMPONENT_INDEX_KEYS_CACHE = {}
 
 
 # ---------------------------- #
@@ -24,22 +26,36 @@ class GameObject:
         
         self.position = pygame.math.Vector2(position)
         self.zlayer = 0
+        # fixed timestep -- position before the last step + the interpolated position drawn this frame
+        self._previous_position = pygame.math.Vector2(position)
+        self._render_position = None
 
         # gameobject component system
         self._components = []
+        # {component class / class name: [components]} -- every class in the mro, in add order
+        self._component_index = {}
+        self._component_ranks = {}
+        self._component_counter = 0
         
         # for the physics/gameobject handler
         self._alive = True
         self._death_emitter = None
         self._parent_phandler = parent
+        # the chunk the physics handler indexed the gameobject in
+        self._chunk_key = None
 
         self._queue_components = []
+        # set by a `pool.GameObjectPool` -- killing parks the gameobject in the pool
+        self._pool = None
     
     def __post_init__(self):
         """ Post init function """
-        for _comp in self._queue_components:
-            self.add_component(_comp)
+        _queue = self._queue_components
         self._queue_components = []
+        for _comp in _queue:
+            # indexed again when it is added
+            self._unindex_component(_comp)
+            self.add_component(_comp)
 
     # ---------------------------- #
     # logic
@@ -51,53 +67,85 @@ class GameObject:
     def handle_death_signal(self, data: dict):
         """ Death function -- to be overriden """
         # self._alive should already be set to false
-        for _comp in self._components:
-            self.remove_component(self._parent_phandler._world._component_handler.get_component(_comp))
-            # remove from handler
-            self._parent_phandler._world._component_handler.remove_component(_comp)
-            # remove from aspect handler
-            self._parent_phandler._world._aspect_handler._remove_component_by_id(_comp)
+        # remove from component handler + aspect handler
+        for _comp in list(self._components):
+            self.remove_component(_comp)
 
     def add_component(self, component: "Component"):
         """ Add a component to the gameobject """
         if not self._parent_phandler:
             self._queue_components.append(component)
+            self._index_component(component)
             return component
         # add component to component handler + aspect handler
         self._parent_phandler._world._component_handler.add_component(component)
         self._parent_phandler._world._aspect_handler.register_component(component)
         # add to self
         self._components.append(component)
+        self._index_component(component)
         # run post_init script
         component.__post_gameobject__(self)
+        self._parent_phandler._world._query_handler.update_gameobject(self, component)
         # return the component
         return component
     
     def get_component(self, component_names: list):
-        """ Get a component by name """
+        """ Get the first added component of any of the classes / class names (subclasses included) """
         if not isinstance(component_names, list):
-            component_names = [component_names]
-        # find component
-        if not self._parent_phandler:
-            for _comp in self._queue_components:
-                if _comp.__class__.__name__ in component_names:
-                    return _comp
-            return None
-        # has parent
-        for _comp in self._components:
-            if _comp.__class__.__name__ in component_names:
-                return _comp
-        return None
+            _found = self._component_index.get(component_names)
+            return _found[0] if _found else None
+        result = None
+        for _name in component_names:
+            if (_found := self._component_index.get(_name)) and (result is None or self._component_ranks[_found[0].get_component_id()] < self._component_ranks[result.get_component_id()]):
+                result = _found[0]
+        return result
+
+    def get_components(self, component_names: list) -> list:
+        """ Get all components of the classes / class names (subclasses included) in add order """
+        if not isinstance(component_names, list):
+            return list(self._component_index.get(component_names, ()))
+        result = {}
+        for _name in component_names:
+            for _comp in self._component_index.get(_name, ()):
+                result[_comp.get_component_id()] = _comp
+        return sorted(result.values(), key=lambda x: self._component_ranks[x.get_component_id()])
+
+    def has_component(self, component_names: list) -> bool:
+        """ Check if the gameobject has a component of any of the classes / class names """
+        if not isinstance(component_names, list):
+            return component_names in self._component_index
+        return any(_name in self._component_index for _name in component_names)
 
     def remove_component(self, component: "Component"):
         """ Remove a component from the gameobject """
         if not self._parent_phandler:
+            self._unindex_component(component)
             return self._queue_components.remove(component)
         # remove component from component handler + aspect handler
-        self._parent_phandler._world._component_handler._remove_component(component)
+        self._parent_phandler._world._component_handler._remove_component(component.get_component_id())
         self._parent_phandler._world._aspect_handler._remove_component(component)
         # remove from self
         self._components.remove(component)
+        self._unindex_component(component)
+        self._parent_phandler._world._query_handler.update_gameobject(self, component)
+
+    def _index_component(self, component: "Component"):
+        """ Add the component to the component index """
+        self._component_ranks[component.get_component_id()] = self._component_counter
+        self._component_counter += 1
+        for _key in get_component_index_keys(component.__class__):
+            if _key not in self._component_index:
+                self._component_index[_key] = []
+            self._component_index[_key].append(component)
+
+    def _unindex_component(self, component: "Component"):
+        """ Remove the component from the component index """
+        self._component_ranks.pop(component.get_component_id(), None)
+        for _key in get_component_index_keys(component.__class__):
+            if component in self._component_index.get(_key, ()):
+                self._component_index[_key].remove(component)
+                if not self._component_index[_key]:
+                    del self._component_index[_key]
 
     # ---------------------------- #
     # utils
@@ -107,6 +155,17 @@ class GameObject:
         self.position.xy = x, y
         self.rect.topleft = x, y
     
+    def get_render_position(self) -> "Vector2":
+        """ Get the position to draw at (interpolated between the last two fixed steps) """
+        return self._render_position if self._render_position is not None else self.position
+    
+    def __pool_reset__(self, position: tuple):
+        """ Called before a pooled gameobject is spawned again """
+        self.position.xy = position
+        self._previous_position.xy = position
+        self._render_position = None
+        self._alive = True
+    
     def kill(self):
         """ Kill the gameobject """
         self._alive = False
@@ -122,16 +181,46 @@ class GameObject:
     def __getstate__(self):
         """ Pickle state """
         state = self.__dict__.copy()
+        # pools are not saved -- a loaded gameobject dies normally
+        state["_pool"] = None
+        # the physics handler indexes the gameobject again
+        state["_chunk_key"] = None
         return state
 
     def __setstate__(self, state):
         """ Unpickle state """
         self.__dict__.update(state)
+        self.__dict__.setdefault("_pool", None)
+        self._chunk_key = None
+        if "_previous_position" not in state:
+            self._previous_position = pygame.math.Vector2(self.position)
+            self._render_position = None
+        # older saves have no component index -- built on first use (see `__getattr__`),
+        # the components may not be unpickled yet
+
+    def __getattr__(self, name: str):
+        """ Build the component index of older saves on first use """
+        if name not in ("_component_index", "_component_ranks", "_component_counter") or "_components" not in self.__dict__:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        self._component_index = {}
+        self._component_ranks = {}
+        self._component_counter = 0
+        for _comp in self._queue_components + self._components:
+            self._index_component(_comp)
+        return getattr(self, name)
 
 
 # ---------------------------- #
 # functions
 
+def get_component_index_keys(_class: "Component Class") -> tuple:
+    """ Get the keys a component class is indexed by -- every class + class name in the mro """
+    if _class not in COMPONENT_INDEX_KEYS_CACHE:
+        COMPONENT_INDEX_KEYS_CACHE[_class] = tuple(
+            _key for _base in _class.__mro__ if _base is not object for _key in (_base, _base.__name__)
+        )
+    return COMPONENT_INDEX_KEYS_CACHE[_class]
+
 def create_gameobject_id():
     """ Create a new gameobject id """
     singleton.GAMEOBJECT_ID_COUNT += 1
@@ -1,6 +1,7 @@
 import pygame
 
 from engine import utils
+from engine import profiler
 
 from engine.handler import world
 from engine.handler import signal
@@ -27,7 +28,7 @@ class PhysicsHandler:
         self._death_signal = signal.Signal(DEATH_SIGNAL_NAME)
         self._death_signal.add_emitter_handling_function(DEATH_SIGNAL_ID, self.handle_death_signal)
 
-        # gameobjects + chunks
+        # gameobjects + chunks -- {chunk position: {gameobject id}}, the key is kept in `gameobject._chunk_key`
         self._gameobject_chunks = {}
     
     def __post_init__(self):
@@ -40,10 +41,40 @@ class PhysicsHandler:
     def update(self):
         """ Update the physics handler """
         # update physics world components
-        for component in self._components:
-            component.update() if component._active else None
-        for gameobject in self._gameobjects.values():
-            gameobject.update()
+        with profiler.scope("physics components"):
+            for component in self._components:
+                component.update() if component._active else None
+        # gameobjects are updated per chunk -- distant chunks less often (or not at all)
+        with profiler.scope("gameobjects"):
+            self.refresh_gameobject_chunks()
+            _simulation = self._world._simulation
+            _batches = [(_position, tuple(_ids)) for _position, _ids in self._gameobject_chunks.items()]
+            for _position, _ids in _batches:
+                _delta = _simulation.get_chunk_delta(_position)
+                if _delta is None:
+                    continue
+                with world.override_delta_time(_delta):
+                    for _id in _ids:
+                        if _id in self._gameobjects:
+                            self._gameobjects[_id].update()
+    
+    def store_previous_positions(self):
+        """ Keep the gameobject positions from before a fixed step """
+        for _gameobject in self._gameobjects.values():
+            _gameobject._previous_position.xy = _gameobject.position
+
+    def interpolate_positions(self, alpha: float):
+        """ Set the gameobject render positions between the last two fixed steps """
+        alpha = utils.clamp(alpha, 0, 1)
+        for _gameobject in self._gameobjects.values():
+            if _gameobject._render_position is None:
+                _gameobject._render_position = pygame.math.Vector2()
+            _gameobject._render_position.xy = _gameobject._previous_position.lerp(_gameobject.position, alpha)
+
+    def clear_render_positions(self):
+        """ Draw the gameobjects at their positions again (variable timestep) """
+        for _gameobject in self._gameobjects.values():
+            _gameobject._render_position = None
     
     def add_component(self, component: "PhysicsComponent"):
         """ Add an component to the physics handler """
@@ -65,15 +96,32 @@ class PhysicsHandler:
     
     def update_gameobject_chunk(self, gameobject: "GameObject", _new_position: "Vector2"):
         """ Update the gameobject chunk """
+        _chunk_coords = world.get_chunk_from_pixel_position(_new_position)
+        if gameobject._chunk_key == _chunk_coords:
+            return
         # remove gameobject from old chunk
-        _old_chunk = world.get_chunk_from_pixel_position(gameobject.position)
-        if _old_chunk in self._gameobject_chunks:
-            self._gameobject_chunks[_old_chunk].remove(gameobject._id)
+        self.remove_gameobject_chunk(gameobject)
         # add gameobject to new chunk
-        _chunk_coords = world.get_chunk_from_pixel_position(_new_position)
         if not _chunk_coords in self._gameobject_chunks:
             self._gameobject_chunks[_chunk_coords] = set()
         self._gameobject_chunks[_chunk_coords].add(gameobject._id)
+        gameobject._chunk_key = _chunk_coords
+    
+    def remove_gameobject_chunk(self, gameobject: "GameObject"):
+        """ Remove the gameobject from the chunk it was indexed in """
+        _chunk_coords = gameobject._chunk_key
+        gameobject._chunk_key = None
+        if _chunk_coords not in self._gameobject_chunks:
+            return
+        self._gameobject_chunks[_chunk_coords].discard(gameobject._id)
+        if not self._gameobject_chunks[_chunk_coords]:
+            del self._gameobject_chunks[_chunk_coords]
+
+    def refresh_gameobject_chunks(self):
+        """ Move the gameobjects whose position was written directly (not through `update_gameobject_chunk`) """
+        for _gameobject in self._gameobjects.values():
+            if _gameobject._chunk_key != world.get_chunk_from_pixel_position(_gameobject.position):
+                self.update_gameobject_chunk(_gameobject, _gameobject.position)
     
     def get_gameobject(self, gameobject_hash: int):
         """ Get an gameobject by id """
@@ -87,19 +135,47 @@ class PhysicsHandler:
         - id: int
         - data: dict (containing whatever lol)
         """
+        _gameobject = self._gameobjects.get(data['id'])
+        if _gameobject is None:
+            # killed more than once
+            return
         
-        # get chunk + remove entity from chunk
-        _chunk_coords = world.get_chunk_from_pixel_position(self._gameobjects[data['id']].position)
         # remove gameobject from chunk cache
-        self._gameobject_chunks[_chunk_coords].remove(self._gameobjects[data['id']])
-
-
-        self._gameobjects[data['id']]._alive = False
+        self.remove_gameobject_chunk(_gameobject)
+
+
+        _gameobject._alive = False
+        # pooled gameobjects are parked for the next spawn
+        _pool = _gameobject._pool
+        if _pool is not None:
+            _parked = _pool.can_release()
+            _pool.release(_gameobject)
+            if _parked:
+                self.park_gameobject(_gameobject)
+                return
+            _gameobject._pool = None
         # run the custom gameobject death function
-        self._gameobjects[data['id']].handle_death_signal(data)
+        _gameobject.handle_death_signal(data)
         
         # remove the gameobject
         del self._gameobjects[data['id']]
+
+    def park_gameobject(self, gameobject: "GameObject"):
+        """ Take a (pooled) gameobject out of the world -- it keeps its components, ids + aspects """
+        del self._gameobjects[gameobject._id]
+        for _comp in gameobject._components:
+            _comp._parked_aspects = self._world._aspect_handler.park_component(_comp)
+        self._world._query_handler.remove_gameobject(gameobject)
+
+    def unpark_gameobject(self, gameobject: "GameObject"):
+        """ Put a parked gameobject back into the world """
+        gameobject._alive = True
+        self._gameobjects[gameobject._id] = gameobject
+        self.update_gameobject_chunk(gameobject, gameobject.position)
+        for _comp in gameobject._components:
+            self._world._aspect_handler.unpark_component(_comp, _comp._parked_aspects)
+            _comp._parked_aspects = None
+        self._world._query_handler.add_gameobject(gameobject)
     
     def load_components(self):
         """ Load the components """
@@ -114,11 +190,15 @@ class PhysicsHandler:
     def __getstate__(self):
         """ Pickle state """
         state = self.__dict__.copy()
+        # rebuilt by `refresh_gameobject_chunks`
+        state["_gameobject_chunks"] = {}
         return state
     
     def __setstate__(self, state):
         """ Unpickle state """
         self.__dict__.update(state)
+        # older saves keyed the chunks by the position (may be stale)
+        self._gameobject_chunks = {}
         self.load_components()
     
         
@@ -0,0 +1,155 @@
+import pygame
+
+
+# ---------------------------- #
+# constants
+
+# ---------------------------- #
+# object pool
+
+class ObjectPool:
+    """
+    A free list of objects of one type.
+
+    `factory(*args, **kwargs)` creates a new object, `reset(object, *args, **kwargs)`
+    prepares a reused one. Released objects are kept until `max_size` are free.
+
+    """
+
+    def __init__(self, factory: "function", reset: "function" = None, max_size: int = None):
+        """ Create a new object pool """
+        self._factory = factory
+        self._reset = reset
+        self._max_size = max_size
+        self._free = []
+
+        # statistics
+        self._created = 0
+        self._reused = 0
+        self._released = 0
+        self._dropped = 0
+        self._live = 0
+        self._high_water = 0
+
+    # ---------------------------- #
+    # logic
+
+    def acquire(self, *args, **kwargs):
+        """ Get a reused (or new) object """
+        if self._free:
+            _object = self._free.pop()
+            if self._reset:
+                self._reset(_object, *args, **kwargs)
+            self._reused += 1
+        else:
+            _object = self._factory(*args, **kwargs)
+            self._created += 1
+        self._count_live(1)
+        return _object
+
+    def release(self, _object):
+        """ Give an object back to the pool """
+        self._count_live(-1)
+        if not self.can_release():
+            self._dropped += 1
+            return
+        self._free.append(_object)
+        self._released += 1
+
+    def can_release(self) -> bool:
+        """ Check if a released object would be kept """
+        return self._max_size is None or len(self._free) < self._max_size
+
+    def prewarm(self, count: int, *args, **kwargs):
+        """ Create `count` free objects up front """
+        for _ in range(count):
+            self.release(self.acquire(*args, **kwargs))
+
+    def _count_live(self, change: int):
+        """ Track the live objects + high water mark """
+        self._live += change
+        self._high_water = max(self._high_water, self._live)
+
+    # ---------------------------- #
+    # utils
+
+    def get_stats(self) -> dict:
+        """ Get the pool statistics """
+        _acquired = self._created + self._reused
+        return {
+            "acquired": _acquired,
+            "created": self._created,
+            "reused": self._reused,
+            "released": self._released,
+            "dropped": self._dropped,
+            "live": self._live,
+            "free": len(self._free),
+            "high_water": self._high_water,
+            "hit_rate": self._reused / _acquired if _acquired else 0.0,
+        }
+
+    def __len__(self):
+        """ Number of free objects """
+        return len(self._free)
+
+
+# ---------------------------- #
+# gameobject pool
+
+class GameObjectPool(ObjectPool):
+    """
+    Pools gameobjects together with their components.
+
+    `factory(position, **kwargs)` creates the gameobject + adds its components,
+    `reset(gameobject, **kwargs)` runs on every spawn (new + reused) after it was
+    placed at `position`.
+
+    Killing a pooled gameobject parks it instead of tearing it down: it leaves the
+    world update, its aspects + queries, but keeps its components, ids and the
+    aspects it was registered in. Spawning it again puts it straight back -- no
+    new objects, ids or aspect lookups.
+
+    """
+
+    def __init__(self, world: "World", factory: "function", reset: "function" = None, max_size: int = None):
+        """ Create a new gameobject pool """
+        super().__init__(factory, reset, max_size)
+        self._world = world
+
+    # ---------------------------- #
+    # logic
+
+    def spawn(self, position: tuple, **kwargs) -> "GameObject":
+        """ Spawn a gameobject at the position (center) """
+        if self._free:
+            _gameobject = self._free.pop()
+            _gameobject.__pool_reset__(position)
+            for _comp in _gameobject._components:
+                _comp.__pool_reset__()
+            self._world._physics_handler.unpark_gameobject(_gameobject)
+            self._reused += 1
+        else:
+            _gameobject = self._factory(pygame.math.Vector2(position), **kwargs)
+            _gameobject._pool = self
+            self._world.add_gameobject(_gameobject)
+            self._created += 1
+        if self._reset:
+            self._reset(_gameobject, **kwargs)
+        self._count_live(1)
+        return _gameobject
+
+    def despawn(self, gameobject: "GameObject"):
+        """ Give the gameobject back (parked when the death signals are handled) """
+        gameobject.kill()
+
+    def prewarm(self, count: int, position: tuple = (0, 0), **kwargs):
+        """ Create `count` parked gameobjects up front """
+        _high_water = self._high_water
+        for _gameobject in [self.spawn(position, **kwargs) for _ in range(count)]:
+            _gameobject._alive = False
+            self._world._physics_handler.handle_death_signal({"id": _gameobject._id})
+        self._high_water = _high_water
+
+    def acquire(self, *args, **kwargs):
+        """ Use `spawn` """
+        return self.spawn(*args, **kwargs)
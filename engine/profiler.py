@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import datetime
+import threading
+import collections
+
+import numpy as np
+
+
+# ---------------------------- #
+# constants
+
+# toggled at runtime (shift + p) -- scopes cost a flag check while disabled
+ENABLED = False
+
+# frames kept for the rolling percentiles + the chrome trace
+HISTORY_FRAMES = 240
+TRACE_FRAMES = 600
+PERCENTILES = (50, 95, 99)
+
+TRACE_FOLDER = "assets/profiles/"
+
+FRAME_SCOPE = "frame"
+
+# ---------------------------- #
+# scopes
+
+class NullScope:
+    """ Returned while the profiler is disabled """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_SCOPE = NullScope()
+
+
+class Scope:
+    """ Times a `with` block into the profiler """
+
+    __slots__ = ("_name", "_index", "_category", "_start")
+
+    def __init__(self, name: str, index, category: str):
+        """ Create a new scope """
+        self._name = name
+        self._index = index
+        self._category = category
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *args):
+        _name = self._name if self._index is None else f"{self._name} {self._index}"
+        PROFILER.record(_name, self._category, self._start, time.perf_counter_ns())
+        return False
+
+
+# ---------------------------- #
+# profiler
+
+class Profiler:
+    """
+    Collects the scope timings of every frame.
+
+    - per frame totals of every scope are kept for the last `HISTORY_FRAMES` frames (percentiles)
+    - the raw scope events of the last `TRACE_FRAMES` frames are kept for the chrome trace export
+
+    Scopes may be recorded from any thread (e.g. the aspect thread pool).
+    """
+
+    def __init__(self):
+        """ Create a new profiler """
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self.reset()
+
+    # ---------------------------- #
+    # logic
+
+    def reset(self):
+        """ Drop all the collected timings """
+        with self._lock:
+            self._frame = 0
+            self._frame_start = time.perf_counter_ns()
+            self._frame_totals = {}
+            self._frame_events = []
+            # {scope name: deque[ns]}
+            self._history = {}
+            # deque[(frame, [events])]
+            self._trace = collections.deque(maxlen=TRACE_FRAMES)
+            self._thread_names = {}
+
+    def record(self, name: str, category: str, start: int, end: int):
+        """ Record a finished scope (perf counter ns) """
+        _thread = threading.current_thread()
+        with self._lock:
+            self._frame_totals[name] = self._frame_totals.get(name, 0) + end - start
+            self._frame_events.append((name, category, start, end, _thread.ident))
+            self._thread_names[_thread.ident] = _thread.name
+
+    def end_frame(self):
+        """ Close the current frame + start the next one """
+        _end = time.perf_counter_ns()
+        with self._lock:
+            self._frame_totals[FRAME_SCOPE] = _end - self._frame_start
+            self._frame_events.append((FRAME_SCOPE, FRAME_SCOPE, self._frame_start, _end, threading.main_thread().ident))
+            for _name, _total in self._frame_totals.items():
+                if _name not in self._history:
+                    self._history[_name] = collections.deque(maxlen=HISTORY_FRAMES)
+                self._history[_name].append(_total)
+            self._trace.append((self._frame, self._frame_events))
+            self._frame += 1
+            self._frame_start = _end
+            self._frame_totals = {}
+            self._frame_events = []
+
+    # ---------------------------- #
+    # stats
+
+    def get_stats(self) -> dict:
+        """ Get {scope name: {count, mean, max, p50, p95, p99}} in ms over the history (per frame totals) """
+        with self._lock:
+            _history = {_name: np.fromiter(_values, dtype=np.int64) for _name, _values in self._history.items()}
+        result = {}
+        for _name, _values in _history.items():
+            _ms = _values / 1e6
+            result[_name] = {"count": len(_ms), "mean": float(_ms.mean()), "max": float(_ms.max())}
+            for _percentile, _value in zip(PERCENTILES, np.percentile(_ms, PERCENTILES)):
+                result[_name][f"p{_percentile}"] = float(_value)
+        return result
+
+    def format_stats(self) -> str:
+        """ Get the stats as a table -- slowest (p95) first """
+        _stats = self.get_stats()
+        _columns = ["mean", *(f"p{_percentile}" for _percentile in PERCENTILES), "max"]
+        _lines = [f"{'scope':<32}" + "".join(f"{_column:>10}" for _column in _columns)]
+        for _name, _values in sorted(_stats.items(), key=lambda x: -x[1]["p95"]):
+            _lines.append(f"{_name:<32}" + "".join(f"{_values[_column]:>10.3f}" for _column in _columns))
+        return "\n".join(_lines)
+
+    # ---------------------------- #
+    # chrome trace
+
+    def get_trace_events(self, first_frame: int = None, last_frame: int = None) -> list:
+        """ Get the chrome trace events of the captured frames in [first_frame, last_frame] """
+        _pid = os.getpid()
+        with self._lock:
+            _frames = [_events for _frame, _events in self._trace if (first_frame is None or _frame >= first_frame) and (last_frame is None or _frame <= last_frame)]
+            _thread_names = dict(self._thread_names)
+        result = [
+            {"name": "thread_name", "ph": "M", "pid": _pid, "tid": _tid, "args": {"name": _thread_name}}
+            for _tid, _thread_name in _thread_names.items()
+        ]
+        for _events in _frames:
+            for _name, _category, _start, _end, _tid in _events:
+                result.append({
+                    "name": _name,
+                    "cat": _category,
+                    "ph": "X",
+                    "ts": (_start - self._origin) / 1000,
+                    "dur": (_end - _start) / 1000,
+                    "pid": _pid,
+                    "tid": _tid,
+                })
+        return result
+
+    def export_chrome_trace(self, path: str = None, first_frame: int = None, last_frame: int = None) -> str:
+        """ Write the captured frames as chrome trace event json (chrome://tracing, perfetto) -- returns the path """
+        if path is None:
+            path = TRACE_FOLDER + f"trace_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.get_trace_events(first_frame, last_frame), "displayTimeUnit": "ms"}, f)
+        return path
+
+    def get_frame(self) -> int:
+        """ Get the index of the current frame """
+        return self._frame
+
+
+PROFILER = Profiler()
+
+# ---------------------------- #
+# functions
+
+def scope(name: str, index = None, category: str = "engine"):
+    """ Time a `with` block -- `index` is appended to the name (only formatted while enabled) """
+    if not ENABLED:
+        return NULL_SCOPE
+    return Scope(name, index, category)
+
+def end_frame():
+    """ Close the current profiler frame """
+    if ENABLED:
+        PROFILER.end_frame()
+
+def set_enabled(enabled: bool):
+    """ Enable / disable the profiler -- enabling starts a fresh capture """
+    global ENABLED
+    if enabled and not ENABLED:
+        PROFILER.reset()
+    ENABLED = enabled
+
+def toggle() -> bool:
+    """ Toggle the profiler """
+    set_enabled(not ENABLED)
+    return ENABLED
+
+def get_stats() -> dict:
+    """ Get the rolling scope stats """
+    return PROFILER.get_stats()
+
+def export_chrome_trace(path: str = None, first_frame: int = None, last_frame: int = None) -> str:
+    """ Export the captured frames as a chrome trace """
+    return PROFILER.export_chrome_trace(path, first_frame, last_frame)
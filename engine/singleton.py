@@ -6,6 +6,7 @@ import platform
 import dill
 
 from engine import io
+from engine import profiler
 from engine.graphics import gl
 
 # ---------------------------- #
@@ -100,10 +101,43 @@ DEFAULT_CHUNK_PIXEL_HEIGHT = DEFAULT_CHUNK_HEIGHT * DEFAULT_TILE_HEIGHT
 
 DEFAULT_LAYER_COUNT = 5
 DEFAULT_CHUNK_RENDER_DISTANCE = [2]
+# pixels added around the camera rect when finding the visible chunks
+CHUNK_VISIBLE_MARGIN = 16
 ITER_CHUNK_3x3 = [(i, j) for i in range(-1, 2) for j in range(-1, 2)]
 
 UPDATE_INVISIBLE_CHUNKS = True
 
+# simulation level of detail -- chunks in the render distance are updated every frame,
+# chunks in the reduced radius every few frames (with the accumulated delta), the rest is frozen
+SIMULATION_REDUCED_RADIUS = 6
+SIMULATION_REDUCED_INTERVAL = 4
+
+# chunk streaming -- load chunks around the camera on a background thread
+CHUNK_STREAMING = False
+CHUNK_STREAM_LOAD_RADIUS = 3
+CHUNK_STREAM_PREFETCH_DISTANCE = 2
+CHUNK_STREAM_EVICT_RADIUS = 6
+CHUNK_STREAM_APPLY_BUDGET = 2
+
+# procedural chunk generation -- layers with a chunk generator (0 workers = generate on the main thread)
+CHUNK_GENERATION_WORKERS = 2
+CHUNK_GENERATION_RADIUS = 3
+CHUNK_GENERATION_LOOKAHEAD = 2
+CHUNK_GENERATION_APPLY_BUDGET = 2
+
+# world rect bodies -- keep the physics state in a structure of arrays store (see `physics.bodystore`)
+PHYSICS_BODY_STORE = False
+
+# fixed timestep -- physics + fixed step aspects run in steps of 1 / SIMULATION_RATE seconds (several per frame if needed),
+# at most MAX_SIMULATION_STEPS per frame, gameobjects are drawn interpolated between the last two steps
+FIXED_TIMESTEP = False
+SIMULATION_RATE = 60
+MAX_SIMULATION_STEPS = 5
+
+# aspects -- True = non conflicting aspects (see `Aspect` reads / writes) run on a thread pool, False = serial in priority order
+PARALLEL_ASPECTS = False
+ASPECT_THREAD_WORKERS = 4
+
 SAVING_WORLD_FLAG = False
 
 # keep track of count
@@ -198,6 +232,13 @@ def system_update_function():
         DEBUG = not DEBUG
     if io.get_key_clicked(pygame.K_e) and io.get_key_pressed(pygame.K_LSHIFT):
         EDITOR_DEBUG = not EDITOR_DEBUG
+    # profiler -- shift + p toggles (prints the stats when stopped), shift + t exports the captured frames
+    if io.get_key_clicked(pygame.K_p) and io.get_key_pressed(pygame.K_LSHIFT):
+        if not profiler.toggle():
+            print(profiler.PROFILER.format_stats())
+    if io.get_key_clicked(pygame.K_t) and io.get_key_pressed(pygame.K_LSHIFT) and profiler.PROFILER.get_frame():
+        print("Exported profiler trace: ", profiler.export_chrome_trace())
+    profiler.end_frame()
 
 def save_world(world):
     """ Save the world to a file """
@@ -212,6 +253,8 @@ def save_world(world):
         print("Saving the world at: ", world.get_world_saving_main_file())
         dill.dump(world, f)
     SAVING_WORLD_FLAG = False
+    # chunks were written into the region files while dumping
+    world.flush_chunk_storage()
 
 def load_world(folder_path: str):
     """ Load a world from a file """
@@ -235,3 +278,15 @@ def set_render_distance(distance: int):
     """ Set the render distance """
     global DEFAULT_CHUNK_RENDER_DISTANCE
     DEFAULT_CHUNK_RENDER_DISTANCE = [distance]
+
+def set_chunk_streaming(enabled: bool, load_radius: int = None, evict_radius: int = None):
+    """ Set the chunk streaming config (used by worlds created / loaded afterwards) """
+    global CHUNK_STREAMING, CHUNK_STREAM_LOAD_RADIUS, CHUNK_STREAM_EVICT_RADIUS
+    load_radius = CHUNK_STREAM_LOAD_RADIUS if load_radius is None else load_radius
+    evict_radius = CHUNK_STREAM_EVICT_RADIUS if evict_radius is None else evict_radius
+    # chunks that were just loaded should never be evicted right away
+    if evict_radius <= load_radius + CHUNK_STREAM_PREFETCH_DISTANCE:
+        raise ValueError("The evict radius must be larger than the load radius + prefetch distance")
+    CHUNK_STREAMING = enabled
+    CHUNK_STREAM_LOAD_RADIUS = load_radius
+    CHUNK_STREAM_EVICT_RADIUS = evict_radius
@@ -68,55 +68,84 @@ class PlayerAspect(aspect.Aspect):
 
     def __init__(self):
         """ Initialize the Sprite Renderer Aspect """
-        super().__init__(target_component_classes=[PlayerComponent])
+        super().__init__(
+            target_component_classes=[PlayerComponent],
+            reads=[PlayerComponent],
+            writes=[
+                components.rect_comp.WorldRectComponent,
+                components.sprite_comp.SpriteComponent,
+                components.animation_comp.AnimationComponent,
+                aspect.RESOURCE_GAMEOBJECTS,
+            ],
+            fixed_step=True,
+        )
+
+    def __post_init__(self):
+        """ Post init function """
+        # every player + the components it drives
+        self._players = self._handler._world.query(
+            PlayerComponent,
+            components.rect_comp.WorldRectComponent,
+            components.sprite_comp.SpriteComponent,
+            components.animation_comp.AnimationComponent,
+        )
 
     # ---------------------------- #
     # logic
     
     def handle(self, camera: "Camera"):
         """ Handle the Sprite Renderer aspect """
-        for _c in self.iter_components():
-            self._handle_player_code(_c)
+        if len(self._players) != len(self._components):
+            self._check_players()
+        for _player, _rect, _sprite, _animation in self._players:
+            self._handle_player_code(_player, _rect, _sprite, _animation)
     
-    def _handle_player_code(self, player_comp: PlayerComponent):
+    def _check_players(self):
+        """ Raise for the players that are missing a component they need (not in the query) """
+        for _player in self.iter_components():
+            if _player.get_gameobject() not in self._players:
+                _missing = [_class.__name__ for _class in self._players.get_component_classes() if not _player.get_gameobject().has_component(_class)]
+                raise ValueError(f"Player gameobject {_player.get_gameobject()._id} is missing the components: {_missing}")
+    
+    def _handle_player_code(self, player_comp: PlayerComponent, rect_comp: "WorldRectComponent", sprite_comp: "SpriteComponent", animation_comp: "AnimationComponent"):
         """ Handle the player code """
         _gameobject = player_comp.get_gameobject()
 
         # update movement
         if io.get_key_pressed(player_comp._input_config["a"]):
-            _gameobject._rect_comp._acceleration.x += -_gameobject._agility
+            rect_comp._acceleration.x += -_gameobject._agility
         if io.get_key_pressed(player_comp._input_config["d"]):
-            _gameobject._rect_comp._acceleration.x += _gameobject._agility
+            rect_comp._acceleration.x += _gameobject._agility
         
-        if _gameobject._rect_comp._touching[components.physics_comp.TOUCHING_BOTTOM] and io.get_key_pressed(pygame.K_SPACE):
-            _gameobject._rect_comp._velocity.y = -200
+        if rect_comp._touching[components.physics_comp.TOUCHING_BOTTOM] and io.get_key_pressed(pygame.K_SPACE):
+            rect_comp._velocity.y = -200
         
         # touching ladders
         if _gameobject._can_climb and not io.get_key_pressed(pygame.K_LSHIFT):
             # cancel gravity
-            _gameobject._rect_comp._acceleration -= game_singleton.GAME_GRAVITY
+            rect_comp._acceleration -= game_singleton.GAME_GRAVITY
             
             # climbing up + down
             if io.get_key_pressed(pygame.K_w) or io.get_key_pressed(pygame.K_SPACE):
-                _gameobject._rect_comp._acceleration.y += -_gameobject._climbing_factor * _gameobject._agility
+                rect_comp._acceleration.y += -_gameobject._climbing_factor * _gameobject._agility
             if io.get_key_pressed(pygame.K_s):
-                _gameobject._rect_comp._acceleration.y += _gameobject._climbing_factor * _gameobject._agility 
+                rect_comp._acceleration.y += _gameobject._climbing_factor * _gameobject._agility 
         
         # set flipx
-        _gameobject._sprite_comp.set_flipx(_gameobject._rect_comp._velocity.x < 0)
+        sprite_comp.set_flipx(rect_comp._velocity.x < 0)
 
         # set animation)
-        _velocity_mag = _gameobject._rect_comp._velocity.length()
+        _velocity_mag = rect_comp._velocity.length()
         if _velocity_mag < 5:
             # is idle
-            _gameobject._animation_comp.set_animation_type("Idle")
+            animation_comp.set_animation_type("Idle")
         else:
             # is walking
-            _gameobject._animation_comp.set_animation_type("Walk")
+            animation_comp.set_animation_type("Walk")
         
         # clamp max speed
-        _gameobject._rect_comp._velocity.x = utils.clamp(_gameobject._rect_comp._velocity.x, -game_singleton.MAX_GAMEOBJECT_SPEED, game_singleton.MAX_GAMEOBJECT_SPEED)
-        _gameobject._rect_comp._velocity.y = utils.clamp(_gameobject._rect_comp._velocity.y, -game_singleton.MAX_GAMEOBJECT_SPEED, game_singleton.MAX_GAMEOBJECT_SPEED)
+        rect_comp._velocity.x = utils.clamp(rect_comp._velocity.x, -game_singleton.MAX_GAMEOBJECT_SPEED, game_singleton.MAX_GAMEOBJECT_SPEED)
+        rect_comp._velocity.y = utils.clamp(rect_comp._velocity.y, -game_singleton.MAX_GAMEOBJECT_SPEED, game_singleton.MAX_GAMEOBJECT_SPEED)
 
         # reset stats
         _gameobject._can_climb = False
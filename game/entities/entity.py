@@ -47,5 +47,4 @@ class Entity(gameobject.GameObject):
 
     def move(self, x: float, y: float):
         """ Move the entity """
-        self.position += (x, y)
-        self._rect_comp._rect.center = self.position
+        self._rect_comp.set_position(self.position + (x, y))
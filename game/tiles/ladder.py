@@ -1,6 +1,7 @@
 
 
 from engine.handler import world
+from engine.handler import chunkcodec
 
 from game import singleton
 
@@ -35,7 +36,6 @@ class LadderTile(world.DefaultTile):
 
         if issubclass(gameobject.__class__, entity.Entity):
             gameobject._can_climb = True
-            
-
 
 
+chunkcodec.register_tile_class(LadderTile, chunkcodec.GAME_TILE_TYPE_ID_START)